@@ -52,6 +52,8 @@ class CircularDependencyResponse(BaseModel):
     cycle_length: int = Field(..., description="Длина цикла")
     modules_involved: List[str] = Field(..., description="Вовлеченные модули")
     severity: str = Field(..., description="Критичность: critical, warning, info")
+    component_size: int = Field(0, description="Методов в компоненте сильной связности")
+    component: List[str] = Field(default_factory=list, description="Методы компоненты")
 
 
 class HotspotResponse(BaseModel):
@@ -87,12 +89,38 @@ class ComplexityMetricsResponse(BaseModel):
     cohesion: float = Field(..., description="Cohesion (0-1)")
 
 
+class ImpactMethodResponse(BaseModel):
+    """Затронутый метод"""
+    name: Optional[str] = Field(None, description="Имя функции/процедуры")
+    file_path: Optional[str] = Field(None, description="Путь к файлу модуля")
+    distance: Optional[int] = Field(None, description="Глубина вызовов (если задана глубина)")
+
+
+class ImpactModuleResponse(BaseModel):
+    """Затронутый модуль"""
+    file_path: str = Field(..., description="Путь к файлу модуля")
+    methods: int = Field(..., description="Количество затронутых методов модуля")
+
+
+class ImpactAnalysisResponse(BaseModel):
+    """Транзитивное влияние изменения"""
+    file_path: str = Field(..., description="Путь к файлу модуля")
+    method: Optional[str] = Field(None, description="Имя метода (None - весь модуль)")
+    direction: str = Field(..., description="callers или callees")
+    depth: Optional[int] = Field(None, description="Максимальная глубина (None - без ограничения)")
+    methods_count: int = Field(..., description="Всего затронутых методов")
+    modules_count: int = Field(..., description="Всего затронутых модулей")
+    methods: List[ImpactMethodResponse] = Field(default_factory=list, description="Затронутые методы")
+    modules: List[ImpactModuleResponse] = Field(default_factory=list, description="Затронутые модули")
+
+
 class AnalyticsSummaryResponse(BaseModel):
     """Общая сводка аналитики"""
     circular_dependencies: Dict = Field(..., description="Статистика по циклическим зависимостям")
     hotspots: Dict = Field(..., description="Статистика по популярным функциям")
     dead_code: Dict = Field(..., description="Статистика по мертвому коду")
     complexity: Dict = Field(..., description="Метрики сложности")
+    meta: Optional[Dict] = Field(None, description="Версия графа сводки и ее актуальность (stale)")
 
 
 # Endpoints
@@ -110,7 +138,7 @@ async def get_circular_dependencies(
     """
     Поиск циклических зависимостей в графе вызовов
 
-    - **max_depth**: Максимальная глубина поиска циклов (2-20)
+    - **max_depth**: Максимальная длина представительного цикла (2-20)
     - **min_cycle_length**: Минимальная длина цикла для отчета (2-10)
 
     Returns:
@@ -128,7 +156,9 @@ async def get_circular_dependencies(
                 cycle_path=c.cycle_path,
                 cycle_length=c.cycle_length,
                 modules_involved=c.modules_involved,
-                severity=c.severity
+                severity=c.severity,
+                component_size=c.component_size,
+                component=c.component
             )
             for c in cycles
         ]
@@ -260,6 +290,61 @@ async def get_complexity_metrics(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get(
+    "/impact",
+    response_model=ImpactAnalysisResponse,
+    summary="Анализ влияния изменений",
+    description="Все транзитивные вызывающие или вызываемые методы модуля или метода"
+)
+async def get_impact(
+    file_path: str = Query(..., description="Путь к файлу модуля"),
+    method: Optional[str] = Query(None, description="Имя метода (опционально, иначе весь модуль)"),
+    direction: str = Query("callers", description="callers - кого затронет, callees - от чего зависит"),
+    depth: Optional[int] = Query(None, ge=1, le=50, description="Максимальная глубина вызовов"),
+    limit: int = Query(100, ge=1, le=5000, description="Максимум методов в ответе")
+):
+    """
+    Анализ влияния изменения модуля или метода
+
+    - **file_path**: Путь к файлу модуля
+    - **method**: Имя метода модуля (опционально)
+    - **direction**: callers (кого затронет изменение) или callees (зависимости)
+    - **depth**: Максимальная глубина (по умолчанию - без ограничения)
+    - **limit**: Максимум методов в ответе (модули возвращаются все)
+
+    Returns:
+        Затронутые методы и модули (модули - по количеству затронутых методов)
+    """
+    try:
+        analyzer = get_graph_analyzer()
+        impact = analyzer.analyze_impact(
+            file_path=file_path,
+            method=method,
+            direction=direction,
+            depth=depth,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error analyzing impact: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if impact is None:
+        raise HTTPException(status_code=404, detail=f"Module or method not found: {file_path}")
+
+    return ImpactAnalysisResponse(
+        file_path=impact.file_path,
+        method=impact.method,
+        direction=impact.direction,
+        depth=impact.depth,
+        methods_count=impact.methods_count,
+        modules_count=impact.modules_count,
+        methods=impact.methods,
+        modules=impact.modules
+    )
+
+
 @router.get(
     "/summary",
     response_model=AnalyticsSummaryResponse,
@@ -276,6 +361,9 @@ async def get_analytics_summary():
     - Dead code
     - Complexity metrics
 
+    Сводка вычисляется один раз на версию графа; после переиндексации
+    возвращается предыдущая (meta.stale = true), пока новая считается в фоне.
+
     Returns:
         Полная сводка со статистикой и примерами
     """
@@ -287,7 +375,8 @@ async def get_analytics_summary():
             circular_dependencies=summary['circular_dependencies'],
             hotspots=summary['hotspots'],
             dead_code=summary['dead_code'],
-            complexity=summary['complexity']
+            complexity=summary['complexity'],
+            meta=summary.get('meta')
         )
     except Exception as e:
         logger.error(f"Error getting analytics summary: {e}")
@@ -317,6 +406,8 @@ async def analytics_health():
         return {
             "status": "healthy" if neo4j_ok else "degraded",
             "neo4j_connected": neo4j_ok,
+            "graph_engine": analyzer.engine.get_stats() if analyzer.engine else None,
+            "analytics_summary": analyzer.summary_store.get_stats(),
             "message": "Analytics API is operational"
         }
     except Exception as e:
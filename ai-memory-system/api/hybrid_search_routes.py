@@ -4,9 +4,12 @@ Endpoints для гибридного поиска (Qdrant + Neo4j)
 """
 
 from fastapi import APIRouter, Query, HTTPException
-from typing import List, Optional
+from fastapi.responses import StreamingResponse
+from typing import Dict, Iterator, List, Optional
 from pydantic import BaseModel, Field
 import sys
+import json
+import time
 from pathlib import Path
 
 # Добавление путей
@@ -54,6 +57,35 @@ class HybridStatsResponse(BaseModel):
     hybrid: dict
 
 
+def _score_weights(semantic_weight: float) -> Dict[str, float]:
+    """Веса для гибридного score"""
+    return {
+        'semantic': semantic_weight,
+        'incoming_calls': (1 - semantic_weight) * 0.5,
+        'outgoing_calls': (1 - semantic_weight) * 0.3,
+        'connections': (1 - semantic_weight) * 0.2
+    }
+
+
+def _result_to_dict(r: HybridSearchResult) -> dict:
+    """Конвертация результата для ответа API"""
+    return {
+        'file_path': r.file_path,
+        'module_name': r.module_name,
+        'module_type': r.module_type,
+        'semantic_score': r.semantic_score,
+        'hybrid_score': r.hybrid_score,
+        'relevance_label': r.relevance_label,
+        'functions_count': r.functions_count,
+        'incoming_calls': r.incoming_calls,
+        'outgoing_calls': r.outgoing_calls,
+        'called_by': r.called_by[:5],  # Top 5
+        'calls_to': r.calls_to[:5],
+        'related_modules': r.related_modules,
+        'preview': r.preview[:200]  # Shortened
+    }
+
+
 @router.get("/search", response_model=HybridSearchResponse)
 async def hybrid_search(
     q: str = Query(..., description="Поисковый запрос", min_length=2),
@@ -84,41 +116,17 @@ async def hybrid_search(
     try:
         engine = get_hybrid_engine()
 
-        # Веса для гибридного score
-        weights = {
-            'semantic': semantic_weight,
-            'incoming_calls': (1 - semantic_weight) * 0.5,
-            'outgoing_calls': (1 - semantic_weight) * 0.3,
-            'connections': (1 - semantic_weight) * 0.2
-        }
-
         # Выполнение поиска
         results = engine.search(
             query=q,
             limit=limit,
             min_semantic_score=min_score,
             include_graph_context=include_graph,
-            score_weights=weights
+            score_weights=_score_weights(semantic_weight)
         )
 
         # Конвертация результатов
-        results_dict = []
-        for r in results:
-            results_dict.append({
-                'file_path': r.file_path,
-                'module_name': r.module_name,
-                'module_type': r.module_type,
-                'semantic_score': r.semantic_score,
-                'hybrid_score': r.hybrid_score,
-                'relevance_label': r.relevance_label,
-                'functions_count': r.functions_count,
-                'incoming_calls': r.incoming_calls,
-                'outgoing_calls': r.outgoing_calls,
-                'called_by': r.called_by[:5],  # Top 5
-                'calls_to': r.calls_to[:5],
-                'related_modules': r.related_modules,
-                'preview': r.preview[:200]  # Shortened
-            })
+        results_dict = [_result_to_dict(r) for r in results]
 
         return HybridSearchResponse(
             query=q,
@@ -135,6 +143,68 @@ async def hybrid_search(
         raise HTTPException(status_code=500, detail=f"Ошибка поиска: {str(e)}")
 
 
+@router.get("/search/stream")
+async def hybrid_search_stream(
+    q: str = Query(..., description="Поисковый запрос", min_length=2),
+    limit: int = Query(10, description="Количество результатов", ge=1, le=50),
+    min_score: float = Query(0.3, description="Минимальный semantic score", ge=0.0, le=1.0),
+    include_graph: bool = Query(True, description="Включить graph контекст"),
+    semantic_weight: float = Query(0.6, description="Вес semantic search (0-1)", ge=0.0, le=1.0),
+    format: str = Query("ndjson", description="Формат потока: ndjson или sse", pattern="^(ndjson|sse)$")
+):
+    """
+    Потоковый гибридный поиск
+
+    Результаты отдаются по мере готовности стадий - каждое событие
+    содержит текущий лучший список (заменяет предыдущий):
+    - **vector**: сразу после ответа Qdrant (ранжирование по признакам графа из payload)
+    - **hybrid**: итоговый результат с метриками и связями из Neo4j (`final: true`)
+
+    Ошибка во время поиска - событие `error`.
+
+    **Пример:**
+    ```
+    GET /api/v1/hybrid/search/stream?q=получить+данные&limit=5&format=sse
+    ```
+    """
+    try:
+        engine = get_hybrid_engine()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Ошибка поиска: {str(e)}")
+
+    def events() -> Iterator[str]:
+        # Синхронный генератор - Starlette выполняет его в пуле потоков
+        started = time.perf_counter()
+        try:
+            for stage, results in engine.search_stream(
+                query=q,
+                limit=limit,
+                min_semantic_score=min_score,
+                include_graph_context=include_graph,
+                score_weights=_score_weights(semantic_weight)
+            ):
+                yield _stream_event(format, stage, {
+                    'query': q,
+                    'stage': stage,
+                    'final': stage == 'hybrid',
+                    'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+                    'results': [_result_to_dict(r) for r in results]
+                })
+        except Exception as e:
+            yield _stream_event(format, 'error', {'query': q, 'error': f"Ошибка поиска: {str(e)}"})
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(events(), media_type=media_type)
+
+
+def _stream_event(format: str, event: str, data: dict) -> str:
+    """Событие потока: строка NDJSON или событие SSE"""
+    payload = json.dumps(data, ensure_ascii=False)
+    if format == "sse":
+        return f"event: {event}\ndata: {payload}\n\n"
+    return payload + "\n"
+
+
 @router.get("/related", response_model=GraphRelatedResponse)
 async def get_related_modules(
     file_path: str = Query(..., description="Путь к файлу"),
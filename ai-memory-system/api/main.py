@@ -4,8 +4,9 @@ FastAPI сервер для семантического поиска BSL код
 """
 
 import sys
+import asyncio
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 # Добавление путей для импорта
@@ -21,6 +22,7 @@ import logging
 from qdrant_client import QdrantClient
 from qdrant_client.models import Filter, FieldCondition, MatchValue, MatchAny, Range
 from services.embedding_service import EmbeddingService
+from services.singleflight import SingleFlight, request_key
 
 # Импорт аутентификации
 try:
@@ -109,6 +111,7 @@ logger.info("✅ Export routes registered at /api/v1/export")
 qdrant_client: Optional[QdrantClient] = None
 embedding_service: Optional[EmbeddingService] = None
 search_cache = None  # SearchCache instance
+search_flight = SingleFlight("api_search")  # Одинаковые одновременные запросы - одно выполнение
 
 # Pydantic модели
 class SearchRequest(BaseModel):
@@ -343,6 +346,91 @@ async def health_check():
     }
 
 
+def _run_search(request: SearchRequest) -> List[Dict]:
+    """
+    Эмбеддинг запроса и поиск в Qdrant (синхронно, выполняется в пуле потоков)
+
+    Args:
+        request: Запрос поиска
+
+    Returns:
+        Результаты (словари SearchResult)
+    """
+    # Создание эмбеддинга для запроса
+    logger.info(f"🔍 Поиск: '{request.query}'")
+    query_embedding = embedding_service.create_embedding(request.query)
+
+    if not query_embedding:
+        raise HTTPException(status_code=500, detail="Не удалось создать embedding")
+
+    # Построение фильтра на основе параметров запроса
+    query_filter = build_search_filter(request)
+
+    # Поиск в Qdrant с фильтром
+    search_results = qdrant_client.search(
+        collection_name="bsl_code",
+        query_vector=query_embedding,
+        limit=request.top_k,
+        score_threshold=request.score_threshold,
+        query_filter=query_filter  # Применяем фильтр
+    )
+
+    # Форматирование результатов
+    results = []
+    for result in search_results:
+        results.append(SearchResult(
+            id=result.id,
+            score=result.score,
+            file_path=result.payload.get("file_path", ""),
+            module_type=result.payload.get("module_type", "Unknown"),
+            functions_count=result.payload.get("functions_count", 0),
+            variables_count=result.payload.get("variables_count", 0),
+            searchable_text=result.payload.get("searchable_text", "")
+        ))
+
+    # Post-query фильтрация по file_path_pattern
+    # (Qdrant не поддерживает LIKE/подстроку в фильтрах, поэтому делаем после получения результатов)
+    if request.file_path_pattern:
+        pattern_lower = request.file_path_pattern.lower()
+        results = [r for r in results if pattern_lower in r.file_path.lower()]
+
+    return [r.model_dump() for r in results]
+
+
+async def _compute_search(request: SearchRequest) -> List[Dict]:
+    """
+    Поиск без блокировки event loop и сохранение в кеш
+
+    Выполняется один раз на группу одинаковых одновременных запросов.
+    """
+    start_time = datetime.now()
+    loop = asyncio.get_running_loop()
+    results = await loop.run_in_executor(None, _run_search, request)
+
+    # Сохранение в кеш (включая параметры фильтров)
+    if search_cache and search_cache.enabled:
+        search_time = (datetime.now() - start_time).total_seconds() * 1000
+        search_cache.set(
+            request.query,
+            {
+                "query": request.query,
+                "results": results,
+                "total_found": len(results),
+                "search_time_ms": round(search_time, 2)
+            },
+            top_k=request.top_k,
+            score_threshold=request.score_threshold,
+            module_types=request.module_types,
+            file_path_pattern=request.file_path_pattern,
+            min_functions=request.min_functions,
+            max_functions=request.max_functions,
+            min_variables=request.min_variables,
+            max_variables=request.max_variables
+        )
+
+    return results
+
+
 @app.post("/api/v1/search", response_model=SearchResponse, tags=["Search"])
 async def search_code(
     request: SearchRequest,
@@ -352,7 +440,8 @@ async def search_code(
     Семантический поиск BSL кода с кешированием
 
     Выполняет векторный поиск по запросу и возвращает наиболее релевантные файлы.
-    Результаты кешируются в Redis для ускорения повторных запросов.
+    Результаты кешируются в Redis для ускорения повторных запросов, одинаковые
+    одновременные запросы выполняются один раз.
 
     - **query**: Поисковый запрос (например, "процедура записи документа")
     - **top_k**: Количество результатов (1-50)
@@ -390,43 +479,10 @@ async def search_code(
             return SearchResponse(**cached_result)
 
     try:
-        # Создание эмбеддинга для запроса
-        logger.info(f"🔍 Поиск: '{request.query}'")
-        query_embedding = embedding_service.create_embedding(request.query)
-
-        if not query_embedding:
-            raise HTTPException(status_code=500, detail="Не удалось создать embedding")
-
-        # Построение фильтра на основе параметров запроса
-        query_filter = build_search_filter(request)
-
-        # Поиск в Qdrant с фильтром
-        search_results = qdrant_client.search(
-            collection_name="bsl_code",
-            query_vector=query_embedding,
-            limit=request.top_k,
-            score_threshold=request.score_threshold,
-            query_filter=query_filter  # Применяем фильтр
-        )
-
-        # Форматирование результатов
-        results = []
-        for result in search_results:
-            results.append(SearchResult(
-                id=result.id,
-                score=result.score,
-                file_path=result.payload.get("file_path", ""),
-                module_type=result.payload.get("module_type", "Unknown"),
-                functions_count=result.payload.get("functions_count", 0),
-                variables_count=result.payload.get("variables_count", 0),
-                searchable_text=result.payload.get("searchable_text", "")
-            ))
-
-        # Post-query фильтрация по file_path_pattern
-        # (Qdrant не поддерживает LIKE/подстроку в фильтрах, поэтому делаем после получения результатов)
-        if request.file_path_pattern:
-            pattern_lower = request.file_path_pattern.lower()
-            results = [r for r in results if pattern_lower in r.file_path.lower()]
+        # Одинаковые одновременные запросы (веб-интерфейс, MCP сессии) -
+        # один эмбеддинг и один поиск в Qdrant
+        key = request_key(request.query, **request.model_dump(exclude={"query"}))
+        results = await search_flight.do(key, lambda: _compute_search(request))
 
         # Время поиска
         search_time = (datetime.now() - start_time).total_seconds() * 1000
@@ -435,26 +491,11 @@ async def search_code(
 
         response_data = {
             "query": request.query,
-            "results": [r.model_dump() for r in results],
+            "results": results,
             "total_found": len(results),
             "search_time_ms": round(search_time, 2)
         }
 
-        # Сохранение в кеш (включая параметры фильтров)
-        if search_cache and search_cache.enabled:
-            search_cache.set(
-                request.query,
-                response_data,
-                top_k=request.top_k,
-                score_threshold=request.score_threshold,
-                module_types=request.module_types,
-                file_path_pattern=request.file_path_pattern,
-                min_functions=request.min_functions,
-                max_functions=request.max_functions,
-                min_variables=request.min_variables,
-                max_variables=request.max_variables
-            )
-
         # Сохранение в историю поиска
         try:
             history = get_search_history()
@@ -551,14 +592,18 @@ async def get_cache_stats():
     - Количество кешированных запросов
     - TTL (время жизни кеша)
     - Статистика попаданий/промахов
+    - Объединенные одновременные запросы (singleflight)
     """
     if not search_cache:
         return {
             "enabled": False,
-            "reason": "Cache not initialized"
+            "reason": "Cache not initialized",
+            "singleflight": search_flight.get_stats()
         }
 
-    return search_cache.get_stats()
+    stats = search_cache.get_stats()
+    stats["singleflight"] = search_flight.get_stats()
+    return stats
 
 
 @app.delete("/api/v1/cache/clear", tags=["Cache"])
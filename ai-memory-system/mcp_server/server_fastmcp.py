@@ -14,11 +14,11 @@ from typing import List, Dict, Any
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'services'))
 
 # Импорты MCP (FastMCP - рекомендуемый способ для 1.16.0)
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 
 # Импорты сервисов
 from llm_service import LLMService
-from bsl_search_service import BSLSearchService, SearchRequest, SearchMode
+from bsl_search_service import BSLSearchService, SearchRequest, SearchMode, SearchResults
 from context_manager import get_context_manager, ContextRequest, ContextType
 from graph_analytics import GraphAnalyticsService
 from qdrant_vector_store import QdrantVectorStore
@@ -109,6 +109,43 @@ async def ensure_services():
     logger.info("=== Все сервисы инициализированы ===")
 
 
+def _progress_requested(ctx: Context) -> bool:
+    """Клиент передал progressToken (ждет уведомлений о прогрессе)"""
+    try:
+        meta = ctx.request_context.meta
+    except (AttributeError, ValueError):
+        return False
+    return bool(meta and meta.progressToken is not None)
+
+
+async def _search_with_progress(request: SearchRequest, ctx: Context) -> SearchResults:
+    """
+    Потоковый поиск: промежуточные результаты стадий - уведомления о прогрессе
+
+    Args:
+        request: Запрос поиска
+        ctx: Контекст MCP запроса
+
+    Returns:
+        Финальные результаты
+    """
+    results = SearchResults()
+    step = 0
+    async for update in search_service.search_stream(request):
+        if update.final:
+            results = SearchResults(update.results, degraded=update.degraded)
+            break
+
+        step += 1
+        top = ", ".join(r.file_path for r in update.results[:3])
+        await ctx.report_progress(
+            progress=step,
+            message=f"{update.stage}: {len(update.results)} results in {update.elapsed_ms:.0f}ms - {top}"
+        )
+
+    return results
+
+
 # ================================================================
 # Tool 1: search_bsl_code - Базовый семантический поиск
 # ================================================================
@@ -116,7 +153,8 @@ async def ensure_services():
 async def search_bsl_code(
     query: str,
     limit: int = 10,
-    mode: str = "semantic"
+    mode: str = "semantic",
+    ctx: Context = None
 ) -> str:
     """
     Базовый семантический поиск по BSL коду
@@ -125,6 +163,7 @@ async def search_bsl_code(
         query: Поисковый запрос
         limit: Максимальное количество результатов (по умолчанию 10)
         mode: Режим поиска (semantic, fulltext, hybrid)
+        ctx: Контекст MCP запроса (промежуточные результаты - уведомления о прогрессе)
 
     Returns:
         Список найденных фрагментов кода с метаданными
@@ -141,8 +180,12 @@ async def search_bsl_code(
             limit=min(limit, 50)
         )
 
-        # Выполняем поиск
-        results = await search_service.search(request)
+        # Выполняем поиск (клиент ждет прогресс - первые результаты
+        # отправляются сразу после ответа Qdrant)
+        if ctx is not None and _progress_requested(ctx):
+            results = await _search_with_progress(request, ctx)
+        else:
+            results = await search_service.search(request)
 
         # Добавляем в историю
         if history_service:
@@ -152,9 +195,16 @@ async def search_bsl_code(
                 results_count=len(results)
             )
 
+        # Стадии, не уложившиеся в бюджет времени (частичный результат)
+        degraded = getattr(results, "degraded", {})
+        degraded_note = ""
+        if degraded:
+            stages = ", ".join(f"{stage} ({reason})" for stage, reason in degraded.items())
+            degraded_note = f"\n\n> Partial results: degraded stages - {stages}"
+
         # Форматируем результаты
         if not results:
-            return f"No results found for query: '{query}'"
+            return f"No results found for query: '{query}'{degraded_note}"
 
         formatted = []
         for i, result in enumerate(results, 1):
@@ -169,7 +219,7 @@ async def search_bsl_code(
 ```
 """)
 
-        return "\n\n".join(formatted)
+        return "\n\n".join(formatted) + degraded_note
 
     except Exception as e:
         logger.error(f"Error in search_bsl_code: {e}", exc_info=True)
@@ -253,6 +303,7 @@ async def intelligent_search(
 **Total Items**: {assembled.total_items}
 **Avg Relevance**: {assembled.avg_relevance:.3f}
 **Processing Time**: {assembled.processing_time_ms}ms
+**Degraded Stages**: {', '.join(f'{stage} ({reason})' for stage, reason in assembled.degraded_stages.items()) or 'None'}
 **Confidence**: {assembled.confidence_score:.2f}
 
 ### Intent Classification
@@ -403,11 +454,42 @@ async def get_search_history(limit: int = 10) -> str:
                 f"   - Time: {entry['timestamp']}"
             )
 
+        # Объединение одинаковых одновременных запросов (singleflight)
+        coalescing = []
+        flights = [context_manager.get_stats()["singleflight"]] if context_manager else []
+        if search_service:
+            flights.append(search_service.get_stats()["singleflight"])
+        for flight in flights:
+            coalescing.append(
+                f"- {flight['name']}: {flight['calls']} calls, "
+                f"{flight['executions']} executed, {flight['coalesced']} coalesced"
+            )
+
+        # Кеш ответов LLM (классификация намерений, re-ranking)
+        llm_cache = []
+        cache_stats = llm_service.get_cache_stats() if llm_service else None
+        if cache_stats:
+            for kind in ("intent", "rerank"):
+                llm_cache.append(
+                    f"- {kind}: {cache_stats[kind]['hits']} hits, {cache_stats[kind]['misses']} misses "
+                    f"(hit rate {cache_stats[kind]['hit_rate'] * 100:.0f}%)"
+                )
+            llm_cache.append(f"- entries: {cache_stats['entries']}/{cache_stats['max_entries']}, "
+                             f"evictions: {cache_stats['evictions']}")
+
         return f"""## Search History
 
 Last {len(history)} searches:
 
 {chr(10).join(formatted_entries)}
+
+### Request Coalescing
+
+{chr(10).join(coalescing) if coalescing else 'N/A'}
+
+### LLM Cache
+
+{chr(10).join(llm_cache) if llm_cache else 'N/A'}
 """
 
     except Exception as e:
@@ -424,7 +506,7 @@ async def clear_cache(cache_type: str = "search_history") -> str:
     Очистить кеш и историю поиска
 
     Args:
-        cache_type: Тип кеша (search_history, all)
+        cache_type: Тип кеша (search_history, llm, all)
 
     Returns:
         Подтверждение очистки
@@ -434,10 +516,19 @@ async def clear_cache(cache_type: str = "search_history") -> str:
     logger.info(f"clear_cache: type={cache_type}")
 
     try:
+        cleared = []
         if cache_type in ["search_history", "all"]:
             if history_service:
                 history_service.clear_history()
-                return "✓ Search history cleared successfully"
+                cleared.append("Search history")
+
+        if cache_type in ["llm", "all"]:
+            if llm_service and llm_service.cache:
+                llm_service.clear_cache()
+                cleared.append("LLM intent/rerank cache")
+
+        if cleared:
+            return f"✓ {', '.join(cleared)} cleared successfully"
 
         return f"Cache type '{cache_type}' not recognized"
 
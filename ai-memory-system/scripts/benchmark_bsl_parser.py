@@ -0,0 +1,172 @@
+"""
+BSL Parser Benchmark
+Замер скорости BSLParser (однопроходный лексер) на корпусе конфигураций
+
+Метрики:
+- Файлов в секунду (files/sec) и МБ в секунду
+- Среднее / p95 / максимальное время разбора файла
+- Количество найденных функций и переменных
+
+Целевое значение по умолчанию: 700 files/sec на src/projects/configuration
+(построчный парсер на регулярных выражениях давал ~570 files/sec)
+"""
+
+import sys
+import time
+import logging
+import statistics
+from pathlib import Path
+from typing import Dict, List
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.bsl_parser import BSLParser
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CORPUS = Path(__file__).parent.parent.parent / "src" / "projects" / "configuration"
+DEFAULT_TARGET_FPS = 700.0
+
+
+def run_benchmark(files: List[Path], rounds: int = 1) -> Dict:
+    """
+    Разбор всех файлов корпуса и сбор метрик
+
+    Args:
+        files: Список BSL файлов
+        rounds: Количество повторов (берется лучший результат)
+
+    Returns:
+        Словарь с метриками
+    """
+    parser = BSLParser()
+    total_bytes = sum(f.stat().st_size for f in files)
+
+    best = None
+    for _ in range(rounds):
+        per_file_ms = []
+        functions = 0
+        variables = 0
+        errors = 0
+        slowest = ("", 0.0)
+
+        start = time.perf_counter()
+        for file_path in files:
+            file_start = time.perf_counter()
+            module = parser.parse_file(str(file_path))
+            elapsed_ms = (time.perf_counter() - file_start) * 1000
+
+            per_file_ms.append(elapsed_ms)
+            if elapsed_ms > slowest[1]:
+                slowest = (str(file_path), elapsed_ms)
+
+            if module is None:
+                errors += 1
+                continue
+
+            functions += len(module.functions)
+            variables += len(module.variables)
+
+        total_time = time.perf_counter() - start
+
+        if best is None or total_time < best['total_time_s']:
+            per_file_ms.sort()
+            best = {
+                'files': len(files),
+                'total_time_s': total_time,
+                'files_per_sec': len(files) / total_time if total_time > 0 else 0,
+                'mb_per_sec': total_bytes / (1024 * 1024) / total_time if total_time > 0 else 0,
+                'avg_ms': statistics.mean(per_file_ms) if per_file_ms else 0,
+                'p95_ms': per_file_ms[int(len(per_file_ms) * 0.95)] if per_file_ms else 0,
+                'max_ms': slowest[1],
+                'slowest_file': slowest[0],
+                'functions': functions,
+                'variables': variables,
+                'errors': errors
+            }
+
+    return best
+
+
+def print_report(stats: Dict, target_fps: float):
+    """Вывод результатов замера"""
+    passed = stats['files_per_sec'] >= target_fps
+
+    print("\n" + "=" * 60)
+    print("BSL PARSER BENCHMARK")
+    print("=" * 60)
+    print(f"Files:           {stats['files']}")
+    print(f"Total time:      {stats['total_time_s']:.2f} s")
+    print(f"Speed:           {stats['files_per_sec']:.1f} files/sec ({stats['mb_per_sec']:.1f} MB/sec)")
+    print(f"Avg per file:    {stats['avg_ms']:.2f} ms")
+    print(f"p95 per file:    {stats['p95_ms']:.2f} ms")
+    print(f"Slowest file:    {stats['max_ms']:.1f} ms - {Path(stats['slowest_file']).name}")
+    print(f"Functions:       {stats['functions']}")
+    print(f"Variables:       {stats['variables']}")
+    print(f"Parse errors:    {stats['errors']}")
+    print(f"Target:          {target_fps:.0f} files/sec - {'PASS' if passed else 'FAIL'}")
+    print("=" * 60 + "\n")
+
+    return passed
+
+
+def main():
+    """CLI entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark BSLParser speed on a BSL corpus"
+    )
+    parser.add_argument(
+        "source",
+        nargs="?",
+        default=str(DEFAULT_CORPUS),
+        help=f"Directory with BSL files (default: {DEFAULT_CORPUS})"
+    )
+    parser.add_argument(
+        "--target",
+        type=float,
+        default=DEFAULT_TARGET_FPS,
+        help=f"Target files/sec (default: {DEFAULT_TARGET_FPS:.0f})"
+    )
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=1,
+        help="Number of rounds, best is reported (default: 1)"
+    )
+    parser.add_argument(
+        "--max-files",
+        type=int,
+        default=None,
+        help="Maximum number of files (for quick runs)"
+    )
+
+    args = parser.parse_args()
+
+    files = sorted(Path(args.source).rglob("*.bsl"))
+    if args.max_files:
+        files = files[:args.max_files]
+
+    if not files:
+        logger.error(f"No BSL files found in {args.source}")
+        sys.exit(1)
+
+    logger.info(f"Benchmarking {len(files)} files from {args.source}")
+
+    # Парсер логирует каждую ошибку и инициализацию - в замере это шум
+    logging.getLogger('utils.bsl_parser').setLevel(logging.WARNING)
+
+    stats = run_benchmark(files, rounds=args.rounds)
+    passed = print_report(stats, args.target)
+
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
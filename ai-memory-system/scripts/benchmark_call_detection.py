@@ -0,0 +1,204 @@
+"""
+Call Detection Benchmark
+Сравнение поиска вызовов в BSLDependencyAnalyzer: прежний подход
+(регулярное выражение на каждую пару вызывающий/вызываемый) и
+BSLCallFinder (один проход по идентификаторам тела)
+
+Сравниваются вызовы методов своего модуля: Метод(...) и ЭтотОбъект.Метод(...)
+
+Метрики:
+- Общее время поиска вызовов по корпусу для обоих вариантов
+- Ускорение на всём корпусе и на самом большом модуле
+- Совпадение результатов (target_function, call_count, line_numbers)
+"""
+
+import re
+import sys
+import time
+import logging
+from pathlib import Path
+from typing import Dict, List
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.bsl_parser import BSLParser
+from utils.bsl_call_finder import BSLCallFinder
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CORPUS = Path(__file__).parent.parent.parent / "src" / "projects" / "configuration"
+
+# Вызов своего метода: без квалификатора или через ЭтотОбъект/ЭтаФорма
+_LOCAL_PREFIX = '(?:(?<![\\w.])|' + '|'.join(
+    rf'(?<={qualifier}\.)' for qualifier in ('ЭтотОбъект', 'ThisObject', 'ЭтаФорма', 'ThisForm')
+) + ')'
+
+
+def find_calls_per_pair(function_name: str, function_body: str, all_functions: List) -> List[Dict]:
+    """Регулярное выражение на каждую пару (прежний подход, эталон для сравнения)"""
+    calls = []
+
+    for func in all_functions:
+        target_name = func.name
+
+        if target_name == function_name:
+            continue
+
+        pattern = rf'{_LOCAL_PREFIX}{re.escape(target_name)}\s*\('
+        matches = list(re.finditer(pattern, function_body, re.IGNORECASE))
+
+        if matches:
+            line_numbers = []
+            for match in matches:
+                lines_before = function_body[:match.start()].count('\n')
+                line_numbers.append(lines_before + 1)
+
+            calls.append({
+                'target_function': target_name,
+                'call_count': len(matches),
+                'line_numbers': line_numbers
+            })
+
+    return calls
+
+
+def find_calls_single_pass(module) -> List[List[Dict]]:
+    """Поиск вызовов всех методов модуля через BSLCallFinder"""
+    finder = BSLCallFinder(module.functions)
+    return [
+        finder.find_calls(func.name, module.source, func.body_start, func.body_end)
+        for func in module.functions
+    ]
+
+
+def run_benchmark(modules: List) -> Dict:
+    """
+    Замер обоих вариантов на списке модулей
+
+    Args:
+        modules: Разобранные модули (BSLModule)
+
+    Returns:
+        Словарь с метриками
+    """
+    legacy_total = 0.0
+    single_total = 0.0
+    mismatches = 0
+    calls_found = 0
+    largest = None
+
+    for module in modules:
+        bodies = [func.body for func in module.functions]
+
+        start = time.perf_counter()
+        legacy = [
+            find_calls_per_pair(func.name, body, module.functions)
+            for func, body in zip(module.functions, bodies)
+        ]
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        single = find_calls_single_pass(module)
+        single_time = time.perf_counter() - start
+
+        legacy_total += legacy_time
+        single_total += single_time
+
+        if legacy != single:
+            mismatches += 1
+            logger.warning(f"Results differ: {module.file_path}")
+
+        calls_found += sum(len(calls) for calls in single)
+
+        if largest is None or legacy_time > largest['legacy_s']:
+            largest = {
+                'file': module.file_path,
+                'functions': len(module.functions),
+                'legacy_s': legacy_time,
+                'single_s': single_time
+            }
+
+    return {
+        'modules': len(modules),
+        'functions': sum(len(m.functions) for m in modules),
+        'calls': calls_found,
+        'legacy_s': legacy_total,
+        'single_s': single_total,
+        'speedup': legacy_total / single_total if single_total > 0 else 0,
+        'largest': largest,
+        'mismatches': mismatches
+    }
+
+
+def print_report(stats: Dict):
+    """Вывод результатов замера"""
+    largest = stats['largest']
+
+    print("\n" + "=" * 60)
+    print("CALL DETECTION BENCHMARK")
+    print("=" * 60)
+    print(f"Modules:         {stats['modules']}")
+    print(f"Functions:       {stats['functions']}")
+    print(f"Call edges:      {stats['calls']}")
+    print(f"Per-pair regex:  {stats['legacy_s']:.2f} s")
+    print(f"Single pass:     {stats['single_s']:.2f} s")
+    print(f"Speedup:         {stats['speedup']:.1f}x")
+    if largest:
+        speedup = largest['legacy_s'] / largest['single_s'] if largest['single_s'] > 0 else 0
+        print(f"Slowest module:  {Path(largest['file']).name} ({largest['functions']} methods)")
+        print(f"                 {largest['legacy_s'] * 1000:.0f} ms -> "
+              f"{largest['single_s'] * 1000:.1f} ms ({speedup:.0f}x)")
+    print(f"Mismatches:      {stats['mismatches']}")
+    print("=" * 60 + "\n")
+
+
+def main():
+    """CLI entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark call detection of BSLDependencyAnalyzer"
+    )
+    parser.add_argument(
+        "source",
+        nargs="?",
+        default=str(DEFAULT_CORPUS),
+        help=f"Directory with BSL files (default: {DEFAULT_CORPUS})"
+    )
+    parser.add_argument(
+        "--max-files",
+        type=int,
+        default=None,
+        help="Maximum number of files (for quick runs)"
+    )
+
+    args = parser.parse_args()
+
+    files = sorted(Path(args.source).rglob("*.bsl"))
+    if args.max_files:
+        files = files[:args.max_files]
+
+    if not files:
+        logger.error(f"No BSL files found in {args.source}")
+        sys.exit(1)
+
+    logger.info(f"Parsing {len(files)} files from {args.source}")
+    logging.getLogger('utils.bsl_parser').setLevel(logging.WARNING)
+
+    bsl_parser = BSLParser()
+    modules = [m for m in (bsl_parser.parse_file(str(f)) for f in files) if m and m.functions]
+
+    logger.info(f"Benchmarking call detection on {len(modules)} modules")
+    stats = run_benchmark(modules)
+    print_report(stats)
+
+    sys.exit(0 if stats['mismatches'] == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -18,8 +18,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from qdrant_client import QdrantClient
 from services.embedding_service import EmbeddingService
-from services.bsl_parser import BSLParser
-from services.neo4j_indexer import Neo4jIndexer
+from utils.bsl_parser import BSLParser
+from services.parse_cache import ParseCache
+from services.graph_version import bump_graph_version
+from scripts.neo4j.bsl_dependency_analyzer import BSLDependencyAnalyzer
 
 logging.basicConfig(
     level=logging.INFO,
@@ -115,11 +117,15 @@ class FullDatasetIndexer:
             timeout=ollama_timeout  # Увеличенный timeout
         )
         self.parser = BSLParser()
-        self.neo4j = Neo4jIndexer(
-            uri=neo4j_uri,
-            user=neo4j_user,
-            password=neo4j_password
+        self.parse_cache = ParseCache(parser=self.parser)
+        self.neo4j = BSLDependencyAnalyzer(
+            neo4j_uri=neo4j_uri,
+            neo4j_user=neo4j_user,
+            neo4j_password=neo4j_password
         )
+        # Анализ для графа читает тот же кеш разбора, что и индексация в Qdrant
+        self.neo4j.parse_cache = self.parse_cache
+        self.project_id = self.neo4j.create_or_get_project(self.source_path.name, self.source_path)
 
         # Загрузка прогресса
         self.progress = self._load_progress()
@@ -181,15 +187,15 @@ class FullDatasetIndexer:
             True если успешно, False если ошибка
         """
         try:
-            # Парсинг
-            metadata = self.parser.parse_file(str(file_path))
+            # Парсинг (результат кешируется и переиспользуется в _index_file_to_neo4j)
+            module = self.parse_cache.parse_file(str(file_path))
 
-            if not metadata:
+            if not module:
                 logger.warning(f"Пустой файл: {file_path.name}")
                 return True
 
             # Создание searchable text
-            searchable_text = self.parser.create_searchable_text(metadata)
+            searchable_text = self.parser.extract_searchable_text(module)
 
             # Embedding с увеличенным timeout
             embedding = self.embedding_service.create_embedding(searchable_text)
@@ -208,10 +214,10 @@ class FullDatasetIndexer:
                     "vector": embedding,
                     "payload": {
                         "file_path": str(file_path),
-                        "module_type": metadata.get('module_type', 'Unknown'),
-                        "functions_count": len(metadata.get('functions', [])),
-                        "procedures_count": len(metadata.get('procedures', [])),
-                        "variables_count": len(metadata.get('variables', [])),
+                        "module_type": module.module_type,
+                        "functions_count": sum(1 for f in module.functions if f.type.lower() in ('функция', 'function')),
+                        "procedures_count": sum(1 for f in module.functions if f.type.lower() in ('процедура', 'procedure')),
+                        "variables_count": len(module.variables),
                         "searchable_text": searchable_text[:500]  # Первые 500 символов
                     }
                 }]
@@ -238,14 +244,19 @@ class FullDatasetIndexer:
             True если успешно, False если ошибка
         """
         try:
-            # Парсинг
-            metadata = self.parser.parse_file(str(file_path))
+            # Парсинг (повторный для того же файла - из кеша разбора)
+            module = self.parse_cache.parse_file(str(file_path))
 
-            if not metadata:
+            if not module:
                 return True
 
+            module_data = self.neo4j.analyze_file(file_path, self.source_path)
+            if not module_data:
+                raise RuntimeError("анализ зависимостей не выполнен")
+
             # Индексация в Neo4j
-            self.neo4j.index_module(metadata)
+            self.neo4j.load_module_to_neo4j(module_data, self.project_id)
+            self.neo4j.create_function_calls_relationships(module_data)
 
             return True
 
@@ -352,6 +363,10 @@ class FullDatasetIndexer:
             # Обработка батча
             batch_stats = await self._process_batch(batch)
 
+            # Граф изменился - кеши аналитики перечитают его
+            if batch_stats['neo4j_success']:
+                bump_graph_version(self.neo4j.driver)
+
             # Вывод прогресса
             self._print_progress(batch_stats)
 
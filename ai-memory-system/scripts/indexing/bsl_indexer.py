@@ -17,6 +17,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from services.embedding_service import EmbeddingService
 from utils.bsl_parser import BSLParser, BSLModule
+from services.parse_cache import ParseCache
 
 logging.basicConfig(
     level=logging.INFO,
@@ -60,6 +61,7 @@ class BSLIndexer:
 
         self.embedding_service = EmbeddingService(model=embedding_model)
         self.parser = BSLParser()
+        self.parse_cache = ParseCache(parser=self.parser)
 
         self.indexed_files: List[IndexedFile] = []
 
@@ -126,7 +128,7 @@ class BSLIndexer:
         """
         try:
             # Парсинг файла
-            module = self.parser.parse_file(file_path)
+            module = self.parse_cache.parse_file(file_path)
             if not module:
                 logger.warning(f"Не удалось распарсить: {file_path}")
                 return False
@@ -27,6 +27,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from services.embedding_service import EmbeddingService
 from utils.bsl_parser import BSLParser, BSLModule
+from services.parse_cache import ParseCache
 
 # Конфигурация логирования
 log_dir = Path(__file__).parent.parent.parent / "logs"
@@ -119,6 +120,7 @@ class AsyncBSLIndexer:
 
         self.embedding_service = EmbeddingService(model=embedding_model)
         self.parser = BSLParser()
+        self.parse_cache = ParseCache(parser=self.parser)
 
         self.batch_size = batch_size
         self.max_workers = max_workers
@@ -261,7 +263,7 @@ class AsyncBSLIndexer:
         for attempt in range(1, self.retry_attempts + 1):
             try:
                 # Парсинг файла
-                module = self.parser.parse_file(file_path)
+                module = self.parse_cache.parse_file(file_path)
                 if not module:
                     logger.warning(f"⚠️  Не удалось распарсить: {Path(file_path).name}")
                     return False
@@ -80,10 +80,13 @@ def parse_bsl_file_worker(file_path: str) -> Dict:
 
     try:
         # Import inside worker to avoid pickle issues
-        from utils.bsl_parser import BSLParser
+        from services.parse_cache import get_parse_cache
 
-        parser = BSLParser()
-        metadata = parser.parse_file(file_path)
+        # One parse cache (and parser) per pool process;
+        # unchanged content is not parsed again
+        parse_cache = get_parse_cache()
+        parser = parse_cache.parser
+        metadata = parse_cache.parse_file(file_path)
 
         if not metadata or not metadata.functions:
             return {
@@ -95,13 +98,14 @@ def parse_bsl_file_worker(file_path: str) -> Dict:
             }
 
         # Extract searchable text
+        # Only this text and counters leave the worker: the module itself
+        # (shared source + body offsets) is never pickled back
         searchable_text = parser.extract_searchable_text(metadata)
 
         result_metadata = {
             'module_type': metadata.module_type,
             'functions_count': len(metadata.functions),
-            'variables_count': len(metadata.variables),
-            'searchable_text': searchable_text[:500]
+            'variables_count': len(metadata.variables)
         }
 
         return {
@@ -214,6 +218,9 @@ class HybridIndexer:
 
                 try:
                     result = future.result(timeout=30)
+                    if result['status'] == 'success':
+                        # Preview is cut here to avoid sending the text twice
+                        result['metadata']['searchable_text'] = result['searchable_text'][:500]
                     parsed_results.append(result)
                     completed += 1
 
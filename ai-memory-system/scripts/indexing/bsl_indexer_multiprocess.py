@@ -58,12 +58,13 @@ def process_file_worker(file_path: str, ollama_timeout: int = 90, use_cache: boo
 
     try:
         # Import inside worker to avoid pickle issues
-        from utils.bsl_parser import BSLParser
+        from services.parse_cache import get_parse_cache
         from services.embedding_service import EmbeddingService
         from services.embedding_cache import EmbeddingCache
 
         # Initialize services (separate instance per process)
-        parser = BSLParser()
+        parse_cache = get_parse_cache()
+        parser = parse_cache.parser
         embedding_service = EmbeddingService(
             ollama_host="http://localhost:11434",
             model="nomic-embed-text:latest",
@@ -88,8 +89,8 @@ def process_file_worker(file_path: str, ollama_timeout: int = 90, use_cache: boo
                     'cached': True
                 }
 
-        # Parse file
-        metadata = parser.parse_file(file_path)
+        # Parse file (unchanged content is taken from parse cache)
+        metadata = parse_cache.parse_file(file_path)
 
         if not metadata or not metadata.functions:
             return {
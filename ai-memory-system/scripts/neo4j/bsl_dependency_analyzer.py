@@ -10,11 +10,15 @@ BSL Dependency Analyzer
 - Зависимости между модулями
 """
 
-import re
+import os
 import uuid
 import hashlib
+import threading
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict, Set, Optional, Tuple
+from queue import Queue
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Set, Optional, Tuple, Iterator
 from datetime import datetime
 import logging
 import json
@@ -25,10 +29,37 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from neo4j import GraphDatabase
 from utils.bsl_parser import BSLParser
+from services.parse_cache import ParseCache
+from services.graph_paths import normalize_module_path
+from services.graph_version import bump_graph_version
+from utils.bsl_call_finder import BSLCallFinder
+from utils.bsl_symbol_table import BSLSymbolTable, split_module_path
+from scripts.neo4j.bsl_graph_loader import (
+    BSLGraphBulkLoader,
+    BSLGraphIncrementalLoader,
+    delete_placeholder_methods
+)
+from scripts.neo4j.bsl_graph_export import BSLGraphCsvExporter
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Анализатор процесса пула (без подключения к Neo4j), создается инициализатором
+_worker_analyzer = None
+
+
+def _init_analysis_worker(symbol_table: Optional[BSLSymbolTable] = None):
+    """Инициализация процесса пула анализа (таблица символов передается один раз)"""
+    global _worker_analyzer
+    logging.getLogger('utils.bsl_parser').setLevel(logging.WARNING)
+    _worker_analyzer = BSLDependencyAnalyzer(neo4j_uri=None)
+    _worker_analyzer.symbol_table = symbol_table
+
+
+def _analyze_file_worker(file_path: str, project_root: str) -> Optional[Dict]:
+    """Анализ файла в процессе пула (парсинг, поиск вызовов, хеширование)"""
+    return _worker_analyzer.analyze_file(Path(file_path), Path(project_root))
+
 
 class BSLDependencyAnalyzer:
     """Анализатор зависимостей BSL кода"""
@@ -38,12 +69,15 @@ class BSLDependencyAnalyzer:
         Инициализация анализатора
 
         Args:
-            neo4j_uri: URI подключения к Neo4j
+            neo4j_uri: URI подключения к Neo4j (None - только анализ, без подключения)
             neo4j_user: Пользователь Neo4j
             neo4j_password: Пароль Neo4j
         """
         self.parser = BSLParser()
-        self.driver = GraphDatabase.driver(neo4j_uri, auth=(neo4j_user, neo4j_password))
+        self.parse_cache = ParseCache(parser=self.parser)
+        self.driver = GraphDatabase.driver(neo4j_uri, auth=(neo4j_user, neo4j_password)) if neo4j_uri else None
+        # Экспортные методы общих модулей (build_symbol_table) для вызовов Модуль.Метод()
+        self.symbol_table: Optional[BSLSymbolTable] = None
         logger.info(f"✅ BSLDependencyAnalyzer инициализирован")
 
     def close(self):
@@ -110,48 +144,91 @@ class BSLDependencyAnalyzer:
         else:
             return 'Unknown'
 
-    def _find_function_calls(self, function_name: str, function_body: str, all_functions: List) -> List[Dict]:
+    def _find_function_calls(self, function_name: str, function_body: str, all_functions: List,
+                             call_finder: Optional[BSLCallFinder] = None) -> List[Dict]:
         """
         Поиск вызовов функций в теле функции
 
+        Один проход по идентификаторам тела с проверкой по хеш-таблице
+        имен методов модуля (см. utils/bsl_call_finder.py).
+
         Args:
             function_name: Имя анализируемой функции
             function_body: Тело функции
             all_functions: Список всех доступных функций (BSLFunction objects)
+            call_finder: Готовый индекс имен модуля (строится по all_functions, если не передан)
 
         Returns:
             Список вызовов
         """
-        calls = []
+        if call_finder is None:
+            call_finder = BSLCallFinder(all_functions)
 
-        for func in all_functions:
-            target_name = func.name
+        return call_finder.find_calls(function_name, function_body)
 
-            # Пропускаем саму функцию
-            if target_name == function_name:
+    @staticmethod
+    def _resolve_call_targets(calls: List[Dict], method_ids: Dict[str, Tuple[str, str]]):
+        """
+        Добавление к вызовам метки и ID целевого метода
+
+        Args:
+            calls: Вызовы из _find_function_calls
+            method_ids: Имя метода -> (метка узла, ID)
+        """
+        for call in calls:
+            if call.get('target_id'):
+                # Вызов метода общего модуля - уже разрешен по таблице символов
                 continue
+            target = method_ids.get(call['target_function'])
+            if target:
+                call['target_label'], call['target_id'] = target
+
+    def build_symbol_table(self, bsl_files: List[Path], project_root: Path) -> BSLSymbolTable:
+        """
+        Построение таблицы экспортных методов общих модулей
+
+        Читаются только файлы CommonModules (разбор берется из кеша).
+        ID методов совпадают с ID, которые analyze_file дает узлам.
 
-            # Паттерн для поиска вызова функции
-            # Ищем: ИмяФункции(...) или Результат = ИмяФункции(...)
-            pattern = rf'\b{re.escape(target_name)}\s*\('
+        Args:
+            bsl_files: Файлы проекта
+            project_root: Корневая директория проекта
 
-            matches = list(re.finditer(pattern, function_body, re.IGNORECASE))
+        Returns:
+            Таблица символов (также сохраняется в self.symbol_table)
+        """
+        symbol_table = BSLSymbolTable()
 
-            if matches:
-                # Находим номера строк вызовов
-                line_numbers = []
-                for match in matches:
-                    # Подсчет строк до позиции match
-                    lines_before = function_body[:match.start()].count('\n')
-                    line_numbers.append(lines_before + 1)
+        for file_path in bsl_files:
+            relative_path = file_path.relative_to(project_root)
+            config_root, collection, module_name = split_module_path(relative_path)
+            if collection != 'CommonModules' or not module_name:
+                continue
 
-                calls.append({
-                    'target_function': target_name,
-                    'call_count': len(matches),
-                    'line_numbers': line_numbers
-                })
+            parsed = self.parse_cache.parse_file(str(file_path))
+            if not parsed:
+                continue
+
+            for method in parsed.functions:
+                if not method.is_export:
+                    continue
+                if method.type.lower() in ['функция', 'function']:
+                    label, prefix = 'Function', 'function'
+                else:
+                    label, prefix = 'Procedure', 'procedure'
+                symbol_table.add_export(
+                    config_root, module_name, method.name, label,
+                    self._generate_id(prefix, relative_path, method.name)
+                )
+
+        stats = symbol_table.get_stats()
+        logger.info(
+            f"   Таблица символов: {stats['modules']} общих модулей, "
+            f"{stats['exports']} экспортных методов"
+        )
 
-        return calls
+        self.symbol_table = symbol_table
+        return symbol_table
 
     def analyze_file(self, file_path: Path, project_root: Path) -> Dict:
         """
@@ -165,16 +242,14 @@ class BSLDependencyAnalyzer:
             Словарь с данными для Neo4j
         """
         try:
-            # Чтение файла
-            with open(file_path, 'r', encoding='utf-8-sig') as f:
-                content = f.read()
-
-            # Парсинг BSL кода
-            parsed = self.parser.parse_file(str(file_path))
+            # Парсинг BSL кода (неизмененный файл берется из кеша разбора)
+            parsed = self.parse_cache.parse_file(str(file_path))
 
             if not parsed:
                 return None
 
+            content = parsed.source
+
             # Относительный путь
             relative_path = file_path.relative_to(project_root)
 
@@ -187,17 +262,33 @@ class BSLDependencyAnalyzer:
                 'id': self._generate_id('module', relative_path),
                 'name': file_path.stem,
                 'file_path': str(relative_path).replace('\\', '/'),
+                'path_key': normalize_module_path(relative_path),
                 'module_type': parsed.module_type,
                 'functions_count': len(functions_list),
                 'procedures_count': len(procedures_list),
                 'variables_count': len(parsed.variables),
-                'lines_count': len(content.split('\n')),
+                'lines_count': content.count('\n') + 1,
                 'file_size': file_path.stat().st_size,
-                'content_hash': self._calculate_file_hash(file_path),
+                'content_hash': parsed.content_hash,
                 'indexed_at': datetime.now().isoformat(),
                 'is_export': False  # TODO: определить по содержимому
             }
 
+            # Индекс имен методов модуля - один на все функции и процедуры
+            config_root = split_module_path(relative_path)[0]
+            call_finder = BSLCallFinder(
+                parsed.functions,
+                self.symbol_table.scope(config_root) if self.symbol_table else None
+            )
+
+            # ID методов модуля: цель вызова известна при анализе,
+            # в графе она ищется по индексированному id, а не по имени
+            method_ids = {}
+            for proc in procedures_list:
+                method_ids[proc.name] = ('Procedure', self._generate_id('procedure', relative_path, proc.name))
+            for func in functions_list:
+                method_ids[func.name] = ('Function', self._generate_id('function', relative_path, func.name))
+
             # Функции с детальным анализом
             functions = []
 
@@ -210,12 +301,14 @@ class BSLDependencyAnalyzer:
                 if func.is_export:
                     signature += " Экспорт"
 
-                # Поиск вызовов в теле функции
-                calls = self._find_function_calls(
+                # Поиск вызовов в теле функции (без копирования тела)
+                calls = call_finder.find_calls(
                     func.name,
-                    func.body,
-                    parsed.functions
+                    parsed.source,
+                    func.body_start,
+                    func.body_end
                 )
+                self._resolve_call_targets(calls, method_ids)
 
                 functions.append({
                     'id': func_id,
@@ -240,11 +333,13 @@ class BSLDependencyAnalyzer:
                     signature += " Экспорт"
 
                 # Поиск вызовов
-                calls = self._find_function_calls(
+                calls = call_finder.find_calls(
                     proc.name,
-                    proc.body,
-                    parsed.functions
+                    parsed.source,
+                    proc.body_start,
+                    proc.body_end
                 )
+                self._resolve_call_targets(calls, method_ids)
 
                 procedures.append({
                     'id': proc_id,
@@ -296,6 +391,7 @@ class BSLDependencyAnalyzer:
                 MERGE (m:Module {id: $module_id})
                 SET m.name = $name,
                     m.file_path = $file_path,
+                    m.path_key = $path_key,
                     m.module_type = $module_type,
                     m.functions_count = $functions_count,
                     m.procedures_count = $procedures_count,
@@ -311,6 +407,7 @@ class BSLDependencyAnalyzer:
                 module_id=mod['id'],
                 name=mod['name'],
                 file_path=mod['file_path'],
+                path_key=mod['path_key'],
                 module_type=mod['module_type'],
                 functions_count=mod['functions_count'],
                 procedures_count=mod['procedures_count'],
@@ -402,18 +499,18 @@ class BSLDependencyAnalyzer:
             # Обработка вызовов из функций
             for func in module_data.get('functions', []):
                 for call in func.get('calls', []):
-                    session.run("""
-                        MATCH (source:Function {id: $source_id})
-                        MATCH (target)
-                        WHERE target.name = $target_name
-                          AND (target:Function OR target:Procedure)
+                    if not call.get('target_id'):
+                        continue
+                    session.run(f"""
+                        MATCH (source:Function {{id: $source_id}})
+                        MERGE (target:{call['target_label']} {{id: $target_id}})
                         MERGE (source)-[c:CALLS]->(target)
                         SET c.call_count = $call_count,
                             c.line_numbers = $line_numbers,
                             c.is_conditional = false
                     """,
                         source_id=func['id'],
-                        target_name=call['target_function'],
+                        target_id=call['target_id'],
                         call_count=call['call_count'],
                         line_numbers=call['line_numbers']
                     )
@@ -421,18 +518,18 @@ class BSLDependencyAnalyzer:
             # Обработка вызовов из процедур
             for proc in module_data.get('procedures', []):
                 for call in proc.get('calls', []):
-                    session.run("""
-                        MATCH (source:Procedure {id: $source_id})
-                        MATCH (target)
-                        WHERE target.name = $target_name
-                          AND (target:Function OR target:Procedure)
+                    if not call.get('target_id'):
+                        continue
+                    session.run(f"""
+                        MATCH (source:Procedure {{id: $source_id}})
+                        MERGE (target:{call['target_label']} {{id: $target_id}})
                         MERGE (source)-[c:CALLS]->(target)
                         SET c.call_count = $call_count,
                             c.line_numbers = $line_numbers,
                             c.is_conditional = false
                     """,
                         source_id=proc['id'],
-                        target_name=call['target_function'],
+                        target_id=call['target_id'],
                         call_count=call['call_count'],
                         line_numbers=call['line_numbers']
                     )
@@ -466,14 +563,86 @@ class BSLDependencyAnalyzer:
         logger.info(f"✅ Проект: {project_name} (ID: {project_id})")
         return project_id
 
-    def analyze_project(self, project_path: Path, project_name: str = None, max_files: int = None):
+    def _analyze_files(self, bsl_files: List[Path], project_path: Path,
+                       workers: Optional[int] = None, max_pending: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Анализ файлов в пуле процессов
+
+        В работе одновременно не больше max_pending файлов: новый файл
+        отправляется в пул только после получения результата, поэтому
+        память не растет с размером проекта. Порядок результатов -
+        по мере готовности.
+
+        Args:
+            bsl_files: Файлы для анализа
+            project_path: Корень проекта
+            workers: Количество процессов (по умолчанию - по числу ядер, 1 - без пула)
+            max_pending: Максимум файлов в работе (по умолчанию - workers * 4)
+
+        Yields:
+            Результаты analyze_file (файлы с ошибками пропускаются)
+        """
+        workers = workers or os.cpu_count() or 1
+        total = len(bsl_files)
+
+        if workers == 1:
+            for i, file_path in enumerate(bsl_files, 1):
+                if i % 100 == 0:
+                    logger.info(f"   [{i}/{total}]")
+                module_data = self.analyze_file(file_path, project_path)
+                if module_data:
+                    yield module_data
+            return
+
+        files = iter(bsl_files)
+        project_root = str(project_path)
+        completed = 0
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_analysis_worker,
+                                 initargs=(self.symbol_table,)) as executor:
+            pending = {
+                executor.submit(_analyze_file_worker, str(file_path), project_root)
+                for file_path in islice(files, max_pending or workers * 4)
+            }
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    next_file = next(files, None)
+                    if next_file is not None:
+                        pending.add(executor.submit(_analyze_file_worker, str(next_file), project_root))
+
+                    completed += 1
+                    if completed % 100 == 0:
+                        logger.info(f"   [{completed}/{total}]")
+
+                    try:
+                        module_data = future.result()
+                    except Exception as e:
+                        logger.error(f"Ошибка анализа в пуле процессов: {e}")
+                        continue
+
+                    if module_data:
+                        yield module_data
+
+    def analyze_project(self, project_path: Path, project_name: str = None, max_files: int = None,
+                        bulk: bool = True, batch_size: int = 5000,
+                        workers: Optional[int] = None, queue_size: int = 256):
         """
         Анализ всего проекта
 
+        Анализ файлов идет в пуле процессов, результаты через ограниченную
+        очередь передаются единственному потоку записи в Neo4j.
+
         Args:
             project_path: Путь к корню проекта
             project_name: Название проекта (по умолчанию - имя директории)
             max_files: Максимальное количество файлов для анализа
+            bulk: Пакетная загрузка (UNWIND) вместо запроса на каждый узел и вызов
+            batch_size: Строк в одной транзакции пакетной загрузки
+            workers: Процессов анализа (по умолчанию - по числу ядер, 1 - без пула)
+            queue_size: Максимум проанализированных модулей, ожидающих записи
         """
         project_path = Path(project_path)
 
@@ -494,24 +663,212 @@ class BSLDependencyAnalyzer:
 
         logger.info(f"   Найдено BSL файлов: {len(bsl_files)}")
 
+        # Экспортные методы общих модулей - до анализа вызовов
+        self.build_symbol_table(bsl_files, project_path)
+
+        loader = None
+        if bulk:
+            loader = BSLGraphBulkLoader(self.driver, batch_size=batch_size)
+            loader.ensure_schema()
+
+        # Единственный писатель: читает очередь до None
+        write_queue: Queue = Queue(maxsize=queue_size)
+        writer_errors = []
+
+        def write_modules():
+            done = False
+            try:
+                while True:
+                    module_data = write_queue.get()
+                    if module_data is None:
+                        done = True
+                        break
+
+                    if loader:
+                        # Строки копятся и пишутся пачками UNWIND
+                        loader.add_module(module_data, project_id)
+                    else:
+                        # Загрузка в Neo4j
+                        self.load_module_to_neo4j(module_data, project_id)
+
+                        # Создание связей вызовов
+                        self.create_function_calls_relationships(module_data)
+
+                if loader:
+                    loader.flush()
+
+            except Exception as e:
+                writer_errors.append(e)
+                # Разбор очереди до конца, чтобы анализ не заблокировался на put
+                # (ошибка последнего flush - None уже прочитан, ждать нечего)
+                while not done and write_queue.get() is not None:
+                    pass
+
+        writer = threading.Thread(target=write_modules, name="neo4j-writer", daemon=True)
+        writer.start()
+
         # Анализ файлов
         analyzed = 0
-        for i, file_path in enumerate(bsl_files, 1):
-            logger.info(f"   [{i}/{len(bsl_files)}] {file_path.name}")
+        try:
+            for module_data in self._analyze_files(bsl_files, project_path, workers=workers):
+                if writer_errors:
+                    break
+                write_queue.put(module_data)
+                analyzed += 1
+        finally:
+            write_queue.put(None)
+            writer.join()
+
+        if writer_errors:
+            raise writer_errors[0]
+
+        # Вызовы модулей, не вошедших в загрузку, не оставляют пустых узлов
+        delete_placeholder_methods(self.driver)
+
+        # Кеши аналитики перестраиваются по новой версии графа
+        bump_graph_version(self.driver)
+
+        if loader:
+            stats = loader.get_stats()
+            logger.info(
+                f"   Загружено: {stats['modules']} модулей, {stats['functions']} функций, "
+                f"{stats['procedures']} процедур, {stats['variables']} переменных, "
+                f"{stats['calls']} вызовов за {stats['transactions']} транзакций "
+                f"({stats['write_time_s']:.1f}s)"
+            )
+
+        logger.info(f"✅ Анализ завершен. Обработано файлов: {analyzed}/{len(bsl_files)}")
 
-            # Анализ файла
-            module_data = self.analyze_file(file_path, project_path)
+    def update_project(self, project_path: Path, changed_files: List[str], deleted_files: List[str] = None,
+                       project_name: str = None, batch_size: int = 5000,
+                       workers: Optional[int] = None) -> Dict:
+        """
+        Инкрементальное обновление графа проекта
 
-            if module_data:
-                # Загрузка в Neo4j
-                self.load_module_to_neo4j(module_data, project_id)
+        Пересобираются только подграфы измененных модулей
+        (BSLGraphIncrementalLoader), удаленные модули убираются из графа.
+        Таблица символов строится по всем общим модулям проекта
+        (неизмененные берутся из кеша разбора).
 
-                # Создание связей вызовов
-                self.create_function_calls_relationships(module_data)
+        Args:
+            project_path: Путь к корню проекта
+            changed_files: Добавленные и измененные .bsl файлы (IncrementalIndexer.get_files_to_index)
+            deleted_files: Удаленные .bsl файлы (IncrementalIndexer.get_deleted_files)
+            project_name: Название проекта (по умолчанию - имя директории)
+            batch_size: Строк в одной транзакции
+            workers: Процессов анализа (по умолчанию - без пула для небольших изменений)
 
-                analyzed += 1
+        Returns:
+            Статистика загрузчика
+        """
+        project_path = Path(project_path).resolve()
 
-        logger.info(f"✅ Анализ завершен. Обработано файлов: {analyzed}/{len(bsl_files)}")
+        if not project_name:
+            project_name = project_path.name
+
+        def in_project(paths):
+            files = []
+            for file_path in paths or []:
+                file_path = Path(file_path).resolve()
+                try:
+                    file_path.relative_to(project_path)
+                except ValueError:
+                    continue
+                files.append(file_path)
+            return sorted(files)
+
+        changed = in_project(changed_files)
+        deleted = in_project(deleted_files)
+
+        logger.info(f"🔄 Обновление графа: {project_name}")
+        logger.info(f"   Изменено файлов: {len(changed)}, удалено: {len(deleted)}")
+
+        project_id = self.create_or_get_project(project_name, project_path)
+
+        # Вызовы Модуль.Метод() разрешаются по всем общим модулям проекта
+        self.build_symbol_table(list(project_path.rglob("*.bsl")), project_path)
+        exported_ids = {method.id: method.label for method in self.symbol_table.exports()}
+
+        loader = BSLGraphIncrementalLoader(self.driver, exported_ids, batch_size=batch_size)
+        loader.ensure_schema()
+
+        for file_path in deleted:
+            loader.remove_module(self._generate_id('module', file_path.relative_to(project_path)))
+
+        # Пул процессов окупается только на крупных изменениях
+        if workers is None and len(changed) <= 100:
+            workers = 1
+
+        for module_data in self._analyze_files(changed, project_path, workers=workers):
+            loader.add_module(module_data, project_id)
+        loader.flush()
+        delete_placeholder_methods(self.driver)
+        bump_graph_version(self.driver)
+
+        stats = loader.get_stats()
+        logger.info(
+            f"   Заменено модулей: {stats['modules']}, удалено: {stats['modules_removed']}, "
+            f"входящих вызовов восстановлено: {stats['incoming_relinked']}, "
+            f"снято: {stats['incoming_dropped']} "
+            f"({stats['transactions']} транзакций, {stats['write_time_s']:.1f}s)"
+        )
+        return stats
+
+    def export_project(self, project_path: Path, output_dir: Path, project_name: str = None,
+                       max_files: int = None, database: str = "neo4j",
+                       workers: Optional[int] = None) -> str:
+        """
+        Выгрузка графа проекта в CSV для neo4j-admin database import
+
+        Используется для первичной сборки графа нового снимка; Neo4j при этом
+        не затрагивается. Инкрементальные обновления - через update_project.
+
+        Args:
+            project_path: Путь к корню проекта
+            output_dir: Директория для CSV файлов
+            project_name: Название проекта (по умолчанию - имя директории)
+            max_files: Максимальное количество файлов для анализа
+            database: Имя базы для команды импорта
+            workers: Процессов анализа (по умолчанию - по числу ядер, 1 - без пула)
+
+        Returns:
+            Команды импорта выгруженных файлов (neo4j-admin) и пост-обработки
+            после запуска Neo4j (cypher-shell)
+        """
+        project_path = Path(project_path)
+
+        if not project_name:
+            project_name = project_path.name
+
+        logger.info(f"📦 Экспорт проекта в CSV: {project_name}")
+        logger.info(f"   Путь: {project_path}")
+
+        # ID проекта - тот же, что создает create_or_get_project
+        project_id = self._generate_id('project', project_name)
+
+        bsl_files = list(project_path.rglob("*.bsl"))
+
+        if max_files:
+            bsl_files = bsl_files[:max_files]
+
+        logger.info(f"   Найдено BSL файлов: {len(bsl_files)}")
+
+        self.build_symbol_table(bsl_files, project_path)
+
+        exporter = BSLGraphCsvExporter(output_dir)
+        try:
+            exporter.add_project(project_id, project_name, str(project_path))
+
+            for module_data in self._analyze_files(bsl_files, project_path, workers=workers):
+                exporter.add_module(module_data, project_id)
+        finally:
+            exporter.close()
+
+        command = exporter.import_command(database)
+        post_import = exporter.post_import_command(database)
+        logger.info(f"   Команда импорта:\n{command}")
+        logger.info(f"   После запуска Neo4j:\n{post_import}")
+        return f"{command}\n\n# После запуска Neo4j\n{post_import}"
 
 
 def main():
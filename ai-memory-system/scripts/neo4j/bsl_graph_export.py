@@ -0,0 +1,320 @@
+"""
+BSL Graph CSV Export
+Выгрузка графа BSL в CSV для офлайн-импорта (neo4j-admin database import)
+
+Первичная сборка графа нового снимка конфигурации через транзакционный
+Cypher идет файл за файлом; офлайн-импорт из CSV быстрее на порядки.
+Транзакционная загрузка (BSLGraphIncrementalLoader) остается для инкрементальных
+обновлений.
+
+Файлы (заголовок - первая строка каждого файла):
+- nodes_project.csv, nodes_module.csv, nodes_function.csv,
+  nodes_procedure.csv, nodes_variable.csv
+- nodes_graph_meta.csv - версия графа (services/graph_version.py)
+- rels_contains.csv, rels_calls.csv
+- post_import.cypher - выполняется после запуска Neo4j (post_import_command):
+  constraints и индекс path_key, как у BSLGraphBulkLoader.ensure_schema, и
+  пустые массивы parameters. Пустое поле CSV neo4j-admin импортирует как
+  отсутствующее свойство, а пакетная загрузка пишет parameters: [] -
+  без этого шага size(f.parameters) для метода без параметров был бы null.
+
+ID узлов (module-..., function-...) уникальны глобально, поэтому
+используется одно пространство ID без групп.
+
+Запуск:
+    python scripts/neo4j/bsl_graph_export.py <project_path> <output_dir>
+"""
+
+import csv
+import sys
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Добавление путей для импорта
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from services.graph_version import GRAPH_META_ID, new_graph_version
+from scripts.neo4j.bsl_graph_loader import ID_CONSTRAINTS, METHOD_LABELS, PATH_KEY_INDEX
+
+logger = logging.getLogger(__name__)
+
+# Разделитель элементов массивов: в параметрах BSL встречаются ";" и ","
+ARRAY_DELIMITER = '\x1f'
+ARRAY_DELIMITER_ARG = 'U+001F'
+
+NODE_FILES = {
+    'Project': ('nodes_project.csv', ['id:ID', 'name', 'path', 'indexed_at:datetime', ':LABEL']),
+    'Module': ('nodes_module.csv', [
+        'id:ID', 'name', 'file_path', 'path_key', 'module_type', 'functions_count:int',
+        'procedures_count:int', 'variables_count:int', 'lines_count:int',
+        'file_size:long', 'content_hash', 'indexed_at:datetime', 'is_export:boolean', ':LABEL'
+    ]),
+    'Function': ('nodes_function.csv', [
+        'id:ID', 'name', 'signature', 'parameters:string[]', 'is_export:boolean',
+        'line_start:int', 'line_end:int', 'calls_count:int', ':LABEL'
+    ]),
+    'Procedure': ('nodes_procedure.csv', [
+        'id:ID', 'name', 'signature', 'parameters:string[]', 'is_export:boolean',
+        'line_start:int', 'line_end:int', 'calls_count:int', ':LABEL'
+    ]),
+    'Variable': ('nodes_variable.csv', [
+        'id:ID', 'name', 'scope', 'is_export:boolean', 'line_number:int', ':LABEL'
+    ]),
+    'GraphMeta': ('nodes_graph_meta.csv', ['id:ID', 'version:long', 'updated_at:datetime', ':LABEL']),
+}
+
+POST_IMPORT_FILE = 'post_import.cypher'
+
+# Массивы, которые у метода могут быть пустыми (line_numbers вызова - не пустые)
+EMPTY_ARRAYS_QUERY = "MATCH (n:{label}) WHERE n.parameters IS NULL SET n.parameters = []"
+
+RELATIONSHIP_FILES = {
+    'CONTAINS': ('rels_contains.csv', [':START_ID', ':END_ID', 'created_at:datetime', ':TYPE']),
+    'CALLS': ('rels_calls.csv', [
+        ':START_ID', ':END_ID', 'call_count:int', 'line_numbers:int[]',
+        'is_conditional:boolean', ':TYPE'
+    ]),
+}
+
+
+def _bool(value) -> str:
+    """Булево значение в формате neo4j-admin"""
+    return 'true' if value else 'false'
+
+
+def _array(values: List) -> str:
+    """Массив в одном поле CSV"""
+    return ARRAY_DELIMITER.join(str(value) for value in values)
+
+
+class BSLGraphCsvExporter:
+    """
+    Потоковая запись графа BSL в CSV для neo4j-admin
+
+    Интерфейс совпадает с BSLGraphBulkLoader (add_module), строки пишутся
+    сразу в файлы - память не растет с размером конфигурации.
+
+    Использование:
+        exporter = BSLGraphCsvExporter("export/graph")
+        exporter.add_project(project_id, name, path)
+        for module_data in ...:
+            exporter.add_module(module_data, project_id)
+        exporter.close()
+        print(exporter.import_command())
+    """
+
+    def __init__(self, output_dir: str, indexed_at: Optional[str] = None):
+        """
+        Args:
+            output_dir: Директория для CSV файлов
+            indexed_at: Время индексации (ISO) для CONTAINS.created_at и проекта
+        """
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.indexed_at = indexed_at or datetime.now().isoformat()
+
+        self._files = []
+        self.writers: Dict = {}
+        for kind, (file_name, header) in {**NODE_FILES, **RELATIONSHIP_FILES}.items():
+            f = open(self.output_dir / file_name, 'w', encoding='utf-8', newline='')
+            writer = csv.writer(f)
+            writer.writerow(header)
+            self._files.append(f)
+            self.writers[kind] = writer
+
+        # Одинаковые имена методов в одном модуле (ветки #Если) дают один ID,
+        # повторяющиеся узлы и связи neo4j-admin считает ошибкой
+        self._seen_ids = set()
+        self._seen_calls = set()
+
+        self.stats = {kind.lower(): 0 for kind in NODE_FILES}
+        self.stats.update({'contains': 0, 'calls': 0, 'duplicates_skipped': 0})
+
+    def _node(self, kind: str, row: List) -> bool:
+        """Запись узла (повторный ID пропускается)"""
+        node_id = row[0]
+        if node_id in self._seen_ids:
+            self.stats['duplicates_skipped'] += 1
+            return False
+
+        self._seen_ids.add(node_id)
+        self.writers[kind].writerow(row + [kind])
+        self.stats[kind.lower()] += 1
+        return True
+
+    def _contains(self, parent_id: str, child_id: str):
+        """Запись связи CONTAINS"""
+        self.writers['CONTAINS'].writerow([parent_id, child_id, self.indexed_at, 'CONTAINS'])
+        self.stats['contains'] += 1
+
+    def add_project(self, project_id: str, name: str, path: str):
+        """
+        Запись узла проекта
+
+        Args:
+            project_id: ID проекта
+            name: Название проекта
+            path: Путь к проекту
+        """
+        self._node('Project', [project_id, name, path, self.indexed_at])
+
+    def add_module(self, module_data: Dict, project_id: str):
+        """
+        Запись модуля, его методов, переменных и вызовов
+
+        Args:
+            module_data: Результат BSLDependencyAnalyzer.analyze_file
+            project_id: ID проекта
+        """
+        mod = module_data['module']
+        module_id = mod['id']
+
+        if not self._node('Module', [
+            module_id, mod['name'], mod['file_path'], mod['path_key'], mod['module_type'],
+            mod['functions_count'], mod['procedures_count'], mod['variables_count'],
+            mod['lines_count'], mod['file_size'], mod['content_hash'],
+            mod['indexed_at'], _bool(mod['is_export'])
+        ]):
+            return
+        self._contains(project_id, module_id)
+
+        for label, key in (('Function', 'functions'), ('Procedure', 'procedures')):
+            for method in module_data.get(key, []):
+                calls = method.get('calls', [])
+                if not self._node(label, [
+                    method['id'], method['name'], method['signature'],
+                    _array(method['parameters']), _bool(method['is_export']),
+                    method['line_start'], method['line_end'], len(calls)
+                ]):
+                    continue
+                self._contains(module_id, method['id'])
+
+                for call in calls:
+                    target_id = call.get('target_id')
+                    if not target_id or (method['id'], target_id) in self._seen_calls:
+                        continue
+                    self._seen_calls.add((method['id'], target_id))
+                    self.writers['CALLS'].writerow([
+                        method['id'], target_id, call['call_count'],
+                        _array(call['line_numbers']), 'false', 'CALLS'
+                    ])
+                    self.stats['calls'] += 1
+
+        for var in module_data.get('variables', []):
+            if self._node('Variable', [
+                var['id'], var['name'], var['scope'],
+                _bool(var['is_export']), var['line_number']
+            ]):
+                self._contains(module_id, var['id'])
+
+    def close(self):
+        """Закрытие CSV файлов (последней пишется версия графа)"""
+        if not self._files:
+            return
+
+        self._node('GraphMeta', [GRAPH_META_ID, new_graph_version(), self.indexed_at])
+
+        for f in self._files:
+            f.close()
+        self._files = []
+
+        statements = ID_CONSTRAINTS + [PATH_KEY_INDEX] + [
+            EMPTY_ARRAYS_QUERY.format(label=label) for label in METHOD_LABELS
+        ]
+        with open(self.output_dir / POST_IMPORT_FILE, 'w', encoding='utf-8') as f:
+            f.write(''.join(f"{statement};\n" for statement in statements))
+
+        logger.info(
+            f"✅ CSV экспорт: {self.stats['module']} модулей, {self.stats['function']} функций, "
+            f"{self.stats['procedure']} процедур, {self.stats['variable']} переменных, "
+            f"{self.stats['calls']} вызовов -> {self.output_dir}"
+        )
+
+    def import_command(self, database: str = "neo4j") -> str:
+        """
+        Команда офлайн-импорта (Neo4j 5, база должна быть остановлена)
+
+        Args:
+            database: Имя базы данных
+
+        Returns:
+            Строка команды neo4j-admin
+        """
+        parts = ["neo4j-admin database import full"]
+        for kind, (file_name, _) in NODE_FILES.items():
+            parts.append(f"--nodes={kind}={self.output_dir.resolve() / file_name}")
+        for kind, (file_name, _) in RELATIONSHIP_FILES.items():
+            parts.append(f"--relationships={kind}={self.output_dir.resolve() / file_name}")
+        parts.append(f"--array-delimiter={ARRAY_DELIMITER_ARG}")
+        parts.append("--multiline-fields=true")
+        # Вызов метода общего модуля, не попавшего в выгрузку (max_files)
+        parts.append("--skip-bad-relationships=true")
+        parts.append("--overwrite-destination=true")
+        parts.append(database)
+        return " \\\n    ".join(parts)
+
+    def post_import_command(self, database: str = "neo4j") -> str:
+        """
+        Команда пост-обработки после импорта (Neo4j запущен)
+
+        Args:
+            database: Имя базы данных
+
+        Returns:
+            Строка команды cypher-shell
+        """
+        return f"cypher-shell -d {database} -f {self.output_dir.resolve() / POST_IMPORT_FILE}"
+
+    def get_stats(self) -> Dict:
+        """
+        Статистика экспорта
+
+        Returns:
+            Словарь с количеством узлов и связей
+        """
+        return dict(self.stats)
+
+
+def main():
+    """CLI entry point"""
+    import argparse
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(
+        description="Export BSL dependency graph to CSV for neo4j-admin database import"
+    )
+    parser.add_argument("project_path", help="Project root with BSL files")
+    parser.add_argument("output_dir", help="Directory for CSV files")
+    parser.add_argument("--project-name", default=None, help="Project name (default: directory name)")
+    parser.add_argument("--max-files", type=int, default=None, help="Maximum number of files")
+    parser.add_argument("--database", default="neo4j", help="Target database for the import command")
+    parser.add_argument("--workers", type=int, default=None, help="Analysis processes (default: CPU count)")
+
+    args = parser.parse_args()
+
+    from scripts.neo4j.bsl_dependency_analyzer import BSLDependencyAnalyzer
+
+    # Подключение к Neo4j для экспорта не нужно
+    analyzer = BSLDependencyAnalyzer(neo4j_uri=None)
+    try:
+        command = analyzer.export_project(
+            project_path=Path(args.project_path),
+            output_dir=Path(args.output_dir),
+            project_name=args.project_name,
+            max_files=args.max_files,
+            database=args.database,
+            workers=args.workers
+        )
+        print(command)
+    finally:
+        analyzer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,467 @@
+"""
+BSL Graph Bulk Loader
+Пакетная загрузка результатов BSLDependencyAnalyzer в Neo4j
+
+Вместо отдельного session.run на каждый модуль, функцию, переменную и вызов
+строки накапливаются в буферах и записываются запросами UNWIND $rows
+(одна транзакция на пачку). Узлы ищутся только по индексированному id
+(уникальные constraints из init_schema.py), цели CALLS - по target_id,
+вычисленному при анализе файла (в том же модуле или в общем модуле
+по таблице символов).
+
+BSLGraphIncrementalLoader заменяет подграфы измененных модулей
+(методы, переменные, исходящие CALLS) - одна транзакция на пачку.
+"""
+
+import time
+import logging
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Constraints, без которых MATCH/MERGE по id превращается в полный просмотр.
+# Имена совпадают с scripts/neo4j/init_schema.py
+ID_CONSTRAINTS = [
+    "CREATE CONSTRAINT project_id_unique IF NOT EXISTS FOR (p:Project) REQUIRE p.id IS UNIQUE",
+    "CREATE CONSTRAINT module_id_unique IF NOT EXISTS FOR (m:Module) REQUIRE m.id IS UNIQUE",
+    "CREATE CONSTRAINT function_id_unique IF NOT EXISTS FOR (f:Function) REQUIRE f.id IS UNIQUE",
+    "CREATE CONSTRAINT procedure_id_unique IF NOT EXISTS FOR (p:Procedure) REQUIRE p.id IS UNIQUE",
+    "CREATE CONSTRAINT variable_id_unique IF NOT EXISTS FOR (v:Variable) REQUIRE v.id IS UNIQUE",
+]
+
+# Индекс точного поиска модуля по нормализованному пути (services/graph_paths.py)
+PATH_KEY_INDEX = "CREATE INDEX module_path_key_idx IF NOT EXISTS FOR (m:Module) ON (m.path_key)"
+
+# Модули, загруженные до появления path_key (нормализация как в normalize_module_path)
+BACKFILL_PATH_KEYS_QUERY = """
+    MATCH (m:Module)
+    WHERE m.path_key IS NULL AND m.file_path IS NOT NULL
+    SET m.path_key = toLower(replace(m.file_path, '\\\\', '/'))
+"""
+
+# Метки методов (подставляются в запросы только из этого набора)
+METHOD_LABELS = ('Function', 'Procedure')
+
+MODULES_QUERY = """
+    UNWIND $rows AS row
+    MATCH (p:Project {id: row.project_id})
+    MERGE (m:Module {id: row.id})
+    SET m += row.props,
+        m.indexed_at = datetime(row.indexed_at)
+    MERGE (p)-[r:CONTAINS]->(m)
+    ON CREATE SET r.created_at = datetime()
+"""
+
+METHODS_QUERY = """
+    UNWIND $rows AS row
+    MATCH (m:Module {{id: row.module_id}})
+    MERGE (n:{label} {{id: row.id}})
+    SET n += row.props
+    MERGE (m)-[r:CONTAINS]->(n)
+    ON CREATE SET r.created_at = datetime()
+"""
+
+VARIABLES_QUERY = """
+    UNWIND $rows AS row
+    MATCH (m:Module {id: row.module_id})
+    MERGE (v:Variable {id: row.id})
+    SET v += row.props
+    MERGE (m)-[r:CONTAINS]->(v)
+    ON CREATE SET r.created_at = datetime()
+"""
+
+# Цель вызова может находиться в общем модуле из следующей пачки:
+# MERGE создает узел по id, свойства он получит при загрузке своего модуля
+# (если модуль не загрузится - узел удалит delete_placeholder_methods)
+CALLS_QUERY = """
+    UNWIND $rows AS row
+    MATCH (source:{source_label} {{id: row.source_id}})
+    MERGE (target:{target_label} {{id: row.target_id}})
+    MERGE (source)-[c:CALLS]->(target)
+    SET c.call_count = row.call_count,
+        c.line_numbers = row.line_numbers,
+        c.is_conditional = false
+"""
+
+# Цели вызовов, чей модуль так и не загрузился (max_files, ошибка разбора):
+# узел без свойств и без CONTAINS, удаляется вместе с ведущими к нему CALLS
+DELETE_PLACEHOLDERS_QUERY = """
+    MATCH (n:{label})
+    WHERE n.name IS NULL AND NOT ()-[:CONTAINS]->(n)
+    DETACH DELETE n
+    RETURN count(*) AS removed
+"""
+
+
+# Входящие CALLS из модулей вне пачки - восстанавливаются после пересборки
+INCOMING_CALLS_QUERY = """
+    UNWIND $module_ids AS module_id
+    MATCH (:Module {id: module_id})-[:CONTAINS]->(target)<-[c:CALLS]-(source)
+    MATCH (source_module:Module)-[:CONTAINS]->(source)
+    WHERE NOT source_module.id IN $module_ids
+    RETURN source.id AS source_id,
+           labels(source)[0] AS source_label,
+           target.id AS target_id,
+           c.call_count AS call_count,
+           c.line_numbers AS line_numbers
+"""
+
+# Подграф модуля: методы и переменные вместе со всеми их связями
+DELETE_SUBGRAPH_QUERY = """
+    UNWIND $module_ids AS module_id
+    MATCH (:Module {id: module_id})-[:CONTAINS]->(n)
+    DETACH DELETE n
+"""
+
+DELETE_MODULES_QUERY = """
+    UNWIND $module_ids AS module_id
+    MATCH (m:Module {id: module_id})
+    DETACH DELETE m
+"""
+
+
+def delete_placeholder_methods(driver) -> int:
+    """
+    Удаление целей вызовов, оставшихся без своего модуля
+
+    Вызывается после загрузки: пока идет загрузка, такой узел может
+    получить свойства вместе с модулем из следующей пачки.
+
+    Args:
+        driver: Neo4j driver
+
+    Returns:
+        Количество удаленных узлов
+    """
+    removed = 0
+    with driver.session() as session:
+        for label in METHOD_LABELS:
+            record = session.run(DELETE_PLACEHOLDERS_QUERY.format(label=label)).single()
+            removed += record['removed'] if record else 0
+
+    if removed:
+        logger.info(f"   Удалено целей вызовов без модуля: {removed}")
+    return removed
+
+
+class BSLGraphBulkLoader:
+    """
+    Пакетный загрузчик графа BSL
+
+    Использование:
+        loader = BSLGraphBulkLoader(driver)
+        loader.ensure_schema()
+        for module_data in ...:
+            loader.add_module(module_data, project_id)
+        loader.flush()
+    """
+
+    def __init__(self, driver, batch_size: int = 5000):
+        """
+        Args:
+            driver: Neo4j driver
+            batch_size: Количество строк в одном UNWIND (одна транзакция)
+        """
+        self.driver = driver
+        self.batch_size = batch_size
+
+        self.modules: List[Dict] = []
+        self.methods: Dict[str, List[Dict]] = {label: [] for label in METHOD_LABELS}
+        self.variables: List[Dict] = []
+        self.calls: Dict[tuple, List[Dict]] = {}
+        self.pending = 0
+
+        self.stats = {
+            'modules': 0,
+            'functions': 0,
+            'procedures': 0,
+            'variables': 0,
+            'calls': 0,
+            'transactions': 0,
+            'write_time_s': 0.0
+        }
+
+    def ensure_schema(self):
+        """Создание id constraints и индекса path_key (если еще нет)"""
+        with self.driver.session() as session:
+            for constraint in ID_CONSTRAINTS:
+                try:
+                    session.run(constraint).consume()
+                except Exception as e:
+                    logger.warning(f"⚠️  Constraint не создан: {str(e)[:80]}")
+
+            try:
+                session.run(PATH_KEY_INDEX).consume()
+                session.run(BACKFILL_PATH_KEYS_QUERY).consume()
+            except Exception as e:
+                logger.warning(f"⚠️  Индекс path_key не создан: {str(e)[:80]}")
+
+    def add_module(self, module_data: Dict, project_id: str):
+        """
+        Добавление модуля в буфер (запись - при заполнении пачки или flush)
+
+        Args:
+            module_data: Результат BSLDependencyAnalyzer.analyze_file
+            project_id: ID проекта
+        """
+        mod = module_data['module']
+        module_id = mod['id']
+
+        self.modules.append({
+            'project_id': project_id,
+            'id': module_id,
+            'indexed_at': mod['indexed_at'],
+            'props': {
+                'name': mod['name'],
+                'file_path': mod['file_path'],
+                'path_key': mod['path_key'],
+                'module_type': mod['module_type'],
+                'functions_count': mod['functions_count'],
+                'procedures_count': mod['procedures_count'],
+                'variables_count': mod['variables_count'],
+                'lines_count': mod['lines_count'],
+                'file_size': mod['file_size'],
+                'content_hash': mod['content_hash'],
+                'is_export': mod['is_export']
+            }
+        })
+        rows = 1
+
+        for label, key in (('Function', 'functions'), ('Procedure', 'procedures')):
+            for method in module_data.get(key, []):
+                self.methods[label].append({
+                    'module_id': module_id,
+                    'id': method['id'],
+                    'props': {
+                        'name': method['name'],
+                        'signature': method['signature'],
+                        'parameters': method['parameters'],
+                        'is_export': method['is_export'],
+                        'line_start': method['line_start'],
+                        'line_end': method['line_end'],
+                        'calls_count': len(method.get('calls', []))
+                    }
+                })
+                rows += 1
+
+                for call in method.get('calls', []):
+                    if not call.get('target_id'):
+                        continue
+                    self.calls.setdefault((label, call['target_label']), []).append({
+                        'source_id': method['id'],
+                        'target_id': call['target_id'],
+                        'call_count': call['call_count'],
+                        'line_numbers': call['line_numbers']
+                    })
+                    rows += 1
+
+        for var in module_data.get('variables', []):
+            self.variables.append({
+                'module_id': module_id,
+                'id': var['id'],
+                'props': {
+                    'name': var['name'],
+                    'scope': var['scope'],
+                    'is_export': var['is_export'],
+                    'line_number': var['line_number']
+                }
+            })
+            rows += 1
+
+        self.pending += rows
+        if self.pending >= self.batch_size:
+            self.flush()
+
+    def _write(self, runner, query: str, rows: List[Dict]) -> int:
+        """
+        Запись строк пачками по batch_size
+
+        Args:
+            runner: Сессия (каждая пачка - своя транзакция) или транзакция
+            query: UNWIND запрос
+            rows: Строки
+
+        Returns:
+            Количество выполненных запросов
+        """
+        statements = 0
+        for start in range(0, len(rows), self.batch_size):
+            runner.run(query, rows=rows[start:start + self.batch_size]).consume()
+            statements += 1
+        return statements
+
+    def _write_calls(self, runner, calls: Dict[tuple, List[Dict]]) -> int:
+        """Запись CALLS, сгруппированных по (метка источника, метка цели)"""
+        statements = 0
+        for (source_label, target_label), rows in calls.items():
+            if source_label not in METHOD_LABELS or target_label not in METHOD_LABELS:
+                continue
+            query = CALLS_QUERY.format(source_label=source_label, target_label=target_label)
+            statements += self._write(runner, query, rows)
+        return statements
+
+    def _write_buffers(self, runner) -> int:
+        """
+        Запись накопленных строк
+
+        Порядок: модули, методы, переменные, затем CALLS - к этому моменту
+        все узлы пачки уже существуют.
+
+        Returns:
+            Количество выполненных запросов
+        """
+        statements = self._write(runner, MODULES_QUERY, self.modules)
+        self.stats['modules'] += len(self.modules)
+
+        for label in METHOD_LABELS:
+            rows = self.methods[label]
+            statements += self._write(runner, METHODS_QUERY.format(label=label), rows)
+            self.stats['functions' if label == 'Function' else 'procedures'] += len(rows)
+
+        statements += self._write(runner, VARIABLES_QUERY, self.variables)
+        self.stats['variables'] += len(self.variables)
+
+        statements += self._write_calls(runner, self.calls)
+        self.stats['calls'] += sum(len(rows) for rows in self.calls.values())
+
+        return statements
+
+    def _reset(self):
+        """Очистка буферов после записи"""
+        self.modules = []
+        self.methods = {label: [] for label in METHOD_LABELS}
+        self.variables = []
+        self.calls = {}
+        self.pending = 0
+
+    def flush(self):
+        """Запись накопленных строк (каждый запрос - отдельная транзакция)"""
+        if not self.pending:
+            return
+
+        start_time = time.time()
+
+        with self.driver.session() as session:
+            self.stats['transactions'] += self._write_buffers(session)
+
+        self.stats['write_time_s'] += time.time() - start_time
+        self._reset()
+
+    def get_stats(self) -> Dict:
+        """
+        Статистика загрузки
+
+        Returns:
+            Словарь с количеством записанных строк и транзакций
+        """
+        return dict(self.stats, pending=self.pending)
+
+
+class BSLGraphIncrementalLoader(BSLGraphBulkLoader):
+    """
+    Замена подграфов измененных модулей
+
+    Для каждой пачки в одной транзакции:
+    1. Сохраняются входящие CALLS из других модулей
+    2. Удаляются методы и переменные модулей пачки (DETACH DELETE -
+       вместе с исходящими и входящими CALLS), удаленные модули - целиком
+    3. Записываются модули, методы, переменные и исходящие CALLS
+    4. Восстанавливаются входящие CALLS, цель которых по-прежнему
+       экспортируется (по таблице символов)
+
+    Вызовы методов, которые стали экспортными, приходят только из
+    измененных модулей (иначе модуль не компилировался бы до изменения),
+    поэтому пересканировать неизмененные модули не нужно.
+
+    Использование:
+        loader = BSLGraphIncrementalLoader(driver, exported_ids)
+        loader.remove_module(module_id)
+        loader.add_module(module_data, project_id)
+        loader.flush()
+    """
+
+    def __init__(self, driver, exported_ids: Dict[str, str], batch_size: int = 5000):
+        """
+        Args:
+            driver: Neo4j driver
+            exported_ids: ID экспортного метода -> метка узла (BSLSymbolTable.exports)
+            batch_size: Количество строк в одной транзакции
+        """
+        super().__init__(driver, batch_size=batch_size)
+        self.exported_ids = exported_ids
+
+        self.replaced: List[str] = []
+        self.removed: List[str] = []
+
+        self.stats.update({
+            'modules_removed': 0,
+            'incoming_relinked': 0,
+            'incoming_dropped': 0
+        })
+
+    def add_module(self, module_data: Dict, project_id: str):
+        """
+        Добавление модуля на замену
+
+        Args:
+            module_data: Результат BSLDependencyAnalyzer.analyze_file
+            project_id: ID проекта
+        """
+        self.replaced.append(module_data['module']['id'])
+        super().add_module(module_data, project_id)
+
+    def remove_module(self, module_id: str):
+        """
+        Удаление модуля (файл удален или переименован)
+
+        Args:
+            module_id: ID модуля
+        """
+        self.removed.append(module_id)
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+
+    def _relink_rows(self, incoming: List[Dict]) -> Dict[tuple, List[Dict]]:
+        """Входящие вызовы, цель которых осталась экспортной"""
+        calls: Dict[tuple, List[Dict]] = {}
+        for row in incoming:
+            target_label = self.exported_ids.get(row['target_id'])
+            if target_label is None:
+                self.stats['incoming_dropped'] += 1
+                continue
+            calls.setdefault((row['source_label'], target_label), []).append({
+                'source_id': row['source_id'],
+                'target_id': row['target_id'],
+                'call_count': row['call_count'],
+                'line_numbers': row['line_numbers']
+            })
+            self.stats['incoming_relinked'] += 1
+        return calls
+
+    def flush(self):
+        """Замена подграфов накопленных модулей (одна транзакция)"""
+        if not self.pending:
+            return
+
+        start_time = time.time()
+        module_ids = self.replaced + self.removed
+
+        with self.driver.session() as session:
+            with session.begin_transaction() as tx:
+                incoming = tx.run(INCOMING_CALLS_QUERY, module_ids=module_ids).data()
+                tx.run(DELETE_SUBGRAPH_QUERY, module_ids=module_ids).consume()
+                tx.run(DELETE_MODULES_QUERY, module_ids=self.removed).consume()
+
+                self._write_buffers(tx)
+                self._write_calls(tx, self._relink_rows(incoming))
+
+                tx.commit()
+
+        self.stats['transactions'] += 1
+        self.stats['modules_removed'] += len(self.removed)
+        self.stats['write_time_s'] += time.time() - start_time
+
+        self.replaced = []
+        self.removed = []
+        self._reset()
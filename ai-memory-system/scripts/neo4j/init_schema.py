@@ -93,6 +93,7 @@ class Neo4jSchemaInitializer:
             # Индексы для Module
             "CREATE INDEX module_type_idx IF NOT EXISTS FOR (m:Module) ON (m.module_type)",
             "CREATE INDEX module_path_idx IF NOT EXISTS FOR (m:Module) ON (m.file_path)",
+            "CREATE INDEX module_path_key_idx IF NOT EXISTS FOR (m:Module) ON (m.path_key)",
 
             # Индексы для Function
             "CREATE INDEX function_export_idx IF NOT EXISTS FOR (f:Function) ON (f.is_export)",
@@ -0,0 +1,74 @@
+"""
+Расчет центральности модулей (PageRank, betweenness) по текущей версии графа
+Вызывается индексаторами после записи графа (sync_centrality) или вручную;
+результат сохраняется в Neo4j и читается GraphAnalyticsService без пересчета.
+
+Запуск: python scripts/run_graph_centrality.py [--samples 256] [--top 20]
+"""
+
+import sys
+import logging
+import argparse
+from pathlib import Path
+
+# Добавление путей для импорта
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from neo4j import GraphDatabase
+from services.call_graph_engine import CallGraphEngine
+from services.graph_centrality import CentralityIndex
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def sync_centrality(driver, samples: int = 256) -> CentralityIndex:
+    """
+    Расчет центральности по текущей версии графа и сохранение в Neo4j
+
+    Args:
+        driver: Neo4j driver
+        samples: Источников для оценки betweenness
+
+    Returns:
+        CentralityIndex с рассчитанными метриками
+    """
+    index = CentralityIndex(driver, CallGraphEngine(driver), samples=samples)
+    index.compute_and_save()
+    return index
+
+
+def main():
+    """Основная функция"""
+    parser = argparse.ArgumentParser(description="Compute module PageRank and betweenness")
+    parser.add_argument("--uri", default="bolt://localhost:7687", help="Neo4j URI")
+    parser.add_argument("--user", default="neo4j", help="Neo4j user")
+    parser.add_argument("--password", default="password123", help="Neo4j password")
+    parser.add_argument("--samples", type=int, default=256, help="Betweenness sample sources")
+    parser.add_argument("--top", type=int, default=20, help="Modules to print per metric")
+    args = parser.parse_args()
+
+    driver = GraphDatabase.driver(args.uri, auth=(args.user, args.password))
+
+    try:
+        index = sync_centrality(driver, samples=args.samples)
+        ranked = index.ranked
+
+        logger.info(f"✅ Centrality saved for graph version {index.version}")
+        for metric, modules in ranked.items():
+            print(f"\nTop {args.top} modules by {metric}:")
+            for i, (module, score) in enumerate(modules[:args.top], 1):
+                print(f"  {i:3}. {score:10.4f}  {module}")
+
+    except Exception as e:
+        logger.error(f"❌ Error: {e}", exc_info=True)
+        sys.exit(1)
+    finally:
+        driver.close()
+
+
+if __name__ == "__main__":
+    main()
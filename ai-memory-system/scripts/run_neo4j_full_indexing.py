@@ -42,7 +42,7 @@ def main():
 
         logger.info(f"📂 Source path: {project_path}")
         logger.info(f"📊 Total BSL files to analyze: ~3973")
-        logger.info(f"⏱️  Estimated time: 2-3 hours")
+        logger.info(f"⏱️  Estimated time: minutes (bulk UNWIND load)")
         logger.info("")
 
         # Полная индексация (max_files=None)
@@ -52,6 +52,13 @@ def main():
             max_files=None  # Все файлы!
         )
 
+        # Центральность новой версии - здесь, а не на первом запросе к API
+        try:
+            from scripts.run_graph_centrality import sync_centrality
+            sync_centrality(analyzer.driver)
+        except Exception as e:
+            logger.warning(f"⚠️  Центральность модулей не пересчитана: {e}")
+
         logger.info("")
         logger.info("=" * 70)
         logger.info("✅ INDEXING COMPLETE!")
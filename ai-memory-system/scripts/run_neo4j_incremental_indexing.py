@@ -0,0 +1,112 @@
+"""
+Инкрементальное обновление Neo4j Knowledge Graph
+Пересобирает только модули, измененные с последнего обновления (git diff)
+
+После обновления графа признаки графа в payload Qdrant (bsl_code)
+пересчитываются для новой версии (--skip-qdrant - пропустить).
+
+Запуск: python scripts/run_neo4j_incremental_indexing.py [--dry-run] [--skip-qdrant]
+"""
+
+import sys
+import logging
+from pathlib import Path
+
+# Добавление путей для импорта
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scripts.neo4j.bsl_dependency_analyzer import BSLDependencyAnalyzer
+from services.incremental_indexer import IncrementalIndexer
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('logs/neo4j_incremental_indexing.log', encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger(__name__)
+
+# Состояние графа отдельно от векторного индекса: они обновляются независимо
+GRAPH_STATE_FILE = "data/index/graph_incremental_state.json"
+
+
+def main():
+    """Основная функция"""
+    dry_run = '--dry-run' in sys.argv
+    skip_qdrant = '--skip-qdrant' in sys.argv
+
+    logger.info("=" * 70)
+    logger.info("🕸️  NEO4J INCREMENTAL INDEXING - BSL Dependency Graph")
+    logger.info("=" * 70)
+
+    repo_path = Path(__file__).parent.parent.parent
+    project_path = repo_path / "src"
+
+    indexer = IncrementalIndexer(repo_path=str(repo_path), state_file=GRAPH_STATE_FILE)
+
+    if not indexer.state.get('last_commit'):
+        logger.warning("⚠️  Граф еще не индексировался этим скриптом - будут обработаны все файлы")
+        logger.warning("   Для первичной сборки быстрее run_neo4j_full_indexing.py или CSV экспорт")
+
+    changed_files = indexer.get_files_to_index()
+    deleted_files = sorted(indexer.get_deleted_files())
+
+    logger.info(f"📂 Source path: {project_path}")
+    logger.info(f"📝 Changed: {len(changed_files)}, deleted: {len(deleted_files)}")
+
+    if not changed_files and not deleted_files:
+        logger.info("✅ Граф актуален")
+        indexer.mark_indexed([])
+        return
+
+    if dry_run:
+        for file_path in changed_files[:20] + deleted_files[:20]:
+            logger.info(f"   {file_path}")
+        return
+
+    analyzer = BSLDependencyAnalyzer(
+        neo4j_uri="bolt://localhost:7687",
+        neo4j_user="neo4j",
+        neo4j_password="password123"
+    )
+
+    try:
+        analyzer.update_project(
+            project_path=project_path,
+            changed_files=changed_files,
+            deleted_files=deleted_files,
+            project_name="1C Enterprise Framework"
+        )
+
+        # Коммит фиксируется только после успешной записи в граф
+        indexer.mark_indexed(changed_files)
+
+        logger.info("✅ GRAPH UPDATE COMPLETE")
+
+        # Центральность новой версии - здесь, а не на первом запросе к API
+        try:
+            from scripts.run_graph_centrality import sync_centrality
+            sync_centrality(analyzer.driver)
+        except Exception as e:
+            logger.warning(f"⚠️  Центральность модулей не пересчитана: {e}")
+
+        if not skip_qdrant:
+            # Векторы не зависят от графа - при недоступном Qdrant только предупреждение
+            try:
+                from qdrant_client import QdrantClient
+                from scripts.run_qdrant_graph_features import sync_graph_features
+                sync_graph_features(analyzer.driver, QdrantClient(url="http://localhost:6333"))
+            except Exception as e:
+                logger.warning(f"⚠️  Признаки графа в Qdrant не обновлены: {e}")
+
+    except Exception as e:
+        logger.error(f"❌ Error: {e}", exc_info=True)
+        sys.exit(1)
+    finally:
+        analyzer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Запись признаков графа (вызовы, связанные модули, центральность) в payload
+коллекции Qdrant bsl_code. Запускается после загрузки векторов и после
+обновления графа; точки с текущей версией графа пропускаются.
+
+Запуск: python scripts/run_qdrant_graph_features.py [--force] [--collection bsl_code]
+"""
+
+import sys
+import logging
+import argparse
+from pathlib import Path
+
+# Добавление путей для импорта
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from neo4j import GraphDatabase
+from qdrant_client import QdrantClient
+from services.call_graph_engine import CallGraphEngine
+from services.graph_features import QdrantGraphFeatureSync, compute_module_features
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def sync_graph_features(driver, qdrant_client, collection_name: str = "bsl_code",
+                        samples: int = 256, force: bool = False) -> dict:
+    """
+    Расчет признаков по текущей версии графа и запись в Qdrant
+
+    Args:
+        driver: Neo4j driver
+        qdrant_client: QdrantClient
+        collection_name: Коллекция векторов модулей
+        samples: Источников для оценки betweenness
+        force: Переписать payload всех точек
+
+    Returns:
+        Статистика синхронизации
+    """
+    snapshot = CallGraphEngine(driver).snapshot()
+    features = compute_module_features(snapshot, samples=samples)
+    sync = QdrantGraphFeatureSync(qdrant_client, collection_name=collection_name)
+    return sync.sync(features, snapshot.version, force=force)
+
+
+def main():
+    """Основная функция"""
+    parser = argparse.ArgumentParser(description="Write graph features into Qdrant payload")
+    parser.add_argument("--uri", default="bolt://localhost:7687", help="Neo4j URI")
+    parser.add_argument("--user", default="neo4j", help="Neo4j user")
+    parser.add_argument("--password", default="password123", help="Neo4j password")
+    parser.add_argument("--qdrant-url", default="http://localhost:6333", help="Qdrant URL")
+    parser.add_argument("--collection", default="bsl_code", help="Qdrant collection")
+    parser.add_argument("--samples", type=int, default=256, help="Betweenness sample sources")
+    parser.add_argument("--force", action="store_true", help="Rewrite points of current graph version")
+    args = parser.parse_args()
+
+    driver = GraphDatabase.driver(args.uri, auth=(args.user, args.password))
+
+    try:
+        stats = sync_graph_features(
+            driver,
+            QdrantClient(url=args.qdrant_url),
+            collection_name=args.collection,
+            samples=args.samples,
+            force=args.force
+        )
+        logger.info(f"✅ Graph features: {stats}")
+
+    except Exception as e:
+        logger.error(f"❌ Error: {e}", exc_info=True)
+        sys.exit(1)
+    finally:
+        driver.close()
+
+
+if __name__ == "__main__":
+    main()
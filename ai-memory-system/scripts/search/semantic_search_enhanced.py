@@ -23,6 +23,7 @@ from qdrant_client.models import Filter, FieldCondition, MatchValue
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from services.embedding_service import EmbeddingService
+from services.graph_features import graph_features_from_payload
 
 logging.basicConfig(
     level=logging.INFO,
@@ -42,6 +43,7 @@ class SearchResult:
     preview: str
     file_size: int
     indexed_at: str
+    graph_features: Optional[Dict[str, Any]] = None  # Признаки графа из payload (graph_*)
 
     @property
     def relevance_label(self) -> str:
@@ -166,7 +168,8 @@ class SemanticSearchEngine:
                     variables_count=payload['variables_count'],
                     preview=payload['searchable_text'][:300],
                     file_size=payload['file_size'],
-                    indexed_at=payload['indexed_at']
+                    indexed_at=payload['indexed_at'],
+                    graph_features=graph_features_from_payload(payload)
                 )
                 search_results.append(search_result)
 
@@ -0,0 +1,268 @@
+"""
+Analytics Summary Store - материализованная сводка аналитики графа
+
+Сводка (циклы, hotspots, мертвый код, сложность) вычисляется один раз
+на версию графа (services/graph_version.py) и сохраняется на диск:
+
+cache/analytics/
+└── summary_<graph_version>.json
+
+Запросы обслуживаются из памяти. После изменения графа последняя
+сводка продолжает отдаваться с пометкой stale, а новая вычисляется
+в фоновом потоке (не больше одного расчета одновременно). Синхронно
+сводка считается только если для графа нет ни одной сохраненной.
+После неудачного расчета версия повторно считается не раньше, чем
+через retry_interval секунд (иначе каждый запрос запускал бы расчет
+по всему графу заново).
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.graph_version import get_graph_version
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SUMMARY_DIR = Path(__file__).parent.parent / "cache" / "analytics"
+
+
+class AnalyticsSummaryStore:
+    """
+    Сводка аналитики с версионной инвалидацией
+
+    Использование:
+        store = AnalyticsSummaryStore(driver, analyzer.compute_analytics_summary)
+        summary = store.get()   # {..., 'meta': {graph_version, stale, ...}}
+    """
+
+    def __init__(
+        self,
+        driver,
+        compute: Callable[[], Dict],
+        cache_dir: Optional[str] = None,
+        check_interval: float = 10.0,
+        keep_versions: int = 3,
+        retry_interval: float = 300.0
+    ):
+        """
+        Args:
+            driver: Neo4j driver (для версии графа)
+            compute: Функция расчета сводки
+            cache_dir: Каталог сводок (по умолчанию cache/analytics)
+            check_interval: Интервал проверки версии графа (секунды)
+            keep_versions: Сколько сводок хранить на диске
+            retry_interval: Пауза перед повтором неудачного расчета (секунды)
+        """
+        self.driver = driver
+        self.compute = compute
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_SUMMARY_DIR
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.check_interval = check_interval
+        self.keep_versions = keep_versions
+        self.retry_interval = retry_interval
+
+        # Последняя сводка: {'graph_version', 'computed_at', 'duration', 'summary'}
+        self._entry: Optional[Dict] = None
+        self._current_version: Optional[str] = None
+        self._checked_at = 0.0
+        self._refreshing: Optional[str] = None
+        # Последний неудачный расчет: (версия, время)
+        self._failed: Optional[Tuple[str, float]] = None
+        self._lock = threading.Lock()
+        self._compute_lock = threading.Lock()
+
+        self.stats = {
+            'requests': 0,
+            'stale_responses': 0,
+            'computations': 0,
+            'disk_loads': 0,
+            'errors': 0
+        }
+
+    def _entry_path(self, version: str) -> Path:
+        """Файл сводки версии графа"""
+        return self.cache_dir / f"summary_{version}.json"
+
+    def _load(self, path: Path) -> Optional[Dict]:
+        """Чтение сохраненной сводки"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            self.stats['disk_loads'] += 1
+            return entry
+        except Exception as e:
+            logger.warning(f"Failed to load analytics summary {path}: {e}")
+            return None
+
+    def _latest_on_disk(self) -> Optional[Dict]:
+        """Последняя сохраненная сводка любой версии"""
+        entries = sorted(
+            self.cache_dir.glob("summary_*.json"),
+            key=lambda path: path.stat().st_mtime,
+            reverse=True
+        )
+        for path in entries:
+            entry = self._load(path)
+            if entry:
+                return entry
+        return None
+
+    def _save(self, entry: Dict):
+        """Атомарная запись сводки и удаление старых версий"""
+        path = self._entry_path(entry['graph_version'])
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except Exception as e:
+            logger.error(f"Error saving analytics summary: {e}")
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+            return
+
+        old = sorted(
+            self.cache_dir.glob("summary_*.json"),
+            key=lambda p: p.stat().st_mtime,
+            reverse=True
+        )[self.keep_versions:]
+        for stale in old:
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+
+    def _compute(self, version: str) -> Optional[Dict]:
+        """Расчет и сохранение сводки версии"""
+        start_time = time.time()
+        try:
+            summary = self.compute()
+        except Exception as e:
+            logger.error(f"Analytics summary computation failed: {e}")
+            self.stats['errors'] += 1
+            self._failed = (version, time.time())
+            return None
+
+        entry = {
+            'graph_version': version,
+            'computed_at': time.time(),
+            'duration': round(time.time() - start_time, 3),
+            'summary': summary
+        }
+        self.stats['computations'] += 1
+        self._failed = None
+        self._save(entry)
+        logger.info(f"Analytics summary computed for graph version {version} ({entry['duration']}s)")
+        return entry
+
+    def _retry_pending(self, version: str) -> bool:
+        """Расчет версии недавно завершился ошибкой - повтор после retry_interval"""
+        failed = self._failed
+        return (
+            failed is not None and failed[0] == version
+            and time.time() - failed[1] < self.retry_interval
+        )
+
+    def _refresh_in_background(self, version: str):
+        """Фоновый расчет сводки новой версии (один одновременно)"""
+        with self._lock:
+            if self._refreshing is not None or self._retry_pending(version):
+                return
+            self._refreshing = version
+
+        def run():
+            try:
+                entry = self._compute(version)
+                if entry:
+                    with self._lock:
+                        self._entry = entry
+            finally:
+                with self._lock:
+                    self._refreshing = None
+
+        threading.Thread(target=run, name="analytics-summary-refresh", daemon=True).start()
+
+    def _graph_version(self) -> Optional[str]:
+        """Текущая версия графа (не чаще раза в check_interval)"""
+        if time.time() - self._checked_at >= self.check_interval:
+            version = get_graph_version(self.driver)
+            if version is not None:
+                self._current_version = version
+            self._checked_at = time.time()
+        return self._current_version
+
+    def get(self) -> Dict:
+        """
+        Сводка для текущей версии графа или последняя с пометкой stale
+
+        Returns:
+            Сводка с ключом 'meta': graph_version, current_graph_version,
+            computed_at, age_seconds, stale, refreshing
+        """
+        self.stats['requests'] += 1
+        version = self._graph_version()
+        entry = self._entry
+
+        if version is not None and (entry is None or entry['graph_version'] != version):
+            # Сводка версии могла быть сохранена другим процессом
+            path = self._entry_path(version)
+            stored = self._load(path) if path.exists() else None
+            if stored is not None:
+                entry = self._entry = stored
+
+        if entry is None:
+            entry = self._entry = self._latest_on_disk()
+
+        if entry is None:
+            # Нет ни одной сводки - первый расчет синхронно
+            with self._compute_lock:
+                entry = self._entry
+                if entry is None and not self._retry_pending(version or 'unknown'):
+                    entry = self._compute(version or 'unknown')
+            if entry is None:
+                raise RuntimeError("Analytics summary is not available")
+            self._entry = entry
+
+        stale = version is not None and entry['graph_version'] != version
+        if stale:
+            self.stats['stale_responses'] += 1
+            self._refresh_in_background(version)
+
+        summary = dict(entry['summary'])
+        summary['meta'] = {
+            'graph_version': entry['graph_version'],
+            'current_graph_version': version,
+            'computed_at': entry['computed_at'],
+            'age_seconds': round(time.time() - entry['computed_at'], 1),
+            'computation_seconds': entry['duration'],
+            'stale': stale,
+            'refreshing': self._refreshing is not None
+        }
+        return summary
+
+    def get_stats(self) -> Dict:
+        """
+        Статистика хранилища
+
+        Returns:
+            Счетчики запросов и версия сохраненной сводки
+        """
+        stats = dict(self.stats)
+        stats.update({
+            'graph_version': self._entry['graph_version'] if self._entry else None,
+            'refreshing': self._refreshing,
+            'failed_version': self._failed[0] if self._failed else None,
+            'cache_dir': str(self.cache_dir)
+        })
+        return stats
@@ -11,16 +11,85 @@ BSL Search Service - Единый интерфейс поиска
 - Параллельное выполнение нескольких типов поиска
 - Умное объединение результатов
 - LLM-based precision ranking для финального результата
+
+Клиенты бэкендов синхронные (requests, QdrantClient, Neo4j driver), поэтому
+каждый вызов выполняется в пуле потоков своего бэкенда (embedding, qdrant,
+neo4j, llm). Размер пула - лимит одновременных запросов к бэкенду; event
+loop MCP сервера не блокируется, semantic и graph поиск идут параллельно,
+а лишние запросы ждут в очереди своего бэкенда.
+
+Каждый вызов бэкенда - стадия запроса (embed, vector, graph, intent, rerank)
+с бюджетом времени (services/search_budget.py). Стадия, не уложившаяся в
+бюджет, пропускается или прерывается, поиск возвращает частичный результат
+(SearchResults.degraded - какие стадии деградировали).
+
+search_stream - потоковый вариант поиска: промежуточные результаты стадий
+(vector - ответ Qdrant, hybrid - после объединения/учета графа) отдаются
+сразу, финальный результат (после LLM re-ranking) - последним.
 """
 
+import sys
+import copy
+import time
 import logging
 import asyncio
-from typing import List, Dict, Any, Optional, Set
-from dataclasses import dataclass
+import inspect
+import functools
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator, Callable, List, Dict, Any, Optional, Set
+from dataclasses import dataclass, field
 from enum import Enum
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.graph_features import graph_features_from_payload, hybrid_score
+from services.graph_metrics_cache import GraphMetricsCache, fetch_graph_metrics
+from services.result_fusion import ResultFusion
+from services.search_budget import (
+    DEFAULT_SEARCH_TIMEOUT_MS, SearchBudget, StageTimeout
+)
+from services.singleflight import SingleFlight, request_key
+
 logger = logging.getLogger(__name__)
 
+# Одновременных запросов к бэкенду (размер пула потоков)
+DEFAULT_BACKEND_LIMITS = {
+    "embedding": 4,  # Ollama embeddings
+    "qdrant": 8,
+    "neo4j": 8,
+    "llm": 2  # Ollama генерация - самый тяжелый бэкенд
+}
+
+# Бэкенд каждой стадии запроса
+STAGE_BACKENDS = {
+    "embed": "embedding",
+    "vector": "qdrant",
+    "graph": "neo4j",
+    "intent": "llm",
+    "rerank": "llm"
+}
+
+# Бэкенды на requests: вызов получает остаток бюджета стадии как таймаут HTTP
+# (иначе прерванный по бюджету вызов занимает поток пула до таймаута клиента)
+HTTP_TIMEOUT_BACKENDS = ("embedding", "llm")
+
+# Бюджет выполняемого запроса (задается в search, действует во вложенных задачах)
+_current_budget: contextvars.ContextVar = contextvars.ContextVar("bsl_search_budget", default=None)
+
+# Поток промежуточных результатов (задается в search_stream)
+_current_stream: contextvars.ContextVar = contextvars.ContextVar("bsl_search_stream", default=None)
+
+
+def _accepts_timeout(func: Callable) -> bool:
+    """Функция принимает аргумент timeout"""
+    try:
+        return 'timeout' in inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+
 
 class SearchMode(Enum):
     """Режимы поиска"""
@@ -47,6 +116,50 @@ class SearchResult:
     metadata: Dict[str, Any] = None
 
 
+class SearchResults(list):
+    """Результаты поиска и стадии, деградировавшие по бюджету времени"""
+
+    def __init__(self, results=(), degraded: Optional[Dict[str, str]] = None):
+        super().__init__(results)
+        self.degraded: Dict[str, str] = degraded or {}  # стадия -> skipped/timeout
+
+    @property
+    def partial(self) -> bool:
+        """Результат неполный (часть стадий пропущена или прервана)"""
+        return bool(self.degraded)
+
+
+@dataclass
+class SearchUpdate:
+    """Промежуточный или финальный результат потокового поиска"""
+    stage: str  # vector, hybrid, final
+    results: List[SearchResult]  # Текущий лучший список (заменяет предыдущий)
+    elapsed_ms: float
+    final: bool = False
+    degraded: Dict[str, str] = field(default_factory=dict)  # Только в финальном
+
+
+class _SearchStream:
+    """Очередь промежуточных результатов одного потокового поиска"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.started = time.perf_counter()
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    def elapsed_ms(self) -> float:
+        """Время с начала поиска (мс)"""
+        return round((time.perf_counter() - self.started) * 1000, 1)
+
+    def emit(self, stage: str, results: List[SearchResult]):
+        """Отправка результатов стадии (копия - следующие стадии изменяют score)"""
+        self.queue.put_nowait(SearchUpdate(
+            stage=stage,
+            results=copy.deepcopy(results[:self.limit]),
+            elapsed_ms=self.elapsed_ms()
+        ))
+
+
 @dataclass
 class SearchRequest:
     """Запрос на поиск"""
@@ -64,6 +177,10 @@ class SearchRequest:
     use_llm_reranking: bool = True
     combine_sources: bool = True  # Объединять результаты из разных источников
 
+    # Бюджет времени (services/search_budget.py)
+    timeout_ms: Optional[int] = DEFAULT_SEARCH_TIMEOUT_MS  # None - без дедлайна
+    stage_budgets_ms: Optional[Dict[str, int]] = None  # embed, vector, graph, intent, rerank
+
 
 class BSLSearchService:
     """
@@ -78,7 +195,9 @@ class BSLSearchService:
         qdrant_service,  # QdrantVectorStore
         neo4j_service,   # Neo4jService или GraphAnalyzer
         hybrid_engine,    # HybridSearchEngine
-        llm_service      # LLMService
+        llm_service,     # LLMService
+        backend_limits: Optional[Dict[str, int]] = None,
+        fusion_method: str = "rrf"
     ):
         """
         Инициализация BSL Search Service
@@ -88,11 +207,42 @@ class BSLSearchService:
             neo4j_service: Сервис графового поиска
             hybrid_engine: Гибридный поисковый движок
             llm_service: Сервис для LLM re-ranking
+            backend_limits: Лимиты одновременных запросов к бэкендам
+                (по умолчанию DEFAULT_BACKEND_LIMITS)
+            fusion_method: Объединение источников - rrf или weighted
+                (services/result_fusion.py)
         """
         self.qdrant = qdrant_service
         self.neo4j = neo4j_service
         self.hybrid = hybrid_engine
         self.llm = llm_service
+        self.fusion_method = fusion_method
+
+        # Пул потоков на бэкенд: блокирующие вызовы не занимают event loop
+        self.backend_limits = {**DEFAULT_BACKEND_LIMITS, **(backend_limits or {})}
+        self._executors = {
+            backend: ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f"bsl-search-{backend}")
+            for backend, limit in self.backend_limits.items()
+        }
+        self.backend_stats = {
+            backend: {"calls": 0, "in_flight": 0, "errors": 0}
+            for backend in self.backend_limits
+        }
+        self._clients_lock = threading.Lock()
+
+        # Одинаковые одновременные запросы - одно выполнение
+        self.singleflight = SingleFlight("bsl_search")
+
+        # Метрики графа для multi-stage поиска (если нет признаков в payload)
+        self.graph_metrics_cache: Optional[GraphMetricsCache] = None
+        if neo4j_service and getattr(neo4j_service, 'driver', None):
+            self.graph_metrics_cache = GraphMetricsCache(neo4j_service.driver)
+
+        # Время стадий multi-stage поиска
+        self.stage_stats = {
+            stage: {"calls": 0, "total_ms": 0.0, "last_ms": 0.0}
+            for stage in ("semantic", "graph_enrichment", "hybrid_scoring", "llm_rerank")
+        }
 
         logger.info("BSLSearchService инициализирован")
         logger.info(f"  Qdrant: {'✓' if qdrant_service else '✗'}")
@@ -100,16 +250,200 @@ class BSLSearchService:
         logger.info(f"  Hybrid: {'✓' if hybrid_engine else '✗'}")
         logger.info(f"  LLM: {'✓' if llm_service else '✗'}")
 
-    async def search(self, request: SearchRequest) -> List[SearchResult]:
+    async def run_blocking(
+        self,
+        stage: str,
+        func: Callable,
+        *args,
+        budget: Optional[SearchBudget] = None,
+        **kwargs
+    ) -> Any:
+        """
+        Выполнение синхронного вызова в пуле потоков бэкенда стадии
+
+        Общая точка вызова бэкендов: ContextManager выполняет стадии своего
+        запроса здесь же, чтобы лимиты пулов действовали на все вызовы.
+
+        Вызов ограничен бюджетом стадии запроса: по истечении
+        бюджета ожидание прерывается (StageTimeout). Функциям Ollama
+        (HTTP_TIMEOUT_BACKENDS) с аргументом timeout передается остаток
+        бюджета стадии на момент старта в пуле - HTTP запрос завершается
+        вместе со стадией и не держит поток бэкенда.
+
+        Args:
+            stage: Стадия запроса (embed, vector, graph, intent, rerank)
+            func: Синхронная функция
+            *args, **kwargs: Аргументы функции
+            budget: Бюджет запроса (по умолчанию - бюджет текущего search)
+
+        Returns:
+            Результат функции
+
+        Raises:
+            StageTimeout: Стадия пропущена или прервана по бюджету
+        """
+        backend = STAGE_BACKENDS[stage]
+        loop = asyncio.get_running_loop()
+        if budget is None:
+            budget = _current_budget.get()
+        call = functools.partial(func, *args, **kwargs)
+
+        stage_timeout = budget.stage_timeout(stage) if budget is not None else None
+        if stage_timeout is not None and backend in HTTP_TIMEOUT_BACKENDS and _accepts_timeout(func):
+            deadline = time.monotonic() + stage_timeout
+
+            def call():
+                # Ожидание в очереди пула тоже расходует бюджет стадии
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    budget.mark(stage, 'timeout')
+                    raise StageTimeout(stage, 'timeout')
+                return func(*args, timeout=remaining, **kwargs)
+
+        def start():
+            return loop.run_in_executor(self._executors[backend], call)
+
+        stats = self.backend_stats[backend]
+        stats["calls"] += 1
+        stats["in_flight"] += 1
+
+        try:
+            if budget is None:
+                return await start()
+            return await budget.run(stage, start)
+        except Exception:
+            stats["errors"] += 1
+            raise
+        finally:
+            stats["in_flight"] -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Статистика сервиса
+
+        Returns:
+            backends - для каждого бэкенда: лимит, вызовы, выполняемые и
+            ожидающие, ошибки; singleflight - объединенные запросы;
+            stages - время стадий multi-stage поиска; llm_cache - кеш
+            ответов LLM (intent/rerank)
+        """
+        return {
+            "backends": {
+                backend: {"limit": self.backend_limits[backend], **stats}
+                for backend, stats in self.backend_stats.items()
+            },
+            "singleflight": self.singleflight.get_stats(),
+            "stages": {
+                stage: {
+                    **stats,
+                    "avg_ms": round(stats["total_ms"] / stats["calls"], 1) if stats["calls"] else 0.0
+                }
+                for stage, stats in self.stage_stats.items()
+            },
+            "graph_metrics_cache": self.graph_metrics_cache.get_stats() if self.graph_metrics_cache else None,
+            "llm_cache": self.llm.get_cache_stats() if hasattr(self.llm, "get_cache_stats") else None
+        }
+
+    def close(self):
+        """Остановка пулов потоков бэкендов"""
+        for executor in self._executors.values():
+            executor.shutdown(wait=False)
+
+    async def search(self, request: SearchRequest) -> SearchResults:
         """
         Выполнить поиск согласно запросу
 
+        Одинаковые одновременные запросы (текст, режим, фильтры) выполняются
+        один раз, результат получают все вызывающие.
+
         Args:
             request: Параметры поискового запроса
 
         Returns:
             Список результатов поиска, отсортированных по релевантности
+            (degraded - стадии, пропущенные или прерванные по бюджету)
+        """
+        key = request_key(
+            request.query,
+            mode=request.mode.value,
+            limit=request.limit,
+            module_types=request.module_types,
+            file_path_pattern=request.file_path_pattern,
+            min_score=request.min_score,
+            include_functions=request.include_functions,
+            use_llm_reranking=request.use_llm_reranking,
+            combine_sources=request.combine_sources,
+            timeout_ms=request.timeout_ms,
+            stage_budgets_ms=request.stage_budgets_ms
+        )
+        return await self.singleflight.do(key, lambda: self._search(request))
+
+    async def search_stream(self, request: SearchRequest) -> AsyncIterator[SearchUpdate]:
         """
+        Потоковый поиск: результаты стадий по мере готовности
+
+        Первое обновление (vector) приходит сразу после ответа Qdrant,
+        следующие - после объединения источников / учета графа, последнее
+        (final=True) - итоговый результат search() с degraded стадиями.
+        Потоковые запросы не объединяются singleflight (каждому нужны
+        свои промежуточные результаты).
+
+        Args:
+            request: Параметры поискового запроса
+
+        Yields:
+            SearchUpdate - текущий лучший список результатов
+        """
+        stream = _SearchStream(request.limit)
+        token = _current_stream.set(stream)
+        try:
+            task = asyncio.ensure_future(self._search(request))
+        finally:
+            _current_stream.reset(token)
+        task.add_done_callback(lambda _: stream.queue.put_nowait(None))
+
+        try:
+            while True:
+                update = await stream.queue.get()
+                if update is None:
+                    break
+                yield update
+
+            results = task.result()
+            yield SearchUpdate(
+                stage="final",
+                results=list(results),
+                elapsed_ms=stream.elapsed_ms(),
+                final=True,
+                degraded=results.degraded
+            )
+        finally:
+            # Клиент отключился - поиск больше не нужен
+            if not task.done():
+                task.cancel()
+
+    @staticmethod
+    def _emit(stage: str, results: List[SearchResult]):
+        """Промежуточный результат стадии (если поиск потоковый)"""
+        stream = _current_stream.get()
+        if stream is not None and results:
+            stream.emit(stage, results)
+
+    async def _search(self, request: SearchRequest) -> SearchResults:
+        """Выполнение поиска (одно на группу одинаковых запросов)"""
+        budget = SearchBudget(request.timeout_ms, request.stage_budgets_ms)
+        token = _current_budget.set(budget)
+        try:
+            results = await self._search_stages(request)
+        finally:
+            _current_budget.reset(token)
+
+        if budget.degraded:
+            logger.warning(f"Частичный результат поиска, деградировавшие стадии: {budget.degraded}")
+        return SearchResults(results[:request.limit], degraded=dict(budget.degraded))
+
+    async def _search_stages(self, request: SearchRequest) -> List[SearchResult]:
+        """Выбор стратегии и выполнение поиска"""
         logger.info(f"Начат поиск: query='{request.query}', mode={request.mode.value}")
 
         # Выбор стратегии поиска
@@ -133,7 +467,7 @@ class BSLSearchService:
             results = await self._semantic_search(request)
 
         logger.info(f"Поиск завершен: найдено {len(results)} результатов")
-        return results[:request.limit]
+        return results
 
     async def _semantic_search(self, request: SearchRequest) -> List[SearchResult]:
         """Векторный поиск через Qdrant"""
@@ -166,6 +500,7 @@ class BSLSearchService:
                     metadata=r
                 ))
 
+            self._emit("vector", results)
             return results
 
         except Exception as e:
@@ -235,6 +570,7 @@ class BSLSearchService:
                     metadata=r
                 ))
 
+            self._emit("hybrid", results)
             return results
 
         except Exception as e:
@@ -257,7 +593,7 @@ class BSLSearchService:
         intent = None
         if self.llm and request.use_llm_reranking:
             try:
-                intent_result = self.llm.classify_intent(request.query)
+                intent_result = await self.run_blocking("intent", self.llm.classify_intent, request.query)
                 intent = intent_result.intent
                 logger.info(f"Intent: {intent.value}, confidence: {intent_result.confidence:.2f}")
             except Exception as e:
@@ -291,7 +627,9 @@ class BSLSearchService:
                 ]
 
                 # LLM re-ranking
-                reranked = self.llm.rerank_results(
+                reranked = await self.run_blocking(
+                    "rerank",
+                    self.llm.rerank_results,
                     query=request.query,
                     results=results_for_llm,
                     top_k=request.limit
@@ -309,45 +647,69 @@ class BSLSearchService:
                 logger.info(f"LLM re-ranking выполнен: {len(reranked_results)} результатов")
                 return reranked_results
 
+            except StageTimeout as e:
+                # Бюджет исчерпан - штатная ситуация, возвращаем исходный порядок
+                logger.info(f"LLM re-ranking пропущен: {e}")
             except Exception as e:
                 logger.error(f"Ошибка LLM re-ranking: {e}")
                 # Возвращаем оригинальные результаты
 
         return results
 
+    def _record_stage(self, stage: str, started: float) -> float:
+        """Учет времени стадии multi-stage поиска (мс)"""
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        stats = self.stage_stats[stage]
+        stats["calls"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["last_ms"] = round(elapsed_ms, 1)
+        return elapsed_ms
+
     async def _multi_stage_search(self, request: SearchRequest) -> List[SearchResult]:
         """
         Многостадийный поиск
 
         Стадия 1: Быстрый широкий поиск (semantic)
-        Стадия 2: Уточнение через граф (graph enrichment)
-        Стадия 3: Финальный hybrid search на топ результатах
-        Стадия 4: LLM re-ranking
+        Стадия 2: Уточнение через граф (признаки из payload или один пакетный запрос)
+        Стадия 3: Hybrid scoring по метрикам графа
+        Стадия 4: LLM re-ranking только лучших limit * 2
         """
         logger.debug("Выполняется multi-stage search")
+        timings = {}
 
         # Стадия 1: Широкий semantic search
+        started = time.perf_counter()
         semantic_results = await self._semantic_search(
             SearchRequest(
                 query=request.query,
-                limit=request.limit * 5  # Широкая выборка
+                limit=request.limit * 5,  # Широкая выборка
+                module_types=request.module_types,
+                file_path_pattern=request.file_path_pattern,
+                min_score=request.min_score
             )
         )
+        timings["semantic"] = self._record_stage("semantic", started)
 
         if not semantic_results:
             return []
 
         # Стадия 2: Enrichment через граф
-        # (Добавление информации о зависимостях из Neo4j)
+        started = time.perf_counter()
         enriched_results = await self._enrich_with_graph(semantic_results)
+        timings["graph_enrichment"] = self._record_stage("graph_enrichment", started)
 
         # Стадия 3: Hybrid scoring на обогащенных результатах
-        # (Пересчет scores с учетом графовых метрик)
+        started = time.perf_counter()
         hybrid_scored = await self._apply_hybrid_scoring(enriched_results)
+        timings["hybrid_scoring"] = self._record_stage("hybrid_scoring", started)
+
+        final_results = hybrid_scored[:request.limit]
+        self._emit("hybrid", final_results)
 
         # Стадия 4: LLM re-ranking финального набора
         if self.llm and request.use_llm_reranking:
             top_candidates = hybrid_scored[:request.limit * 2]
+            started = time.perf_counter()
 
             try:
                 results_for_llm = [
@@ -361,27 +723,35 @@ class BSLSearchService:
                     for r in top_candidates
                 ]
 
-                reranked = self.llm.rerank_results(
+                reranked = await self.run_blocking(
+                    "rerank",
+                    self.llm.rerank_results,
                     query=request.query,
                     results=results_for_llm,
                     top_k=request.limit
                 )
 
-                final_results = []
+                reranked_results = []
                 for rr in reranked:
                     original_result = top_candidates[rr.original_index]
                     original_result.score = rr.new_score
                     original_result.reranked = True
                     original_result.reasoning = rr.reasoning
-                    final_results.append(original_result)
-
-                return final_results
+                    reranked_results.append(original_result)
+                final_results = reranked_results or final_results
 
+            except StageTimeout as e:
+                logger.info(f"LLM re-ranking в multi-stage пропущен: {e}")
             except Exception as e:
                 logger.error(f"Ошибка LLM re-ranking в multi-stage: {e}")
-                return hybrid_scored[:request.limit]
 
-        return hybrid_scored[:request.limit]
+            timings["llm_rerank"] = self._record_stage("llm_rerank", started)
+
+        logger.info(
+            "Multi-stage search: " +
+            ", ".join(f"{stage} {elapsed:.0f}ms" for stage, elapsed in timings.items())
+        )
+        return final_results
 
     async def _manual_hybrid_search(self, request: SearchRequest) -> List[SearchResult]:
         """Ручное объединение semantic + graph поиска"""
@@ -410,22 +780,29 @@ class BSLSearchService:
         combined = self._merge_results(
             semantic_results,
             graph_results,
-            weights={"semantic": 0.6, "graph": 0.4}
+            weights={"semantic": 0.6, "graph": 0.4},
+            top_k=request.limit * 2
         )
 
+        self._emit("hybrid", combined)
         return combined
 
     def _merge_results(
         self,
         *result_sets,
-        weights: Dict[str, float] = None
+        weights: Dict[str, float] = None,
+        top_k: Optional[int] = None
     ) -> List[SearchResult]:
         """
         Объединение результатов из разных источников
 
+        Источники объединяются по рангам (ResultFusion), score результата -
+        объединенная оценка 0..1, исходная оценка остается в original_score.
+
         Args:
             result_sets: Наборы результатов для объединения
             weights: Веса для каждого источника
+            top_k: Сколько лучших результатов вернуть (None - все)
 
         Returns:
             Объединенный и отсортированный список
@@ -433,54 +810,102 @@ class BSLSearchService:
         if not weights:
             weights = {"semantic": 0.5, "graph": 0.5}
 
-        # Дедупликация по file_path
-        unique_results = {}
-
+        fusion = ResultFusion(method=self.fusion_method, weights=weights)
         for results in result_sets:
             if not results:
                 continue
+            fusion.add(
+                results[0].source,
+                results,
+                key=lambda r: r.file_path,
+                score=lambda r: r.score
+            )
 
-            for result in results:
-                path = result.file_path
+        merged = []
+        for fused in fusion.top(top_k):
+            result = fused.item
+            result.score = fused.score
+            result.source = "+".join(fused.sources)
+            merged.append(result)
+
+        return merged
+
+    def _graph_metrics_batch(self, file_paths: List[str]) -> Dict[str, Dict]:
+        """Метрики графа для пачки файлов (синхронно, в пуле потоков neo4j)"""
+        if self.hybrid and hasattr(self.hybrid, 'get_graph_metrics_batch'):
+            return self.hybrid.get_graph_metrics_batch(file_paths)
+
+        if self.graph_metrics_cache:
+            driver = self.neo4j.driver
+            return self.graph_metrics_cache.get_many(
+                file_paths,
+                lambda missing: fetch_graph_metrics(driver, missing)
+            )
 
-                if path in unique_results:
-                    # Комбинируем scores с учетом весов
-                    existing = unique_results[path]
-                    weight_key = result.source
-                    weight = weights.get(weight_key, 0.5)
+        return {}
 
-                    # Weighted average
-                    existing.score = (
-                        existing.score * (1 - weight) +
-                        result.score * weight
-                    )
+    async def _enrich_with_graph(self, results: List[SearchResult]) -> List[SearchResult]:
+        """
+        Обогащение результатов данными из графа
 
-                    # Объединяем источники
-                    if result.source not in existing.source:
-                        existing.source = f"{existing.source}+{result.source}"
-                else:
-                    unique_results[path] = result
+        metadata['graph'] - incoming_calls, outgoing_calls, related_count:
+        из признаков графа в payload Qdrant (services/graph_features.py), для
+        результатов без признаков - один пакетный запрос к Neo4j.
+        """
+        missing = []
+        for result in results:
+            if result.metadata is None:
+                result.metadata = {}
+            features = result.metadata.get("graph_features")
+            if features:
+                result.metadata["graph"] = {
+                    "incoming_calls": features["incoming_calls"],
+                    "outgoing_calls": features["outgoing_calls"],
+                    "related_count": features["related_count"],
+                    "source": "payload"
+                }
+            else:
+                missing.append(result)
 
-        # Сортировка по score
-        sorted_results = sorted(
-            unique_results.values(),
-            key=lambda x: x.score,
-            reverse=True
-        )
+        if not missing:
+            return results
 
-        return sorted_results
+        metrics = {}
+        try:
+            metrics = await self.run_blocking(
+                "graph",
+                self._graph_metrics_batch,
+                [result.file_path for result in missing]
+            )
+        except Exception as e:
+            logger.warning(f"Метрики графа недоступны: {e}")
+
+        for result in missing:
+            graph_metrics = metrics.get(result.file_path)
+            result.metadata["graph"] = {
+                "incoming_calls": graph_metrics["incoming_calls"] if graph_metrics else 0,
+                "outgoing_calls": graph_metrics["outgoing_calls"] if graph_metrics else 0,
+                "related_count": len(graph_metrics["related_modules"]) if graph_metrics else 0,
+                "related_modules": graph_metrics["related_modules"] if graph_metrics else [],
+                "source": "neo4j" if graph_metrics else "none"
+            }
 
-    async def _enrich_with_graph(self, results: List[SearchResult]) -> List[SearchResult]:
-        """Обогащение результатов данными из графа"""
-        # TODO: Реализация
-        # Добавить метрики из Neo4j (fan-in, fan-out, centrality)
+        logger.debug(f"Graph enrichment: {len(results) - len(missing)} из payload, {len(missing)} из Neo4j")
         return results
 
     async def _apply_hybrid_scoring(self, results: List[SearchResult]) -> List[SearchResult]:
-        """Применение гибридного scoring к результатам"""
-        # TODO: Реализация
-        # Пересчет scores с учетом графовых метрик
-        return results
+        """
+        Применение гибридного scoring к результатам
+
+        Score пересчитывается по semantic score и метрикам графа
+        (graph_features.hybrid_score, те же веса, что в HybridSearchEngine)
+        """
+        for result in results:
+            graph_metrics = (result.metadata or {}).get("graph")
+            if graph_metrics:
+                result.score = hybrid_score(result.original_score, graph_metrics)
+
+        return sorted(results, key=lambda r: r.score, reverse=True)
 
     # Вспомогательные методы для вызова реальных сервисов
 
@@ -506,26 +931,15 @@ class BSLSearchService:
             return []
 
         try:
-            # Импорт зависимостей
-            from services.embedding_service import EmbeddingService
-            from qdrant_client import QdrantClient
-
-            # Инициализация сервисов (если нужно)
-            if not hasattr(self, '_embedding_service'):
-                self._embedding_service = EmbeddingService(
-                    ollama_host="http://localhost:11434",
-                    model="nomic-embed-text"
-                )
-
+            # Инициализация клиентов (проверка Ollama - сетевой запрос)
             if not hasattr(self, '_qdrant_client'):
-                self._qdrant_client = QdrantClient(
-                    host="localhost",
-                    port=6333
-                )
+                await self.run_blocking("embed", self._init_search_clients)
 
             # Генерация embedding для запроса
             logger.debug(f"Генерация embedding для запроса: '{query[:50]}...'")
-            query_embedding = self._embedding_service.create_embedding(query)
+            query_embedding = await self.run_blocking(
+                "embed", self._embedding_service.create_embedding, query
+            )
 
             if not query_embedding:
                 logger.error("Не удалось создать embedding для запроса")
@@ -544,7 +958,7 @@ class BSLSearchService:
                 search_params["query_filter"] = filters
 
             logger.debug(f"Поиск в Qdrant: collection=bsl_code, limit={limit}")
-            search_results = self._qdrant_client.search(**search_params)
+            search_results = await self.run_blocking("vector", self._qdrant_client.search, **search_params)
 
             # Преобразование результатов
             results = []
@@ -560,7 +974,8 @@ class BSLSearchService:
                     "functions": payload.get("functions", []),
                     "procedures": payload.get("procedures", []),
                     "file_size": payload.get("file_size", 0),
-                    "indexed_at": payload.get("indexed_at", "")
+                    "indexed_at": payload.get("indexed_at", ""),
+                    "graph_features": graph_features_from_payload(payload)
                 })
 
             logger.info(f"Qdrant search завершен: найдено {len(results)} результатов")
@@ -569,10 +984,35 @@ class BSLSearchService:
         except ImportError as e:
             logger.error(f"Ошибка импорта зависимостей: {e}")
             return []
+        except StageTimeout:
+            return []
         except Exception as e:
             logger.error(f"Ошибка Qdrant search: {e}", exc_info=True)
             return []
 
+    def _init_search_clients(self):
+        """Создание клиентов embedding и Qdrant (один раз)"""
+        from services.embedding_service import EmbeddingService
+        from qdrant_client import QdrantClient
+
+        with self._clients_lock:
+            if hasattr(self, '_qdrant_client'):
+                return
+
+            self._embedding_service = EmbeddingService(
+                ollama_host="http://localhost:11434",
+                model="nomic-embed-text"
+            )
+            self._qdrant_client = QdrantClient(
+                host="localhost",
+                port=6333
+            )
+
+    def _run_cypher(self, cypher_query: str, parameters: Dict[str, Any]) -> List[Dict]:
+        """Синхронное выполнение Cypher запроса (в пуле потоков neo4j)"""
+        with self.neo4j.driver.session() as session:
+            return [record.data() for record in session.run(cypher_query, parameters)]
+
     async def _call_neo4j_search(
         self,
         query: str,
@@ -633,7 +1073,9 @@ class BSLSearchService:
             """
 
             # Выполнение запроса
-            results = self.neo4j.execute_query(
+            results = await self.run_blocking(
+                "graph",
+                self._run_cypher,
                 cypher_query,
                 {"keywords": keywords, "limit": limit}
             )
@@ -663,6 +1105,8 @@ class BSLSearchService:
             logger.info(f"Neo4j search завершен: найдено {len(formatted_results)} результатов")
             return formatted_results
 
+        except StageTimeout:
+            return []
         except Exception as e:
             logger.error(f"Ошибка Neo4j search: {e}", exc_info=True)
             return []
@@ -737,11 +1181,12 @@ class BSLSearchService:
                 semantic_results=semantic_results,
                 graph_results=graph_results,
                 semantic_weight=0.6,
-                graph_weight=0.4
+                graph_weight=0.4,
+                top_k=limit
             )
 
             logger.info(f"Hybrid search завершен: {len(combined_results)} результатов")
-            return combined_results[:limit]
+            return combined_results
 
         except Exception as e:
             logger.error(f"Ошибка hybrid search: {e}", exc_info=True)
@@ -900,7 +1345,8 @@ class BSLSearchService:
         semantic_results: List[Dict],
         graph_results: List[Dict],
         semantic_weight: float = 0.6,
-        graph_weight: float = 0.4
+        graph_weight: float = 0.4,
+        top_k: Optional[int] = None
     ) -> List[Dict]:
         """
         Объединение результатов semantic и graph поиска
@@ -910,73 +1356,53 @@ class BSLSearchService:
             graph_results: Результаты графового поиска
             semantic_weight: Вес semantic результатов
             graph_weight: Вес graph результатов
+            top_k: Сколько лучших результатов вернуть (None - все)
 
         Returns:
             Объединенный список результатов
         """
-        # Индексация результатов по file_path
-        combined = {}
+        fusion = ResultFusion(
+            method=self.fusion_method,
+            weights={"semantic": semantic_weight, "graph": graph_weight}
+        )
+        fusion.add(
+            "semantic",
+            semantic_results,
+            key=lambda r: r.get("file_path", ""),
+            score=lambda r: r.get("score", 0.5)
+        )
+        fusion.add(
+            "graph",
+            graph_results,
+            key=lambda r: r.get("file_path", ""),
+            score=lambda r: r.get("relevance", 0.5)
+        )
 
-        # Добавление semantic результатов
-        for result in semantic_results:
-            file_path = result.get("file_path", "")
-            if not file_path:
-                continue
+        combined = []
+        for fused in fusion.top(top_k):
+            result = fused.item
 
-            combined[file_path] = {
-                "file_path": file_path,
+            combined_result = {
+                "file_path": fused.key,
                 "module_type": result.get("module_type", "Unknown"),
-                "combined_score": result.get("score", 0.5) * semantic_weight,
-                "semantic_score": result.get("score", 0.5),
-                "graph_score": 0.0,
+                "combined_score": fused.score,
+                "semantic_score": fused.source_scores.get("semantic", 0.0),
+                "graph_score": fused.source_scores.get("graph", 0.0),
                 "summary": result.get("summary", ""),
                 "functions_count": result.get("functions_count", 0),
-                "variables_count": result.get("variables_count", 0),
                 "functions": result.get("functions", []),
-                "source": "semantic"
+                "source": "+".join(fused.sources)
             }
+            if "variables_count" in result:
+                combined_result["variables_count"] = result["variables_count"]
 
-        # Добавление graph результатов
-        for result in graph_results:
-            file_path = result.get("file_path", "")
-            if not file_path:
-                continue
-
-            graph_score = result.get("relevance", 0.5)
+            # Дополняем информацию из графа
+            if "graph" in fused.items:
+                combined_result["dependencies"] = fused.items["graph"].get("dependencies", [])
+            combined.append(combined_result)
 
-            if file_path in combined:
-                # Файл уже есть - обновляем combined_score
-                combined[file_path]["combined_score"] += graph_score * graph_weight
-                combined[file_path]["graph_score"] = graph_score
-                combined[file_path]["source"] = "semantic+graph"
-
-                # Дополняем информацию из графа
-                if "dependencies" in result:
-                    combined[file_path]["dependencies"] = result["dependencies"]
-            else:
-                # Новый файл из graph поиска
-                combined[file_path] = {
-                    "file_path": file_path,
-                    "module_type": result.get("module_type", "Unknown"),
-                    "combined_score": graph_score * graph_weight,
-                    "semantic_score": 0.0,
-                    "graph_score": graph_score,
-                    "summary": result.get("summary", ""),
-                    "functions_count": result.get("functions_count", 0),
-                    "functions": result.get("functions", []),
-                    "dependencies": result.get("dependencies", []),
-                    "source": "graph"
-                }
-
-        # Сортировка по combined_score
-        sorted_results = sorted(
-            combined.values(),
-            key=lambda x: x["combined_score"],
-            reverse=True
-        )
-
-        logger.debug(f"Объединено {len(sorted_results)} уникальных результатов")
-        return sorted_results
+        logger.debug(f"Объединено {len(combined)} результатов")
+        return combined
 
 
 # Singleton instance
@@ -0,0 +1,751 @@
+"""
+Call Graph Engine - граф вызовов BSL в памяти процесса
+
+Граф CALLS/CONTAINS загружается из Neo4j один раз в компактные массивы
+NumPy (CSR: смещения + индексы соседей) и перечитывается только при
+смене версии графа (services/graph_version.py). Метрики, которые раньше
+считались Cypher-запросами с цепочками OPTIONAL MATCH по всему графу
+(fan-in/fan-out, мертвый код, coupling), вычисляются векторными
+операциями по массивам за миллисекунды. Циклы ищутся через компоненты
+сильной связности (Тарьян) - линейно по размеру графа, сообщества
+модулей - методом Louvain (services/graph_communities.py), транзитивное
+влияние изменений - по замыканию сжатого графа компонент
+(services/graph_impact.py).
+
+Результаты возвращаются в виде записей с теми же ключами, что и Cypher
+запросы GraphAnalyzer.
+"""
+
+import sys
+import time
+import logging
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.graph_communities import detect_module_communities
+from services.graph_impact import ImpactIndex
+from services.graph_paths import module_path_keys, normalize_module_path
+from services.graph_version import get_graph_version
+
+logger = logging.getLogger(__name__)
+
+METHODS_QUERY = """
+    MATCH (n)
+    WHERE n:Function OR n:Procedure
+    OPTIONAL MATCH (m:Module)-[:CONTAINS]->(n)
+    RETURN n.id AS id,
+           n.name AS name,
+           labels(n)[0] AS label,
+           coalesce(n.is_export, false) AS is_export,
+           m.id AS module_id
+"""
+
+MODULES_QUERY = """
+    MATCH (m:Module)
+    RETURN m.id AS id, m.name AS name, m.file_path AS file_path, m.path_key AS path_key
+"""
+
+CALLS_QUERY = """
+    MATCH (s)-[c:CALLS]->(t)
+    WHERE (s:Function OR s:Procedure) AND (t:Function OR t:Procedure)
+    RETURN s.id AS source, t.id AS target, coalesce(c.call_count, 1) AS call_count
+"""
+
+LABEL_CODES = {'Function': 0, 'Procedure': 1}
+LABEL_NAMES = ['Function', 'Procedure']
+
+
+def _csr(rows: "np.ndarray", cols: "np.ndarray", size: int):
+    """
+    CSR представление списка ребер
+
+    Returns:
+        (indptr, indices, order): соседи вершины i - indices[indptr[i]:indptr[i + 1]],
+        order - перестановка ребер (для весов)
+    """
+    order = np.argsort(rows, kind='stable')
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=size), out=indptr[1:])
+    return indptr, cols[order], order
+
+
+def _count_distinct_pairs(keys: "np.ndarray", values: "np.ndarray", size: int) -> "np.ndarray":
+    """Количество различных values для каждого key (values >= 0)"""
+    mask = values >= 0
+    keys = keys[mask].astype(np.int64)
+    values = values[mask].astype(np.int64)
+    if not len(keys):
+        return np.zeros(size, dtype=np.int64)
+    span = int(values.max()) + 1
+    unique = np.unique(keys * span + values)
+    return np.bincount(unique // span, minlength=size)
+
+
+def strongly_connected_components(indptr: List[int], indices: List[int]) -> Tuple[List[int], List[List[int]]]:
+    """
+    Компоненты сильной связности (алгоритм Тарьяна, без рекурсии)
+
+    Args:
+        indptr: CSR смещения исходящих ребер
+        indices: CSR индексы соседей
+
+    Returns:
+        (component_of, components): номер компоненты каждой вершины и списки
+        вершин компонент; компоненты идут в обратном топологическом порядке
+        (сначала те, из которых нет ребер в еще не выданные)
+    """
+    n = len(indptr) - 1
+    index = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    component_of = [-1] * n
+    stack: List[int] = []
+    components: List[List[int]] = []
+    counter = 0
+
+    for root in range(n):
+        if index[root] != -1:
+            continue
+
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [[root, indptr[root]]]
+
+        while work:
+            frame = work[-1]
+            v, pos = frame
+
+            if pos < indptr[v + 1]:
+                frame[1] = pos + 1
+                w = indices[pos]
+                if index[w] == -1:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    work.append([w, indptr[w]])
+                elif on_stack[w] and index[w] < low[v]:
+                    low[v] = index[w]
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if low[v] < low[parent]:
+                    low[parent] = low[v]
+
+            if low[v] == index[v]:
+                component_id = len(components)
+                component = []
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = False
+                    component_of[w] = component_id
+                    component.append(w)
+                    if w == v:
+                        break
+                components.append(component)
+
+    return component_of, components
+
+
+class CallGraphSnapshot:
+    """
+    Граф вызовов одной версии
+
+    Вершины - методы (Function/Procedure), индексы 0..n-1.
+    Модули - индексы 0..m-1, module_of[i] = -1 для методов вне модулей
+    (цели вызовов, загруженные без своего модуля).
+    """
+
+    def __init__(self, version: Optional[str], methods: List[Dict], modules: List[Dict], calls: List[Dict]):
+        """
+        Args:
+            version: Версия графа
+            methods: Записи METHODS_QUERY
+            modules: Записи MODULES_QUERY
+            calls: Записи CALLS_QUERY
+        """
+        self.version = version
+        self.loaded_at = time.time()
+
+        # Модули
+        self.module_ids = [m['id'] for m in modules]
+        self.module_names = [m['name'] for m in modules]
+        self.module_paths = [m['file_path'] for m in modules]
+        self.module_by_key = {
+            m.get('path_key') or normalize_module_path(m['file_path']): i
+            for i, m in enumerate(modules) if m['file_path']
+        }
+        module_index = {module_id: i for i, module_id in enumerate(self.module_ids)}
+
+        # Методы
+        self.method_ids = [m['id'] for m in methods]
+        self.names = [m['name'] for m in methods]
+        self.index = {method_id: i for i, method_id in enumerate(self.method_ids)}
+        self.labels = np.array([LABEL_CODES.get(m['label'], 0) for m in methods], dtype=np.int8)
+        self.is_export = np.array([bool(m['is_export']) for m in methods], dtype=bool)
+        self.module_of = np.array(
+            [module_index.get(m['module_id'], -1) for m in methods], dtype=np.int32
+        )
+
+        n = len(self.method_ids)
+        self.size = n
+        self.modules_count = len(self.module_ids)
+
+        # Ребра CALLS (MERGE в загрузчике - не больше одного ребра на пару)
+        index = self.index
+        edges = [(index.get(c['source']), index.get(c['target']), c['call_count']) for c in calls]
+        edges = [e for e in edges if e[0] is not None and e[1] is not None]
+        self.src = np.array([e[0] for e in edges], dtype=np.int32)
+        self.dst = np.array([e[1] for e in edges], dtype=np.int32)
+        self.weights = np.array([e[2] for e in edges], dtype=np.int32)
+
+        # CSR по исходящим и входящим ребрам
+        self.out_ptr, self.out_idx, out_order = _csr(self.src, self.dst, n)
+        self.out_weights = self.weights[out_order]
+        self.in_ptr, self.in_idx, _ = _csr(self.dst, self.src, n)
+
+        self._compute_metrics()
+
+        # Компоненты сильной связности - при первом запросе циклов
+        self._components: Optional[Tuple["np.ndarray", List[List[int]]]] = None
+        # Сообщества модулей по параметру разрешения - при первом запросе
+        self._communities: Dict[float, Dict] = {}
+        # Индекс достижимости - при первом запросе влияния
+        self._impact: Optional[ImpactIndex] = None
+
+    def find_module(self, file_path: str) -> Optional[int]:
+        """
+        Индекс модуля по пути из внешнего источника
+
+        Как и Cypher запросы (services/graph_paths.py): самый длинный
+        совпавший path_key, поэтому абсолютный путь или путь с другими
+        слешами и регистром находит тот же модуль.
+
+        Args:
+            file_path: Путь к файлу модуля
+
+        Returns:
+            Индекс модуля или None
+        """
+        for key in module_path_keys(file_path):
+            module = self.module_by_key.get(key)
+            if module is not None:
+                return module
+        return None
+
+    def _compute_metrics(self):
+        """Метрики, зависящие только от версии графа"""
+        n = self.size
+        m = self.modules_count
+        src_module = self.module_of[self.src]
+        dst_module = self.module_of[self.dst]
+
+        # Методы
+        self.in_calls = np.diff(self.in_ptr)
+        self.out_calls = np.diff(self.out_ptr)
+        self.fan_in = _count_distinct_pairs(self.dst, src_module, n)
+        self.fan_out = _count_distinct_pairs(self.src, dst_module, n)
+
+        # Модули
+        contained = self.module_of >= 0
+        owners = self.module_of[contained]
+        labels = self.labels[contained]
+        self.module_functions = np.bincount(owners[labels == 0], minlength=m)
+        self.module_procedures = np.bincount(owners[labels == 1], minlength=m)
+        self.module_in = np.bincount(dst_module[dst_module >= 0], minlength=m)
+        self.module_out = np.bincount(src_module[src_module >= 0], minlength=m)
+
+        # Coupling: различные другие модули, связанные вызовом в любую сторону
+        linked = (src_module >= 0) & (dst_module >= 0) & (src_module != dst_module)
+        a = src_module[linked]
+        b = dst_module[linked]
+        self.coupling = _count_distinct_pairs(
+            np.concatenate([a, b]), np.concatenate([b, a]), m
+        )
+
+    def callees(self, node: int) -> "np.ndarray":
+        """Методы, которые вызывает node"""
+        return self.out_idx[self.out_ptr[node]:self.out_ptr[node + 1]]
+
+    def callers(self, node: int) -> "np.ndarray":
+        """Методы, которые вызывают node"""
+        return self.in_idx[self.in_ptr[node]:self.in_ptr[node + 1]]
+
+    def module_edges(self) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """
+        Граф зависимостей модулей: A -> B, если метод A вызывает метод B
+
+        Returns:
+            (src, dst, weights) - индексы модулей и количество пар методов
+        """
+        src_module = self.module_of[self.src].astype(np.int64)
+        dst_module = self.module_of[self.dst].astype(np.int64)
+        linked = (src_module >= 0) & (dst_module >= 0) & (src_module != dst_module)
+
+        keys = src_module[linked] * max(self.modules_count, 1) + dst_module[linked]
+        pairs, weights = np.unique(keys, return_counts=True)
+        span = max(self.modules_count, 1)
+        return pairs // span, pairs % span, weights
+
+    def components(self) -> Tuple["np.ndarray", List[List[int]]]:
+        """
+        Компоненты сильной связности графа вызовов
+
+        Returns:
+            (component_of, components) - см. strongly_connected_components
+        """
+        if self._components is None:
+            component_of, components = strongly_connected_components(
+                self.out_ptr.tolist(), self.out_idx.tolist()
+            )
+            self._components = (np.array(component_of, dtype=np.int32), components)
+        return self._components
+
+    def communities(self, resolution: float = 1.0) -> Dict:
+        """
+        Сообщества модулей (Louvain), вычисляются один раз на версию графа
+
+        Args:
+            resolution: Параметр разрешения (больше - мельче сообщества)
+
+        Returns:
+            См. detect_module_communities
+        """
+        result = self._communities.get(resolution)
+        if result is None:
+            start_time = time.time()
+            result = detect_module_communities(self, resolution=resolution)
+            self._communities[resolution] = result
+            logger.info(
+                f"Communities: {len(result['communities'])} "
+                f"(modularity {result['modularity']:.3f}, {time.time() - start_time:.2f}s)"
+            )
+        return result
+
+    def impact_index(self) -> ImpactIndex:
+        """Индекс транзитивной достижимости (строится один раз на версию графа)"""
+        if self._impact is None:
+            self._impact = ImpactIndex(self)
+        return self._impact
+
+    def shortest_cycle(self, node: int) -> List[int]:
+        """
+        Кратчайший цикл через node (поиск в ширину внутри его компоненты)
+
+        Args:
+            node: Индекс метода
+
+        Returns:
+            Вершины цикла [node, ..., node] или [] если node не в цикле
+        """
+        component_of = self.components()[0]
+        component = component_of[node]
+        out_ptr, out_idx = self.out_ptr, self.out_idx
+
+        parent = {node: -1}
+        queue = deque([node])
+        while queue:
+            v = queue.popleft()
+            for w in out_idx[out_ptr[v]:out_ptr[v + 1]].tolist():
+                if w == node:
+                    path = [node]
+                    while v != -1:
+                        path.append(v)
+                        v = parent[v]
+                    path.reverse()
+                    return path
+                if w not in parent and component_of[w] == component:
+                    parent[w] = v
+                    queue.append(w)
+        return []
+
+    def memory_bytes(self) -> int:
+        """Размер массивов NumPy"""
+        return sum(
+            value.nbytes for value in vars(self).values() if isinstance(value, np.ndarray)
+        )
+
+
+class CallGraphEngine:
+    """
+    Граф вызовов в памяти с обновлением по версии графа
+
+    Версия проверяется не чаще раза в check_interval секунд; между
+    проверками запросы обслуживаются без обращения к Neo4j.
+
+    Использование:
+        engine = CallGraphEngine(driver)
+        records = engine.hotspots(top_n=20, min_calls=5)
+    """
+
+    def __init__(self, driver, check_interval: float = 10.0):
+        """
+        Args:
+            driver: Neo4j driver
+            check_interval: Интервал проверки версии графа (секунды)
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy is required for CallGraphEngine")
+
+        self.driver = driver
+        self.check_interval = check_interval
+
+        self._snapshot: Optional[CallGraphSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+        self.stats = {
+            'loads': 0,
+            'version_checks': 0,
+            'load_time_s': 0.0
+        }
+
+    def _load(self, version: Optional[str]) -> CallGraphSnapshot:
+        """Чтение графа из Neo4j"""
+        start_time = time.time()
+
+        with self.driver.session() as session:
+            methods = session.run(METHODS_QUERY).data()
+            modules = session.run(MODULES_QUERY).data()
+            calls = session.run(CALLS_QUERY).data()
+
+        snapshot = CallGraphSnapshot(version, methods, modules, calls)
+
+        elapsed = time.time() - start_time
+        self.stats['loads'] += 1
+        self.stats['load_time_s'] += elapsed
+        logger.info(
+            f"Call graph loaded: {snapshot.size} methods, {len(snapshot.src)} calls, "
+            f"{snapshot.modules_count} modules (version {version}, {elapsed:.2f}s)"
+        )
+        return snapshot
+
+    def snapshot(self) -> CallGraphSnapshot:
+        """
+        Актуальный граф (перечитывается при смене версии)
+
+        Returns:
+            CallGraphSnapshot
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and time.time() - self._checked_at < self.check_interval:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and time.time() - self._checked_at < self.check_interval:
+                return snapshot
+
+            version = get_graph_version(self.driver)
+            self.stats['version_checks'] += 1
+
+            # Neo4j недоступен - отдаем последний загруженный граф
+            if snapshot is None or (version is not None and version != snapshot.version):
+                snapshot = self._load(version)
+                self._snapshot = snapshot
+
+            self._checked_at = time.time()
+            return snapshot
+
+    def invalidate(self):
+        """Принудительное перечитывание графа при следующем запросе"""
+        with self._lock:
+            self._snapshot = None
+            self._checked_at = 0.0
+
+    def hotspots(self, top_n: int = 20, min_calls: int = 5) -> List[Dict]:
+        """
+        Горячие точки (записи как у GraphAnalyzer.find_hotspots)
+
+        Args:
+            top_n: Количество результатов
+            min_calls: Минимум входящих или исходящих вызовов
+
+        Returns:
+            [{name, node_type, in_calls, out_calls, fan_in, fan_out}]
+        """
+        g = self.snapshot()
+
+        candidates = np.flatnonzero((g.in_calls >= min_calls) | (g.out_calls >= min_calls))
+        total = g.in_calls[candidates] + g.out_calls[candidates]
+        top = candidates[np.argsort(-total, kind='stable')[:top_n]]
+
+        return [
+            {
+                'name': g.names[i],
+                'node_type': LABEL_NAMES[g.labels[i]],
+                'in_calls': int(g.in_calls[i]),
+                'out_calls': int(g.out_calls[i]),
+                'fan_in': int(g.fan_in[i]),
+                'fan_out': int(g.fan_out[i])
+            }
+            for i in top
+        ]
+
+    def dead_code(self, include_exports: bool = False) -> List[Dict]:
+        """
+        Методы модулей без входящих вызовов (записи как у GraphAnalyzer.find_dead_code)
+
+        Args:
+            include_exports: Включать экспортные методы
+
+        Returns:
+            [{name, module, node_type, is_export}], по модулю и имени
+        """
+        g = self.snapshot()
+
+        mask = (g.module_of >= 0) & (g.in_calls == 0)
+        if not include_exports:
+            mask &= ~g.is_export
+
+        records = [
+            {
+                'name': g.names[i],
+                'module': g.module_names[g.module_of[i]],
+                'node_type': LABEL_NAMES[g.labels[i]],
+                'is_export': bool(g.is_export[i])
+            }
+            for i in np.flatnonzero(mask)
+        ]
+        records.sort(key=lambda r: (r['module'] or '', r['name'] or ''))
+        return records
+
+    def module_complexity(self, module_name: Optional[str] = None) -> List[Dict]:
+        """
+        Метрики модулей (записи как у GraphAnalyzer.calculate_module_complexity)
+
+        Args:
+            module_name: Имя модуля (опционально)
+
+        Returns:
+            [{module_name, file_path, func_count, proc_count, total_in, total_out, coupling}]
+        """
+        g = self.snapshot()
+
+        if module_name:
+            selected = np.array(
+                [i for i, name in enumerate(g.module_names) if name == module_name], dtype=np.int64
+            )
+        else:
+            selected = np.arange(g.modules_count)
+
+        total = g.module_in[selected] + g.module_out[selected]
+        selected = selected[np.argsort(-total, kind='stable')]
+
+        return [
+            {
+                'module_name': g.module_names[i],
+                'file_path': g.module_paths[i],
+                'func_count': int(g.module_functions[i]),
+                'proc_count': int(g.module_procedures[i]),
+                'total_in': int(g.module_in[i]),
+                'total_out': int(g.module_out[i]),
+                'coupling': int(g.coupling[i])
+            }
+            for i in selected
+        ]
+
+    def cycles(self, max_length: Optional[int] = None, min_length: int = 2) -> List[Dict]:
+        """
+        Циклические зависимости: компоненты сильной связности графа вызовов
+
+        Каждая компонента (взаимно рекурсивные методы) описывается кратчайшим
+        циклом через метод с наибольшим числом вызовов в ней.
+
+        Args:
+            max_length: Максимальная длина представительного цикла
+            min_length: Минимальная длина представительного цикла
+
+        Returns:
+            [{cycle_path, cycle_length, modules, component_size, component}],
+            по убыванию размера компоненты
+        """
+        g = self.snapshot()
+        component_of, components = g.components()
+        degree = g.in_calls + g.out_calls
+
+        records = []
+        for component in components:
+            if len(component) == 1 and component[0] not in g.callees(component[0]):
+                continue
+
+            members = np.array(component, dtype=np.int64)
+            representative = int(members[np.argmax(degree[members])])
+            cycle = g.shortest_cycle(representative)
+            cycle_length = len(cycle) - 1
+
+            if cycle_length < min_length or (max_length and cycle_length > max_length):
+                continue
+
+            modules = sorted({
+                g.module_paths[m] for m in g.module_of[members].tolist() if m >= 0
+            })
+            records.append({
+                'cycle_path': [g.names[i] for i in cycle],
+                'cycle_length': cycle_length,
+                'modules': modules,
+                'component_size': len(component),
+                'component': [g.names[i] for i in sorted(component)]
+            })
+
+        records.sort(key=lambda r: (-r['component_size'], -r['cycle_length']))
+        return records
+
+    def communities(self, max_communities: Optional[int] = None, min_size: int = 2,
+                    resolution: float = 1.0) -> List[Dict]:
+        """
+        Сообщества модулей: группы, связанные вызовами сильнее, чем с остальным графом
+
+        Args:
+            max_communities: Максимальное количество сообществ
+            min_size: Минимальный размер сообщества (модулей)
+            resolution: Параметр разрешения Louvain
+
+        Returns:
+            [{community, size, modules, modularity}] по убыванию размера;
+            modules - пути файлов, первыми самые связанные
+        """
+        g = self.snapshot()
+        result = g.communities(resolution)
+
+        records = []
+        for number, members in enumerate(result['communities']):
+            if len(members) < min_size:
+                break
+            records.append({
+                'community': number,
+                'size': len(members),
+                'modules': [g.module_paths[m] for m in members],
+                'modularity': result['modularity']
+            })
+            if max_communities and len(records) >= max_communities:
+                break
+
+        return records
+
+    def module_community(self, file_path: str, resolution: float = 1.0) -> List[str]:
+        """
+        Модули из сообщества модуля file_path
+
+        Модуль ищется так же, как в impact и get_dependencies (find_module),
+        поэтому ContextManager получает зависимости и сообщество одного модуля.
+
+        Args:
+            file_path: Путь к файлу модуля
+            resolution: Параметр разрешения Louvain
+
+        Returns:
+            Пути файлов сообщества без самого модуля (первыми самые связанные)
+            или [] если модуль не найден или не входит в сообщество
+        """
+        g = self.snapshot()
+        module = g.find_module(file_path)
+        if module is None:
+            return []
+
+        result = g.communities(resolution)
+        community = int(result['community_of'][module])
+        if community < 0:
+            return []
+        return [g.module_paths[m] for m in result['communities'][community] if m != module]
+
+    def impact(self, file_path: str, method: Optional[str] = None, direction: str = 'callers',
+               depth: Optional[int] = None, limit: Optional[int] = 100) -> Optional[Dict]:
+        """
+        Транзитивное влияние: кого затронет изменение модуля/метода или от чего он зависит
+
+        Args:
+            file_path: Путь к файлу модуля
+            method: Имя метода модуля (None - все методы модуля)
+            direction: callers (затронутые вызывающие) или callees (зависимости)
+            depth: Максимальная глубина вызовов (None - без ограничения)
+            limit: Максимум методов в списке (модули возвращаются все)
+
+        Returns:
+            {file_path (путь найденного модуля), method, direction, depth,
+            methods_count, modules_count, methods: [{name, file_path, distance}],
+            modules: [{file_path, methods}]}
+            или None, если модуль или метод не найден
+        """
+        g = self.snapshot()
+        module = g.find_module(file_path)
+        if module is None:
+            return None
+
+        index = g.impact_index()
+        nodes = index.module_methods(module)
+        if method is not None:
+            name = method.lower()
+            nodes = nodes[[g.names[i] is not None and g.names[i].lower() == name for i in nodes.tolist()]]
+        if not len(nodes):
+            return None
+
+        methods, distances = index.reachable(nodes, direction=direction, depth=depth)
+
+        # Модули по количеству затронутых методов (без исходного модуля)
+        owners = g.module_of[methods]
+        counts = np.bincount(owners[owners >= 0], minlength=g.modules_count)
+        counts[module] = 0
+        affected = np.flatnonzero(counts)
+        affected = affected[np.argsort(-counts[affected], kind='stable')]
+
+        if distances is not None:
+            order = np.argsort(distances, kind='stable')
+            methods, distances = methods[order], distances[order]
+        selected = methods[:limit] if limit else methods
+
+        return {
+            'file_path': g.module_paths[module],
+            'method': method,
+            'direction': direction,
+            'depth': depth,
+            'methods_count': int(len(methods)),
+            'modules_count': int(len(affected)),
+            'methods': [
+                {
+                    'name': g.names[i],
+                    'file_path': g.module_paths[owner] if owner >= 0 else None,
+                    'distance': int(distances[position]) if distances is not None else None
+                }
+                for position, (i, owner) in enumerate(
+                    zip(selected.tolist(), g.module_of[selected].tolist())
+                )
+            ],
+            'modules': [
+                {'file_path': g.module_paths[m], 'methods': int(counts[m])}
+                for m in affected.tolist()
+            ]
+        }
+
+    def get_stats(self) -> Dict:
+        """
+        Статистика движка
+
+        Returns:
+            Словарь с версией, размером графа и количеством загрузок
+        """
+        g = self._snapshot
+        stats = dict(self.stats)
+        stats.update({
+            'version': g.version if g else None,
+            'methods': g.size if g else 0,
+            'calls': int(len(g.src)) if g else 0,
+            'modules': g.modules_count if g else 0,
+            'memory_mb': round(g.memory_bytes() / 1024 / 1024, 2) if g else 0.0,
+            'loaded_at': g.loaded_at if g else None
+        })
+        return stats
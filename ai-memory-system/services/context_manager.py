@@ -24,16 +24,29 @@ Stage 4: Context Assembly
 - Добавление метаданных
 - Структурирование для Claude Code
 
+Сборка ограничена бюджетом времени (ContextRequest.timeout_ms): стадии,
+не уложившиеся в бюджет, пропускаются, контекст собирается из того, что
+успело выполниться (AssembledContext.degraded_stages). Блокирующие вызовы
+стадий (LLM, Neo4j) выполняются в пулах бэкендов сервиса поиска
+(BSLSearchService.run_blocking) под общими лимитами одновременных запросов.
+
 ROI Impact: 30% ($14,940/год)
 """
 
+import sys
 import logging
 import asyncio
+from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, asdict
 from enum import Enum
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.search_budget import DEFAULT_SEARCH_TIMEOUT_MS, SearchBudget, StageTimeout
+from services.singleflight import SingleFlight, request_key
+
 logger = logging.getLogger(__name__)
 
 
@@ -73,6 +86,7 @@ class ContextRequest:
     temporal_window_days: Optional[int] = None  # Временное окно
     preferred_module_types: Optional[List[str]] = None
     exclude_patterns: Optional[List[str]] = None
+    timeout_ms: Optional[int] = DEFAULT_SEARCH_TIMEOUT_MS  # Бюджет сборки (None - без дедлайна)
 
 
 @dataclass
@@ -126,6 +140,9 @@ class AssembledContext:
     # Timeline (if available)
     timeline_events: List[Dict[str, Any]] = field(default_factory=list)
 
+    # Стадии, пропущенные или прерванные по бюджету: стадия -> skipped/timeout
+    degraded_stages: Dict[str, str] = field(default_factory=dict)
+
 
 class ContextManager:
     """
@@ -162,6 +179,9 @@ class ContextManager:
         self.timeline = timeline_service
         self.redis = redis_client
 
+        # Одинаковые одновременные запросы (несколько сессий) - одна сборка
+        self.singleflight = SingleFlight("context_assembly")
+
         logger.info("ContextManager инициализирован")
         logger.info(f"  LLM Service: {'✓' if llm_service else '✗'}")
         logger.info(f"  Search Service: {'✓' if search_service else '✗'}")
@@ -182,13 +202,25 @@ class ContextManager:
         3. LLM Precision Ranking
         4. Context Assembly
 
+        Одинаковые одновременные запросы (текст и параметры, кроме
+        user_id/session_id) собираются один раз.
+
         Args:
             request: Запрос на формирование контекста
 
         Returns:
             AssembledContext с собранным контекстом
         """
+        params = asdict(request)
+        for name in ("query", "user_id", "session_id"):
+            params.pop(name)
+        key = request_key(request.query, **params)
+        return await self.singleflight.do(key, lambda: self._assemble_context(request))
+
+    async def _assemble_context(self, request: ContextRequest) -> AssembledContext:
+        """Полный pipeline сборки контекста (одна на группу одинаковых запросов)"""
         start_time = datetime.now()
+        budget = SearchBudget(request.timeout_ms)
 
         logger.info(f"=== Context Assembly Started ===")
         logger.info(f"Query: '{request.query}'")
@@ -196,7 +228,7 @@ class ContextManager:
 
         # STAGE 1: Intent Analysis
         logger.info("[Stage 1] Анализ намерений...")
-        intent_result = await self._analyze_intent(request)
+        intent_result = await self._analyze_intent(request, budget)
 
         # Определяем стратегию на основе intent
         strategy = self._select_strategy(intent_result, request)
@@ -207,7 +239,8 @@ class ContextManager:
         retrieval_results = await self._multi_dimensional_retrieval(
             request,
             intent_result,
-            strategy
+            strategy,
+            budget
         )
         logger.info(f"  Найдено результатов: {len(retrieval_results)}")
 
@@ -216,7 +249,8 @@ class ContextManager:
         ranked_results = await self._llm_precision_ranking(
             request.query,
             retrieval_results,
-            intent_result
+            intent_result,
+            budget
         )
         logger.info(f"  После ranking: {len(ranked_results)}")
 
@@ -227,17 +261,34 @@ class ContextManager:
             ranked_results,
             intent_result,
             strategy,
-            start_time
+            start_time,
+            budget
         )
 
         processing_time = (datetime.now() - start_time).total_seconds() * 1000
         logger.info(f"=== Context Assembly Complete ({processing_time:.0f}ms) ===")
+        if budget.degraded:
+            logger.warning(f"Контекст собран частично, деградировавшие стадии: {budget.degraded}")
 
         return assembled
 
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Статистика менеджера контекста
+
+        Returns:
+            singleflight - объединенные запросы сборки контекста;
+            search - статистика сервиса поиска (если доступна)
+        """
+        stats = {"singleflight": self.singleflight.get_stats()}
+        if self.search and hasattr(self.search, "get_stats"):
+            stats["search"] = self.search.get_stats()
+        return stats
+
     async def _analyze_intent(
         self,
-        request: ContextRequest
+        request: ContextRequest,
+        budget: SearchBudget
     ) -> Dict[str, Any]:
         """
         Stage 1: Анализ намерений пользователя
@@ -245,7 +296,9 @@ class ContextManager:
         Использует LLM для глубокого понимания запроса
         """
         try:
-            classification = self.llm.classify_intent(request.query)
+            classification = await self.search.run_blocking(
+                "intent", self.llm.classify_intent, request.query, budget=budget
+            )
 
             # Если тип контекста не указан, определяем из intent
             if request.context_type is None:
@@ -276,7 +329,8 @@ class ContextManager:
         self,
         request: ContextRequest,
         intent_result: Dict[str, Any],
-        strategy: RetrievalStrategy
+        strategy: RetrievalStrategy,
+        budget: SearchBudget
     ) -> List[Dict[str, Any]]:
         """
         Stage 2: Многомерный поиск
@@ -285,6 +339,8 @@ class ContextManager:
         - Semantic (vector search)
         - Graph (dependencies)
         - Temporal (code history) - если доступен
+
+        Поиски получают остаток бюджета сборки.
         """
         from services.bsl_search_service import SearchRequest, SearchMode
 
@@ -298,7 +354,8 @@ class ContextManager:
             limit=request.max_results * 2,  # Берем больше для фильтрации
             module_types=request.preferred_module_types,
             min_score=request.min_relevance,
-            use_llm_reranking=False  # Делаем на Stage 3
+            use_llm_reranking=False,  # Делаем на Stage 3
+            timeout_ms=budget.remaining_ms()
         )
         search_requests.append(("semantic", semantic_request))
 
@@ -308,7 +365,8 @@ class ContextManager:
                 query=request.query,
                 mode=SearchMode.GRAPH_ONLY,
                 limit=request.max_results,
-                min_score=request.min_relevance
+                min_score=request.min_relevance,
+                timeout_ms=budget.remaining_ms()
             )
             search_requests.append(("graph", graph_request))
 
@@ -319,14 +377,15 @@ class ContextManager:
                 mode=SearchMode.HYBRID,
                 limit=request.max_results * 2,
                 min_score=request.min_relevance,
-                combine_sources=True
+                combine_sources=True,
+                timeout_ms=budget.remaining_ms()
             )
             search_requests.append(("hybrid", hybrid_request))
 
         # Параллельное выполнение всех поисков
         tasks = []
         for source, req in search_requests:
-            tasks.append(self._execute_search(source, req))
+            tasks.append(self._execute_search(source, req, budget))
 
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
@@ -354,11 +413,14 @@ class ContextManager:
     async def _execute_search(
         self,
         source: str,
-        search_request
+        search_request,
+        budget: SearchBudget
     ) -> List[Dict[str, Any]]:
-        """Выполнение одного поискового запроса"""
+        """Выполнение одного поискового запроса (деградации поиска - в бюджет сборки)"""
         try:
             results = await self.search.search(search_request)
+            for stage, reason in getattr(results, "degraded", {}).items():
+                budget.mark(stage, reason)
 
             # Конвертация в dict формат
             return [
@@ -418,12 +480,14 @@ class ContextManager:
         self,
         query: str,
         results: List[Dict[str, Any]],
-        intent_result: Dict[str, Any]
+        intent_result: Dict[str, Any],
+        budget: SearchBudget
     ) -> List[Dict[str, Any]]:
         """
         Stage 3: LLM Precision Ranking
 
-        Глубокий семантический анализ с учетом контекста и намерений
+        Глубокий семантический анализ с учетом контекста и намерений.
+        Не уложился в бюджет - результаты поиска в исходном порядке.
         """
         if not results:
             return []
@@ -432,11 +496,14 @@ class ContextManager:
             # Добавляем контекст намерения в query для LLM
             enhanced_query = self._enhance_query_with_intent(query, intent_result)
 
-            # LLM Re-ranking
-            reranked = self.llm.rerank_results(
+            # LLM Re-ranking (пул llm сервиса поиска)
+            reranked = await self.search.run_blocking(
+                "rerank",
+                self.llm.rerank_results,
                 query=enhanced_query,
                 results=results[:20],  # Ограничиваем для LLM
-                top_k=len(results)
+                top_k=len(results),
+                budget=budget
             )
 
             # Конвертация обратно в dict с добавлением LLM metadata
@@ -463,7 +530,8 @@ class ContextManager:
         ranked_results: List[Dict[str, Any]],
         intent_result: Dict[str, Any],
         strategy: RetrievalStrategy,
-        start_time: datetime
+        start_time: datetime,
+        budget: SearchBudget
     ) -> AssembledContext:
         """
         Stage 4: Финальная сборка контекста
@@ -478,9 +546,15 @@ class ContextManager:
         # Получение зависимостей для primary items
         dependencies = []
         if request.include_dependencies:
-            dependencies = await self._fetch_dependencies(
-                [r["file_path"] for r in primary_results]
-            )
+            try:
+                dependencies = await self.search.run_blocking(
+                    "graph",
+                    self._fetch_dependencies,
+                    [r["file_path"] for r in primary_results],
+                    budget=budget
+                )
+            except StageTimeout:
+                dependencies = []
 
         # Конвертация в ContextItem
         primary_items = [
@@ -517,7 +591,8 @@ class ContextManager:
             intent_classification=intent_result,
             suggested_actions=suggested_actions,
             confidence_score=intent_result.get("confidence", 0.5),
-            timeline_events=[]  # TODO: Добавить если timeline доступен
+            timeline_events=[],  # TODO: Добавить если timeline доступен
+            degraded_stages=dict(budget.degraded)
         )
 
     def _select_strategy(
@@ -589,11 +664,11 @@ class ContextManager:
 
         return sorted(seen.values(), key=lambda x: x.get("score", 0), reverse=True)
 
-    async def _fetch_dependencies(
+    def _fetch_dependencies(
         self,
         file_paths: List[str]
     ) -> List[Dict[str, Any]]:
-        """Получение зависимостей для списка файлов"""
+        """Получение зависимостей для списка файлов (синхронно, в пуле потоков)"""
         try:
             all_deps = []
             for file_path in file_paths[:5]:  # Ограничиваем для производительности
@@ -601,7 +676,8 @@ class ContextManager:
                 all_deps.append({
                     "file_path": file_path,
                     "dependencies": deps.get("imports", []),
-                    "dependents": deps.get("imported_by", [])
+                    "dependents": deps.get("imported_by", []),
+                    "community": self.graph.get_module_community(file_path)
                 })
             return all_deps
         except Exception as e:
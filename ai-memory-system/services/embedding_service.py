@@ -72,12 +72,13 @@ class EmbeddingService:
             logger.error(f"Ошибка подключения к Ollama: {e}")
             return False
 
-    def create_embedding(self, text: str) -> Optional[List[float]]:
+    def create_embedding(self, text: str, timeout: Optional[float] = None) -> Optional[List[float]]:
         """
         Создание векторного представления для текста
 
         Args:
             text: Текст для векторизации (BSL код)
+            timeout: Timeout запроса в секундах (None - self.timeout)
 
         Returns:
             Вектор эмбеддинга или None при ошибке
@@ -95,7 +96,7 @@ class EmbeddingService:
                     "model": self.model,
                     "prompt": text
                 },
-                timeout=self.timeout  # Настраиваемый timeout
+                timeout=self.timeout if timeout is None else timeout  # Настраиваемый timeout
             )
 
             if response.status_code == 200:
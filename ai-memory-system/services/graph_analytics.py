@@ -1,13 +1,26 @@
 """
 Graph Analytics Module
 Анализ зависимостей BSL кода через Neo4j Knowledge Graph
+
+Hotspots, мертвый код и метрики модулей считаются по графу вызовов
+в памяти (CallGraphEngine), если доступен NumPy; иначе - Cypher запросами.
 """
 
+import sys
 import logging
+from pathlib import Path
 from typing import List, Dict, Optional, Set, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from neo4j import GraphDatabase
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.analytics_summary import AnalyticsSummaryStore
+from services.call_graph_engine import CallGraphEngine, NUMPY_AVAILABLE
+from services.graph_centrality import CentralityIndex
+from services.graph_metrics_cache import GraphMetricsCache
+from services.graph_paths import module_path_keys
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -19,6 +32,8 @@ class CircularDependency:
     cycle_length: int       # Длина цикла
     modules_involved: List[str]  # Вовлеченные модули
     severity: str          # critical, warning, info
+    component_size: int = 0  # Методов в компоненте сильной связности
+    component: List[str] = field(default_factory=list)  # Методы компоненты
 
 
 @dataclass
@@ -57,6 +72,19 @@ class ComplexityMetrics:
     cohesion: float  # 0-1, насколько функции связаны между собой
 
 
+@dataclass
+class ImpactAnalysis:
+    """Транзитивное влияние изменения модуля/метода"""
+    file_path: str
+    method: Optional[str]  # None - все методы модуля
+    direction: str  # callers (кого затронет), callees (от чего зависит)
+    depth: Optional[int]  # None - без ограничения
+    methods_count: int
+    modules_count: int
+    methods: List[Dict] = field(default_factory=list)  # {name, file_path, distance}
+    modules: List[Dict] = field(default_factory=list)  # {file_path, methods}
+
+
 class GraphAnalyzer:
     """
     Анализатор Knowledge Graph для BSL кода
@@ -66,13 +94,15 @@ class GraphAnalyzer:
     - Анализ популярных функций (hotspots)
     - Поиск мертвого кода
     - Вычисление метрик сложности
+    - Анализ транзитивного влияния изменений
     """
 
     def __init__(
         self,
         neo4j_uri: str = "bolt://localhost:7687",
         neo4j_user: str = "neo4j",
-        neo4j_password: str = "password123"
+        neo4j_password: str = "password123",
+        use_engine: bool = True
     ):
         """
         Инициализация анализатора
@@ -81,11 +111,22 @@ class GraphAnalyzer:
             neo4j_uri: URI Neo4j
             neo4j_user: Пользователь
             neo4j_password: Пароль
+            use_engine: Считать метрики по графу в памяти (нужен NumPy)
         """
         self.driver = GraphDatabase.driver(
             neo4j_uri,
             auth=(neo4j_user, neo4j_password)
         )
+
+        self.engine: Optional[CallGraphEngine] = None
+        if use_engine and NUMPY_AVAILABLE:
+            self.engine = CallGraphEngine(self.driver)
+        elif use_engine:
+            logger.warning("NumPy не установлен, аналитика через Cypher запросы")
+
+        # Сводка считается один раз на версию графа и хранится на диске
+        self.summary_store = AnalyticsSummaryStore(self.driver, self.compute_analytics_summary)
+
         logger.info("GraphAnalyzer инициализирован")
 
     def close(self):
@@ -93,6 +134,11 @@ class GraphAnalyzer:
         if self.driver:
             self.driver.close()
 
+    def _run_query(self, query: str, **params) -> List:
+        """Выполнение Cypher запроса (без CallGraphEngine)"""
+        with self.driver.session() as session:
+            return list(session.run(query, **params))
+
     def find_circular_dependencies(
         self,
         max_depth: int = 10,
@@ -101,8 +147,12 @@ class GraphAnalyzer:
         """
         Поиск циклических зависимостей в графе вызовов
 
+        С CallGraphEngine - все компоненты сильной связности (линейно по
+        размеру графа), каждая с кратчайшим представительным циклом.
+        Без него - перебор путей Cypher (первые 100).
+
         Args:
-            max_depth: Максимальная глубина поиска
+            max_depth: Максимальная длина цикла
             min_cycle_length: Минимальная длина цикла
 
         Returns:
@@ -110,6 +160,30 @@ class GraphAnalyzer:
         """
         logger.info(f"Поиск циклических зависимостей (depth={max_depth})...")
 
+        if self.engine:
+            cycles = []
+            for record in self.engine.cycles(max_length=max_depth, min_length=min_cycle_length):
+                # Severity по числу взаимно зависимых методов
+                size = record['component_size']
+                if size >= 5:
+                    severity = "critical"
+                elif size >= 3:
+                    severity = "warning"
+                else:
+                    severity = "info"
+
+                cycles.append(CircularDependency(
+                    cycle_path=record['cycle_path'],
+                    cycle_length=record['cycle_length'],
+                    modules_involved=record['modules'],
+                    severity=severity,
+                    component_size=size,
+                    component=record['component']
+                ))
+
+            logger.info(f"Найдено {len(cycles)} циклических зависимостей")
+            return cycles
+
         with self.driver.session() as session:
             # Cypher запрос для поиска циклов
             query = """
@@ -176,7 +250,9 @@ class GraphAnalyzer:
         """
         logger.info(f"Поиск hotspots (top={top_n}, min_calls={min_calls})...")
 
-        with self.driver.session() as session:
+        if self.engine:
+            records = self.engine.hotspots(top_n=top_n, min_calls=min_calls)
+        else:
             query = """
                 MATCH (f)
                 WHERE f:Function OR f:Procedure
@@ -212,31 +288,31 @@ class GraphAnalyzer:
                 LIMIT $top_n
             """
 
-            result = session.run(query, min_calls=min_calls, top_n=top_n)
-
-            hotspots = []
-            for record in result:
-                in_calls = record['in_calls']
-                out_calls = record['out_calls']
-                total_calls = in_calls + out_calls
-
-                # Severity на основе количества вызовов
-                if total_calls >= 50:
-                    severity = "high"
-                elif total_calls >= 20:
-                    severity = "medium"
-                else:
-                    severity = "low"
-
-                hotspots.append(Hotspot(
-                    name=record['name'],
-                    node_type=record['node_type'],
-                    incoming_calls=in_calls,
-                    outgoing_calls=out_calls,
-                    fan_in=record['fan_in'],
-                    fan_out=record['fan_out'],
-                    severity=severity
-                ))
+            records = self._run_query(query, min_calls=min_calls, top_n=top_n)
+
+        hotspots = []
+        for record in records:
+            in_calls = record['in_calls']
+            out_calls = record['out_calls']
+            total_calls = in_calls + out_calls
+
+            # Severity на основе количества вызовов
+            if total_calls >= 50:
+                severity = "high"
+            elif total_calls >= 20:
+                severity = "medium"
+            else:
+                severity = "low"
+
+            hotspots.append(Hotspot(
+                name=record['name'],
+                node_type=record['node_type'],
+                incoming_calls=in_calls,
+                outgoing_calls=out_calls,
+                fan_in=record['fan_in'],
+                fan_out=record['fan_out'],
+                severity=severity
+            ))
 
         logger.info(f"Найдено {len(hotspots)} hotspots")
         return hotspots
@@ -256,7 +332,9 @@ class GraphAnalyzer:
         """
         logger.info("Поиск мертвого кода...")
 
-        with self.driver.session() as session:
+        if self.engine:
+            records = self.engine.dead_code(include_exports=include_exports)
+        else:
             # Поиск функций без входящих вызовов
             query = """
                 MATCH (m:Module)-[:CONTAINS]->(f)
@@ -278,25 +356,25 @@ class GraphAnalyzer:
                 ORDER BY module, name
             """
 
-            result = session.run(query)
+            records = self._run_query(query)
 
-            dead_code_list = []
-            for record in result:
-                is_export = record['is_export']
+        dead_code_list = []
+        for record in records:
+            is_export = record['is_export']
 
-                # Определение причины
-                if is_export:
-                    reason = "no_incoming_calls_but_exported"
-                else:
-                    reason = "no_incoming_calls_not_exported"
-
-                dead_code_list.append(DeadCode(
-                    name=record['name'],
-                    module=record['module'],
-                    node_type=record['node_type'],
-                    is_export=is_export,
-                    reason=reason
-                ))
+            # Определение причины
+            if is_export:
+                reason = "no_incoming_calls_but_exported"
+            else:
+                reason = "no_incoming_calls_not_exported"
+
+            dead_code_list.append(DeadCode(
+                name=record['name'],
+                module=record['module'],
+                node_type=record['node_type'],
+                is_export=is_export,
+                reason=reason
+            ))
 
         logger.info(f"Найдено {len(dead_code_list)} неиспользуемых функций")
         return dead_code_list
@@ -316,7 +394,9 @@ class GraphAnalyzer:
         """
         logger.info(f"Вычисление метрик сложности (module={module_name})...")
 
-        with self.driver.session() as session:
+        if self.engine:
+            records = self.engine.module_complexity(module_name=module_name)
+        else:
             query = """
                 MATCH (m:Module)
             """
@@ -370,46 +450,160 @@ class GraphAnalyzer:
             if module_name:
                 params['module_name'] = module_name
 
-            result = session.run(query, **params)
-
-            metrics_list = []
-            for record in result:
-                func_count = record['func_count']
-                proc_count = record['proc_count']
-                total_count = func_count + proc_count
-
-                # Приблизительная cyclomatic complexity
-                # Базируется на количестве функций и их взаимодействий
-                cyclomatic = total_count + record['total_out']
-
-                # Cohesion: насколько функции модуля связаны между собой
-                # Упрощенная формула: отношение внутренних связей к возможным
-                if total_count > 1:
-                    max_possible_connections = total_count * (total_count - 1)
-                    internal_connections = record['total_out']  # Упрощение
-                    cohesion = min(internal_connections / max_possible_connections, 1.0)
-                else:
-                    cohesion = 1.0
-
-                metrics_list.append(ComplexityMetrics(
-                    module_name=record['module_name'],
-                    file_path=record['file_path'],
-                    functions_count=func_count,
-                    procedures_count=proc_count,
-                    total_incoming_calls=record['total_in'],
-                    total_outgoing_calls=record['total_out'],
-                    cyclomatic_complexity=cyclomatic,
-                    coupling=record['coupling'],
-                    cohesion=round(cohesion, 3)
-                ))
+            records = self._run_query(query, **params)
+
+        metrics_list = []
+        for record in records:
+            func_count = record['func_count']
+            proc_count = record['proc_count']
+            total_count = func_count + proc_count
+
+            # Приблизительная cyclomatic complexity
+            # Базируется на количестве функций и их взаимодействий
+            cyclomatic = total_count + record['total_out']
+
+            # Cohesion: насколько функции модуля связаны между собой
+            # Упрощенная формула: отношение внутренних связей к возможным
+            if total_count > 1:
+                max_possible_connections = total_count * (total_count - 1)
+                internal_connections = record['total_out']  # Упрощение
+                cohesion = min(internal_connections / max_possible_connections, 1.0)
+            else:
+                cohesion = 1.0
+
+            metrics_list.append(ComplexityMetrics(
+                module_name=record['module_name'],
+                file_path=record['file_path'],
+                functions_count=func_count,
+                procedures_count=proc_count,
+                total_incoming_calls=record['total_in'],
+                total_outgoing_calls=record['total_out'],
+                cyclomatic_complexity=cyclomatic,
+                coupling=record['coupling'],
+                cohesion=round(cohesion, 3)
+            ))
 
         logger.info(f"Вычислено метрик для {len(metrics_list)} модулей")
         return metrics_list
 
-    def get_analytics_summary(self) -> Dict:
+    def analyze_impact(
+        self,
+        file_path: str,
+        method: Optional[str] = None,
+        direction: str = 'callers',
+        depth: Optional[int] = None,
+        limit: int = 100
+    ) -> Optional[ImpactAnalysis]:
+        """
+        Анализ влияния: все транзитивные вызывающие (кого затронет изменение)
+        или вызываемые (от чего зависит) методы модуля или метода
+
+        С CallGraphEngine ответ берется из индекса достижимости по сжатому
+        графу компонент (services/graph_impact.py), без обхода Neo4j. Без
+        NumPy - Cypher с путями переменной длины, глубина ограничена 5.
+
+        Args:
+            file_path: Путь к файлу модуля
+            method: Имя метода модуля (None - все методы модуля)
+            direction: callers или callees
+            depth: Максимальная глубина вызовов (None - без ограничения)
+            limit: Максимум методов в списке
+
+        Returns:
+            ImpactAnalysis или None, если модуль или метод не найден
+        """
+        if direction not in ('callers', 'callees'):
+            raise ValueError(f"Unknown impact direction: {direction}")
+
+        logger.info(f"Анализ влияния {file_path} (method={method}, direction={direction}, depth={depth})...")
+
+        if self.engine:
+            record = self.engine.impact(
+                file_path, method=method, direction=direction, depth=depth, limit=limit
+            )
+            if record is None:
+                return None
+        else:
+            max_depth = min(depth or 5, 5)
+            pattern = (
+                f"(start)<-[:CALLS*1..{max_depth}]-(other)" if direction == 'callers'
+                else f"(start)-[:CALLS*1..{max_depth}]->(other)"
+            )
+            # Модуль - самый длинный совпавший path_key, как в CallGraphEngine
+            query = f"""
+                MATCH (candidate:Module)
+                WHERE candidate.path_key IN $keys
+                WITH candidate
+                ORDER BY size(candidate.path_key) DESC
+                WITH head(collect(candidate)) AS m
+                WHERE m IS NOT NULL
+                MATCH (m)-[:CONTAINS]->(start)
+                WHERE (start:Function OR start:Procedure)
+                  AND ($method IS NULL OR toLower(start.name) = toLower($method))
+                MATCH path = {pattern}
+                WHERE (other:Function OR other:Procedure) AND other <> start
+                WITH m, other, min(length(path)) as distance
+                OPTIONAL MATCH (owner:Module)-[:CONTAINS]->(other)
+                RETURN other.name as name, owner.file_path as file_path,
+                       m.file_path as module_path, distance
+                ORDER BY distance
+            """
+            rows = self._run_query(query, keys=module_path_keys(file_path), method=method)
+
+            counts: Dict[str, int] = {}
+            for row in rows:
+                if row['file_path'] and row['file_path'] != row['module_path']:
+                    counts[row['file_path']] = counts.get(row['file_path'], 0) + 1
+
+            record = {
+                'methods_count': len(rows),
+                'modules_count': len(counts),
+                'methods': [
+                    {'name': row['name'], 'file_path': row['file_path'], 'distance': row['distance']}
+                    for row in rows[:limit]
+                ],
+                'modules': [
+                    {'file_path': path, 'methods': count}
+                    for path, count in sorted(counts.items(), key=lambda item: -item[1])
+                ]
+            }
+
+        impact = ImpactAnalysis(
+            file_path=file_path,
+            method=method,
+            direction=direction,
+            depth=depth,
+            methods_count=record['methods_count'],
+            modules_count=record['modules_count'],
+            methods=record['methods'],
+            modules=record['modules']
+        )
+
+        logger.info(f"Затронуто {impact.methods_count} методов в {impact.modules_count} модулях")
+        return impact
+
+    def get_analytics_summary(self, materialized: bool = True) -> Dict:
         """
         Получение общей сводки по аналитике
 
+        Сводка вычисляется один раз на версию графа (AnalyticsSummaryStore);
+        после изменения графа отдается предыдущая с meta.stale = True, пока
+        новая считается в фоне.
+
+        Args:
+            materialized: Брать сохраненную сводку (False - расчет заново)
+
+        Returns:
+            Словарь со статистикой и meta (версия графа, актуальность)
+        """
+        if materialized:
+            return self.summary_store.get()
+        return self.compute_analytics_summary()
+
+    def compute_analytics_summary(self) -> Dict:
+        """
+        Расчет общей сводки по аналитике по всему графу
+
         Returns:
             Словарь со статистикой
         """
@@ -443,6 +637,7 @@ class GraphAnalyzer:
                     {
                         'path': c.cycle_path[:5],  # Первые 5 узлов
                         'length': c.cycle_length,
+                        'component_size': c.component_size,
                         'severity': c.severity
                     }
                     for c in cycles[:3]
@@ -509,6 +704,7 @@ class GraphAnalyticsService:
     - get_dependencies(file_path) - зависимости файла
     - calculate_centrality() - важность модулей
     - detect_communities() - группы связанных модулей
+    - get_module_community(file_path) - модули из сообщества файла
     """
 
     def __init__(self, neo4j_service):
@@ -520,12 +716,27 @@ class GraphAnalyticsService:
         """
         self.neo4j = neo4j_service
         self.driver = neo4j_service.driver if neo4j_service else None
+
+        # Граф вызовов в памяти и центральность по версии графа (нужен NumPy)
+        self.engine: Optional[CallGraphEngine] = None
+        self.centrality: Optional[CentralityIndex] = None
+        if self.driver and NUMPY_AVAILABLE:
+            self.engine = CallGraphEngine(self.driver)
+            self.centrality = CentralityIndex(self.driver, self.engine)
+
+        # Зависимости модулей - из памяти до смены версии графа
+        self.dependencies_cache: Optional[GraphMetricsCache] = None
+        if self.driver:
+            self.dependencies_cache = GraphMetricsCache(self.driver)
+
         logger.info("GraphAnalyticsService инициализирован")
 
     def get_dependencies(self, file_path: str) -> Dict:
         """
         Получить зависимости для конкретного файла
 
+        Результат кешируется по пути и версии графа (GraphMetricsCache).
+
         Args:
             file_path: Путь к файлу BSL
 
@@ -536,10 +747,30 @@ class GraphAnalyticsService:
             logger.warning("Neo4j не подключен")
             return {'imports': [], 'imported_by': []}
 
+        return self.dependencies_cache.get(file_path, self._load_dependencies)
+
+    def _load_dependencies(self, file_path: str) -> Dict:
+        """
+        Зависимости файла из Neo4j
+
+        Модуль ищется по path_key (самый длинный совпавший, как в
+        fetch_graph_metrics), поэтому пути, дающие один ключ кеша
+        (normalize_module_path), находят один и тот же модуль.
+        """
+        keys = module_path_keys(file_path)
+        if not keys:
+            logger.warning(f"Модуль не найден: {file_path}")
+            return {'imports': [], 'imported_by': []}
+
         with self.driver.session() as session:
             # Найти модуль по пути
             query = """
-                MATCH (m:Module {file_path: $file_path})
+                MATCH (candidate:Module)
+                WHERE candidate.path_key IN $keys
+                WITH candidate
+                ORDER BY size(candidate.path_key) DESC
+                WITH head(collect(candidate)) AS m
+                WHERE m IS NOT NULL
 
                 // Исходящие зависимости (что импортирует этот модуль)
                 OPTIONAL MATCH (m)-[:CONTAINS]->(f1)
@@ -563,7 +794,7 @@ class GraphAnalyticsService:
                     collect(DISTINCT m3.file_path) as imported_by
             """
 
-            result = session.run(query, file_path=file_path)
+            result = session.run(query, keys=keys)
             record = result.single()
 
             if not record:
@@ -575,12 +806,18 @@ class GraphAnalyticsService:
                 'imported_by': [imp for imp in record['imported_by'] if imp]
             }
 
-    def calculate_centrality(self, top_n: int = 10) -> List[Tuple[str, float]]:
+    def calculate_centrality(self, top_n: int = 10, metric: str = 'pagerank') -> List[Tuple[str, float]]:
         """
         Рассчитать центральность модулей (важность)
 
+        PageRank (1.0 - средний модуль) или betweenness (0-1) по графу
+        зависимостей модулей - из памяти, пересчет только при смене версии
+        графа (services/graph_centrality.py). Без NumPy - оценка по числу
+        связанных модулей через Cypher.
+
         Args:
             top_n: Количество топ результатов
+            metric: pagerank или betweenness
 
         Returns:
             List[(module_path, centrality_score)]
@@ -589,6 +826,9 @@ class GraphAnalyticsService:
             logger.warning("Neo4j не подключен")
             return []
 
+        if self.centrality:
+            return self.centrality.top(metric, top_n=top_n)
+
         with self.driver.session() as session:
             # PageRank-подобная метрика на основе входящих связей
             query = """
@@ -643,16 +883,30 @@ class GraphAnalyticsService:
         """
         Обнаружить сообщества (группы связанных модулей)
 
+        Разбиение графа зависимостей модулей методом Louvain (максимум
+        модулярности) - из памяти, пересчет только при смене версии графа
+        (services/graph_communities.py). Без NumPy - группировка вокруг
+        модулей с наибольшим числом связей через Cypher.
+
         Args:
             max_communities: Максимальное количество сообществ
 
         Returns:
-            List[List[module_path]] - список сообществ
+            List[List[module_path]] - список сообществ по убыванию размера,
+            внутри сообщества первыми самые связанные модули
         """
         if not self.driver:
             logger.warning("Neo4j не подключен")
             return []
 
+        if self.engine:
+            communities = [
+                record['modules']
+                for record in self.engine.communities(max_communities=max_communities)
+            ]
+            logger.info(f"Обнаружено {len(communities)} сообществ")
+            return communities
+
         with self.driver.session() as session:
             # Упрощенная кластеризация на основе связности
             query = """
@@ -697,6 +951,22 @@ class GraphAnalyticsService:
             logger.info(f"Обнаружено {len(communities)} сообществ")
             return communities
 
+    def get_module_community(self, file_path: str, max_members: int = 10) -> List[str]:
+        """
+        Модули из того же сообщества, что и файл
+
+        Args:
+            file_path: Путь к файлу BSL
+            max_members: Максимальное количество модулей
+
+        Returns:
+            List[module_path] - первыми самые связанные; [] без графа в памяти
+        """
+        if not self.engine:
+            return []
+
+        return self.engine.module_community(file_path)[:max_members]
+
 
 # Пример использования
 if __name__ == "__main__":
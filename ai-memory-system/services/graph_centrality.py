@@ -0,0 +1,381 @@
+"""
+Graph Centrality - центральность модулей BSL
+
+Метрики считаются по графу зависимостей модулей (ребро A -> B, если метод
+модуля A вызывает метод модуля B; вес - количество таких пар методов),
+который строится из графа вызовов CallGraphEngine:
+- PageRank - разреженный степенной метод
+- Betweenness - алгоритм Брандеса по выборке источников (оценка)
+
+Расчет выполняется офлайн - после записи графа индексаторами
+(scripts/run_neo4j_full_indexing.py, run_neo4j_incremental_indexing.py)
+или scripts/run_graph_centrality.py. Результат сохраняется в узлах
+Module (pagerank, betweenness) вместе с версией графа в GraphMeta, а
+запросы обслуживаются из отсортированных списков в памяти - O(top_n).
+
+Если для новой версии графа метрик еще нет, отдаются последние
+сохраненные (CentralityIndex.stale), а расчет идет в фоновом потоке
+(не больше одного одновременно, после ошибки - пауза retry_interval).
+Синхронно метрики считаются только если они не сохранялись ни разу.
+"""
+
+import sys
+import time
+import logging
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.graph_version import GRAPH_META_ID, get_graph_version
+
+logger = logging.getLogger(__name__)
+
+CENTRALITY_METRICS = ('pagerank', 'betweenness')
+
+SAVE_SCORES_QUERY = """
+    UNWIND $rows AS row
+    MATCH (m:Module {id: row.id})
+    SET m.pagerank = row.pagerank,
+        m.betweenness = row.betweenness
+"""
+
+SAVE_VERSION_QUERY = """
+    MERGE (g:GraphMeta {id: $id})
+    SET g.centrality_version = $version,
+        g.centrality_at = datetime()
+"""
+
+LOAD_SCORES_QUERY = """
+    MATCH (g:GraphMeta {id: $id})
+    WHERE g.centrality_version = $version
+    MATCH (m:Module)
+    WHERE m.pagerank IS NOT NULL
+    RETURN m.file_path AS module, m.pagerank AS pagerank, m.betweenness AS betweenness
+"""
+
+# Последние сохраненные метрики любой версии графа
+LOAD_LATEST_SCORES_QUERY = """
+    OPTIONAL MATCH (g:GraphMeta {id: $id})
+    WITH g.centrality_version AS version
+    MATCH (m:Module)
+    WHERE m.pagerank IS NOT NULL
+    RETURN version, m.file_path AS module, m.pagerank AS pagerank, m.betweenness AS betweenness
+"""
+
+
+def pagerank(src: "np.ndarray", dst: "np.ndarray", weights: "np.ndarray", size: int,
+             damping: float = 0.85, tol: float = 1e-10, max_iter: int = 100) -> "np.ndarray":
+    """
+    PageRank степенным методом по списку ребер
+
+    Args:
+        src: Начала ребер
+        dst: Концы ребер
+        weights: Веса ребер
+        size: Количество вершин
+        damping: Коэффициент затухания
+        tol: Порог сходимости (L1)
+        max_iter: Максимум итераций
+
+    Returns:
+        Вектор PageRank (сумма = 1)
+    """
+    if size == 0:
+        return np.zeros(0)
+
+    weights = weights.astype(np.float64)
+    out_weight = np.bincount(src, weights=weights, minlength=size)
+    dangling = out_weight == 0
+    # Доля веса ребра в исходящем весе вершины
+    share = weights / out_weight[src]
+
+    rank = np.full(size, 1.0 / size)
+    for _ in range(max_iter):
+        spread = np.bincount(dst, weights=rank[src] * share, minlength=size)
+        new_rank = (1.0 - damping) / size + damping * (spread + rank[dangling].sum() / size)
+        delta = np.abs(new_rank - rank).sum()
+        rank = new_rank
+        if delta < tol:
+            break
+
+    return rank / rank.sum()
+
+
+def sampled_betweenness(indptr: List[int], indices: List[int], samples: int = 256,
+                        seed: int = 42) -> "np.ndarray":
+    """
+    Оценка betweenness centrality (Брандес по выборке источников)
+
+    Кратчайшие пути без весов; вклад выборки масштабируется на n / samples
+    и нормируется на (n - 1)(n - 2). При samples >= n расчет точный.
+
+    Args:
+        indptr: CSR смещения исходящих ребер
+        indices: CSR индексы соседей
+        samples: Количество источников
+        seed: Зерно выбора источников
+
+    Returns:
+        Вектор betweenness (0-1)
+    """
+    n = len(indptr) - 1
+    centrality = [0.0] * n
+    if n < 3:
+        return np.zeros(n)
+
+    if samples >= n:
+        sources = range(n)
+        scale = 1.0
+    else:
+        sources = np.random.default_rng(seed).choice(n, size=samples, replace=False).tolist()
+        scale = n / samples
+
+    for s in sources:
+        order = []
+        predecessors: Dict[int, List[int]] = {}
+        sigma = {s: 1}
+        dist = {s: 0}
+        queue = deque([s])
+
+        while queue:
+            v = queue.popleft()
+            order.append(v)
+            next_dist = dist[v] + 1
+            for w in indices[indptr[v]:indptr[v + 1]]:
+                if w not in dist:
+                    dist[w] = next_dist
+                    sigma[w] = 0
+                    predecessors[w] = []
+                    queue.append(w)
+                if dist[w] == next_dist:
+                    sigma[w] += sigma[v]
+                    predecessors[w].append(v)
+
+        delta = dict.fromkeys(order, 0.0)
+        for w in reversed(order):
+            coefficient = (1.0 + delta[w]) / sigma[w]
+            for v in predecessors.get(w, ()):
+                delta[v] += sigma[v] * coefficient
+            if w != s:
+                centrality[w] += delta[w]
+
+    return np.array(centrality) * scale / ((n - 1) * (n - 2))
+
+
+def compute_module_centrality(snapshot, samples: int = 256) -> Dict[str, "np.ndarray"]:
+    """
+    PageRank и betweenness модулей по графу вызовов
+
+    Args:
+        snapshot: CallGraphSnapshot
+        samples: Источников для оценки betweenness
+
+    Returns:
+        {'pagerank': ..., 'betweenness': ...} - массивы по индексам модулей;
+        pagerank масштабирован так, что средний модуль = 1.0
+    """
+    src, dst, weights = snapshot.module_edges()
+    size = snapshot.modules_count
+
+    ranks = pagerank(src, dst, weights, size) * size
+
+    order = np.argsort(src, kind='stable')
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=size), out=indptr[1:])
+    betweenness = sampled_betweenness(indptr.tolist(), dst[order].tolist(), samples=samples)
+
+    return {'pagerank': ranks, 'betweenness': betweenness}
+
+
+class CentralityIndex:
+    """
+    Центральность модулей, сохраненная с версией графа
+
+    Использование:
+        index = CentralityIndex(driver, engine)
+        top = index.top('pagerank', top_n=10)   # [(file_path, score)]
+    """
+
+    def __init__(self, driver, engine=None, samples: int = 256, check_interval: float = 10.0,
+                 retry_interval: float = 300.0):
+        """
+        Args:
+            driver: Neo4j driver
+            engine: CallGraphEngine (для расчета, если сохраненных метрик нет)
+            samples: Источников для оценки betweenness
+            check_interval: Интервал проверки версии графа (секунды)
+            retry_interval: Пауза перед повтором неудачного фонового расчета (секунды)
+        """
+        self.driver = driver
+        self.engine = engine
+        self.samples = samples
+        self.check_interval = check_interval
+        self.retry_interval = retry_interval
+
+        self.version: Optional[str] = None
+        self.current_version: Optional[str] = None
+        self._checked_at = 0.0
+        # Метрика -> [(file_path, score)] по убыванию
+        self.ranked: Dict[str, List[Tuple[str, float]]] = {}
+        self._lock = threading.Lock()
+        self._compute_lock = threading.Lock()
+        self._refreshing = False
+        self._failed_at = 0.0
+
+    def compute_and_save(self) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        Расчет по текущей версии графа и сохранение в Neo4j
+
+        Returns:
+            Отсортированные списки по метрикам
+        """
+        if self.engine is None:
+            raise RuntimeError("CallGraphEngine is required to compute centrality")
+
+        snapshot = self.engine.snapshot()
+        start_time = time.time()
+        scores = compute_module_centrality(snapshot, samples=self.samples)
+        logger.info(
+            f"Centrality computed: {snapshot.modules_count} modules "
+            f"({time.time() - start_time:.2f}s, {self.samples} samples)"
+        )
+
+        rows = [
+            {
+                'id': module_id,
+                'pagerank': float(scores['pagerank'][i]),
+                'betweenness': float(scores['betweenness'][i])
+            }
+            for i, module_id in enumerate(snapshot.module_ids)
+        ]
+        with self.driver.session() as session:
+            for start in range(0, len(rows), 5000):
+                session.run(SAVE_SCORES_QUERY, rows=rows[start:start + 5000]).consume()
+            session.run(SAVE_VERSION_QUERY, id=GRAPH_META_ID, version=snapshot.version).consume()
+
+        records = [
+            {'module': snapshot.module_paths[i], 'pagerank': row['pagerank'], 'betweenness': row['betweenness']}
+            for i, row in enumerate(rows)
+        ]
+        self._set(snapshot.version, records)
+        return self.ranked
+
+    def _load(self, version: str) -> bool:
+        """Чтение сохраненных метрик версии"""
+        with self.driver.session() as session:
+            records = session.run(LOAD_SCORES_QUERY, id=GRAPH_META_ID, version=version).data()
+
+        if not records:
+            return False
+
+        self._set(version, records)
+        return True
+
+    def _load_latest(self) -> bool:
+        """Чтение последних сохраненных метрик (любой версии графа)"""
+        with self.driver.session() as session:
+            records = session.run(LOAD_LATEST_SCORES_QUERY, id=GRAPH_META_ID).data()
+
+        if not records:
+            return False
+
+        self._set(records[0]['version'], records)
+        logger.info(f"Loaded centrality of graph version {self.version}")
+        return True
+
+    def _set(self, version: Optional[str], records: List[Dict]):
+        """Отсортированные списки в памяти"""
+        self.ranked = {
+            metric: sorted(
+                ((r['module'], float(r[metric] or 0.0)) for r in records),
+                key=lambda item: item[1],
+                reverse=True
+            )
+            for metric in CENTRALITY_METRICS
+        }
+        self.version = version
+
+    @property
+    def stale(self) -> bool:
+        """Метрики посчитаны для предыдущей версии графа"""
+        return self.current_version is not None and self.version != self.current_version
+
+    def _refresh_in_background(self):
+        """Фоновый расчет по новой версии графа (один одновременно)"""
+        with self._lock:
+            if self._refreshing or time.time() - self._failed_at < self.retry_interval:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                with self._compute_lock:
+                    self.compute_and_save()
+            except Exception as e:
+                logger.error(f"Centrality computation failed: {e}")
+                self._failed_at = time.time()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="centrality-refresh", daemon=True).start()
+
+    def refresh(self):
+        """
+        Актуализация по версии графа
+
+        Сохраненные метрики версии загружаются из Neo4j; если их нет -
+        отдаются последние сохраненные, а расчет запускается в фоне.
+        """
+        if self.ranked and time.time() - self._checked_at < self.check_interval:
+            return
+
+        with self._lock:
+            if self.ranked and time.time() - self._checked_at < self.check_interval:
+                return
+
+            version = get_graph_version(self.driver)
+            self._checked_at = time.time()
+            if version is None:
+                return
+            self.current_version = version
+            if version == self.version or self._load(version):
+                return
+            if not self.ranked:
+                self._load_latest()
+
+        if self.ranked:
+            logger.info(f"No saved centrality for graph version {version}, serving {self.version}")
+            self._refresh_in_background()
+            return
+
+        # Метрики не сохранялись ни разу - первый расчет синхронно
+        with self._compute_lock:
+            if not self.ranked:
+                logger.info(f"No saved centrality for graph version {version}, computing")
+                self.compute_and_save()
+
+    def top(self, metric: str = 'pagerank', top_n: int = 10) -> List[Tuple[str, float]]:
+        """
+        Самые центральные модули
+
+        Args:
+            metric: pagerank или betweenness
+            top_n: Количество результатов
+
+        Returns:
+            [(file_path, score)]
+        """
+        if metric not in CENTRALITY_METRICS:
+            raise ValueError(f"Unknown centrality metric: {metric}")
+
+        self.refresh()
+        return self.ranked.get(metric, [])[:top_n]
@@ -0,0 +1,229 @@
+"""
+Graph Communities - сообщества модулей BSL (Louvain)
+
+Неориентированный взвешенный граф модулей строится из графа вызовов
+CallGraphEngine (вес ребра - количество пар вызывающих друг друга методов
+в обе стороны). Сообщества ищутся методом Louvain: локальные переносы
+вершин с максимальным приростом модулярности, затем свертка сообществ
+в вершины и повтор, пока модулярность растет.
+
+Порядок обхода фиксирован (по индексам модулей), поэтому результат
+для одной версии графа воспроизводим. Результат кешируется на версию
+графа (CallGraphSnapshot.communities).
+"""
+
+from typing import Dict, List, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+def _one_level(adjacency: List[Dict[int, float]], loops: List[float], resolution: float) -> List[int]:
+    """
+    Фаза локальных переносов Louvain
+
+    Args:
+        adjacency: Соседи вершины -> вес (без петель)
+        loops: Вес петли вершины
+        resolution: Параметр разрешения (больше - мельче сообщества)
+
+    Returns:
+        Сообщество каждой вершины (номера сообществ - номера вершин)
+    """
+    n = len(adjacency)
+    degrees = [sum(neighbors.values()) + 2 * loops[i] for i, neighbors in enumerate(adjacency)]
+    total_weight = sum(degrees) / 2
+    if total_weight == 0:
+        return list(range(n))
+
+    community = list(range(n))
+    community_degree = list(degrees)
+
+    modified = True
+    while modified:
+        modified = False
+
+        for node in range(n):
+            current = community[node]
+            degree_share = degrees[node] / (2 * total_weight) * resolution
+
+            # Вес связей вершины с каждым соседним сообществом
+            links: Dict[int, float] = {}
+            for neighbor, weight in adjacency[node].items():
+                c = community[neighbor]
+                links[c] = links.get(c, 0.0) + weight
+
+            community_degree[current] -= degrees[node]
+            remove_cost = -links.get(current, 0.0) + community_degree[current] * degree_share
+
+            best = current
+            best_gain = 0.0
+            for c, weight in links.items():
+                gain = remove_cost + weight - community_degree[c] * degree_share
+                # Равный (с точностью округления) прирост не переносит вершину,
+                # иначе она может бесконечно переходить между сообществами
+                if gain > best_gain + 1e-12:
+                    best_gain = gain
+                    best = c
+
+            community_degree[best] += degrees[node]
+            if best != current:
+                community[node] = best
+                modified = True
+
+    return community
+
+
+def _aggregate(adjacency: List[Dict[int, float]], loops: List[float],
+               community: List[int]) -> Tuple[List[Dict[int, float]], List[float], List[int]]:
+    """
+    Свертка сообществ в вершины
+
+    Returns:
+        (adjacency, loops, renumbered): граф сообществ и номер новой вершины
+        для каждой вершины исходного графа
+    """
+    renumber: Dict[int, int] = {}
+    renumbered = [renumber.setdefault(c, len(renumber)) for c in community]
+
+    size = len(renumber)
+    new_adjacency: List[Dict[int, float]] = [{} for _ in range(size)]
+    new_loops = [0.0] * size
+
+    for node, neighbors in enumerate(adjacency):
+        a = renumbered[node]
+        new_loops[a] += loops[node]
+        for neighbor, weight in neighbors.items():
+            b = renumbered[neighbor]
+            if a == b:
+                # Внутреннее ребро встречается с обеих сторон
+                new_loops[a] += weight / 2
+            else:
+                new_adjacency[a][b] = new_adjacency[a].get(b, 0.0) + weight
+
+    return new_adjacency, new_loops, renumbered
+
+
+def modularity(adjacency: List[Dict[int, float]], loops: List[float], labels: List[int],
+               resolution: float = 1.0) -> float:
+    """
+    Модулярность разбиения
+
+    Args:
+        adjacency: Соседи вершины -> вес (без петель)
+        loops: Вес петли вершины
+        labels: Сообщество каждой вершины
+        resolution: Параметр разрешения
+
+    Returns:
+        Модулярность (-0.5 .. 1)
+    """
+    internal: Dict[int, float] = {}
+    degree: Dict[int, float] = {}
+    total_weight = 0.0
+
+    for node, neighbors in enumerate(adjacency):
+        c = labels[node]
+        node_degree = sum(neighbors.values()) + 2 * loops[node]
+        degree[c] = degree.get(c, 0.0) + node_degree
+        total_weight += node_degree / 2
+
+        inside = loops[node] + sum(w for j, w in neighbors.items() if labels[j] == c) / 2
+        internal[c] = internal.get(c, 0.0) + inside
+
+    if total_weight == 0:
+        return 0.0
+
+    return sum(
+        internal[c] / total_weight - resolution * (degree[c] / (2 * total_weight)) ** 2
+        for c in degree
+    )
+
+
+def louvain(adjacency: List[Dict[int, float]], resolution: float = 1.0,
+            min_gain: float = 1e-7) -> List[int]:
+    """
+    Сообщества методом Louvain
+
+    Args:
+        adjacency: Симметричный граф: соседи вершины -> вес (без петель)
+        resolution: Параметр разрешения
+        min_gain: Минимальный прирост модулярности для следующего уровня
+
+    Returns:
+        Номер сообщества каждой вершины (0..k-1)
+    """
+    n = len(adjacency)
+    labels = list(range(n))
+    loops = [0.0] * n
+    level_adjacency = adjacency
+
+    quality = modularity(adjacency, loops, labels, resolution)
+
+    while True:
+        community = _one_level(level_adjacency, loops, resolution)
+        level_adjacency, loops, renumbered = _aggregate(level_adjacency, loops, community)
+        candidate = [renumbered[label] for label in labels]
+
+        new_quality = modularity(adjacency, [0.0] * n, candidate, resolution)
+        if new_quality - quality < min_gain:
+            break
+
+        labels = candidate
+        quality = new_quality
+        if len(level_adjacency) == len(renumbered):
+            break
+
+    # Номера по первому появлению
+    renumber: Dict[int, int] = {}
+    return [renumber.setdefault(label, len(renumber)) for label in labels]
+
+
+def detect_module_communities(snapshot, resolution: float = 1.0) -> Dict:
+    """
+    Сообщества модулей графа вызовов
+
+    Args:
+        snapshot: CallGraphSnapshot
+        resolution: Параметр разрешения Louvain
+
+    Returns:
+        {'communities': списки индексов модулей по убыванию размера (внутри -
+        по убыванию взвешенной степени, без одиночных модулей),
+        'community_of': номер сообщества модуля или -1,
+        'modularity': модулярность}
+    """
+    src, dst, weights = snapshot.module_edges()
+    size = snapshot.modules_count
+
+    adjacency: List[Dict[int, float]] = [{} for _ in range(size)]
+    for a, b, weight in zip(src.tolist(), dst.tolist(), weights.tolist()):
+        adjacency[a][b] = adjacency[a].get(b, 0.0) + weight
+        adjacency[b][a] = adjacency[b].get(a, 0.0) + weight
+
+    labels = louvain(adjacency, resolution=resolution)
+    strength = [sum(neighbors.values()) for neighbors in adjacency]
+
+    groups: Dict[int, List[int]] = {}
+    for module, label in enumerate(labels):
+        groups.setdefault(label, []).append(module)
+
+    communities = [
+        sorted(members, key=lambda m: (-strength[m], m))
+        for members in groups.values()
+        if len(members) > 1
+    ]
+    communities.sort(key=lambda members: (-len(members), members[0]))
+
+    community_of = np.full(size, -1, dtype=np.int32)
+    for number, members in enumerate(communities):
+        community_of[members] = number
+
+    return {
+        'communities': communities,
+        'community_of': community_of,
+        'modularity': modularity(adjacency, [0.0] * size, labels, resolution)
+    }
@@ -0,0 +1,230 @@
+"""
+Graph Features - признаки графа в payload Qdrant (bsl_code)
+
+Для гибридного ранжирования нужны только счетчики вызовов модуля,
+количество связанных модулей и центральность. Они вычисляются по графу
+вызовов в памяти (CallGraphSnapshot) один раз на версию графа и
+записываются в payload точек коллекции bsl_code:
+
+    graph_incoming_calls, graph_outgoing_calls, graph_related_modules,
+    graph_pagerank, graph_betweenness, graph_version
+
+Точки с graph_version текущей версии пропускаются, поэтому повторная
+синхронизация после инкрементального обновления графа переписывает
+только payload (без векторов) и только если версия изменилась.
+HybridSearchEngine ранжирует по этим полям без запросов к Neo4j
+(hybrid_score - общая формула гибридной оценки).
+"""
+
+import sys
+import time
+import logging
+from pathlib import Path
+from typing import Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.graph_centrality import compute_module_centrality
+from services.graph_paths import module_path_keys, normalize_module_path
+
+logger = logging.getLogger(__name__)
+
+GRAPH_FEATURE_FIELDS = (
+    'graph_incoming_calls',
+    'graph_outgoing_calls',
+    'graph_related_modules',
+    'graph_pagerank',
+    'graph_betweenness',
+)
+GRAPH_VERSION_FIELD = 'graph_version'
+
+HYBRID_SCORE_WEIGHTS = {
+    'semantic': 0.6,        # Базовая релевантность
+    'incoming_calls': 0.2,  # Популярность (вызовы)
+    'outgoing_calls': 0.1,  # Активность (делает вызовы)
+    'connections': 0.1      # Связность (связанные модули)
+}
+
+
+def hybrid_score(semantic_score: float, graph_metrics: Dict, weights: Optional[Dict] = None) -> float:
+    """
+    Гибридная оценка: semantic score и метрики графа
+
+    Args:
+        semantic_score: Score из semantic search (0-1)
+        graph_metrics: incoming_calls, outgoing_calls и related_count
+            (или список related_modules)
+        weights: Веса факторов (по умолчанию HYBRID_SCORE_WEIGHTS)
+
+    Returns:
+        Гибридный score (0-1)
+    """
+    if weights is None:
+        weights = HYBRID_SCORE_WEIGHTS
+
+    # Нормализация graph метрик (0-1)
+    incoming_norm = min(graph_metrics['incoming_calls'] / 10.0, 1.0)
+    outgoing_norm = min(graph_metrics['outgoing_calls'] / 10.0, 1.0)
+    related_count = graph_metrics.get('related_count', len(graph_metrics.get('related_modules', [])))
+    connections_norm = min(related_count / 5.0, 1.0)
+
+    # Взвешенная сумма
+    return (
+        weights['semantic'] * semantic_score +
+        weights['incoming_calls'] * incoming_norm +
+        weights['outgoing_calls'] * outgoing_norm +
+        weights['connections'] * connections_norm
+    )
+
+
+def compute_module_features(snapshot, samples: int = 256) -> Dict[str, Dict]:
+    """
+    Признаки графа для каждого модуля
+
+    Args:
+        snapshot: CallGraphSnapshot
+        samples: Источников для оценки betweenness
+
+    Returns:
+        path_key -> payload с полями GRAPH_FEATURE_FIELDS и graph_version
+    """
+    centrality = compute_module_centrality(snapshot, samples=samples)
+
+    features = {}
+    for i, file_path in enumerate(snapshot.module_paths):
+        if not file_path:
+            continue
+        features[normalize_module_path(file_path)] = {
+            'graph_incoming_calls': int(snapshot.module_in[i]),
+            'graph_outgoing_calls': int(snapshot.module_out[i]),
+            'graph_related_modules': int(snapshot.coupling[i]),
+            'graph_pagerank': round(float(centrality['pagerank'][i]), 6),
+            'graph_betweenness': round(float(centrality['betweenness'][i]), 8),
+            GRAPH_VERSION_FIELD: snapshot.version
+        }
+    return features
+
+
+def match_module_features(file_path: str, features: Dict[str, Dict]) -> Optional[Dict]:
+    """Признаки модуля по пути из payload (самый длинный совпавший path_key)"""
+    for key in module_path_keys(file_path):
+        if key in features:
+            return features[key]
+    return None
+
+
+def graph_features_from_payload(payload: Dict) -> Optional[Dict]:
+    """
+    Признаки графа из payload точки Qdrant
+
+    Args:
+        payload: Payload точки bsl_code
+
+    Returns:
+        {incoming_calls, outgoing_calls, related_count, pagerank, betweenness,
+        graph_version} или None, если признаки еще не записаны
+    """
+    if payload.get(GRAPH_VERSION_FIELD) is None:
+        return None
+
+    return {
+        'incoming_calls': payload.get('graph_incoming_calls', 0),
+        'outgoing_calls': payload.get('graph_outgoing_calls', 0),
+        'related_count': payload.get('graph_related_modules', 0),
+        'pagerank': payload.get('graph_pagerank', 0.0),
+        'betweenness': payload.get('graph_betweenness', 0.0),
+        'graph_version': payload[GRAPH_VERSION_FIELD]
+    }
+
+
+class QdrantGraphFeatureSync:
+    """
+    Запись признаков графа в payload коллекции Qdrant
+
+    Использование:
+        sync = QdrantGraphFeatureSync(qdrant_client)
+        stats = sync.sync(compute_module_features(snapshot), snapshot.version)
+    """
+
+    def __init__(self, client, collection_name: str = "bsl_code", batch_size: int = 256):
+        """
+        Args:
+            client: QdrantClient
+            collection_name: Имя коллекции
+            batch_size: Операций set_payload в одном batch_update_points
+        """
+        self.client = client
+        self.collection_name = collection_name
+        self.batch_size = batch_size
+
+    def _apply(self, operations: list):
+        """Пакетная запись payload"""
+        from qdrant_client.models import SetPayload, SetPayloadOperation
+
+        self.client.batch_update_points(
+            collection_name=self.collection_name,
+            update_operations=[
+                SetPayloadOperation(set_payload=SetPayload(payload=payload, points=[point_id]))
+                for point_id, payload in operations
+            ]
+        )
+
+    def sync(self, features: Dict[str, Dict], graph_version: str, force: bool = False) -> Dict:
+        """
+        Обновление payload всех точек коллекции
+
+        Args:
+            features: Результат compute_module_features
+            graph_version: Версия графа признаков
+            force: Переписать и точки с текущей версией
+
+        Returns:
+            Статистика: updated, unchanged, unmatched, duration
+        """
+        start_time = time.time()
+        stats = {'updated': 0, 'unchanged': 0, 'unmatched': 0}
+        empty = dict.fromkeys(GRAPH_FEATURE_FIELDS, 0)
+        empty[GRAPH_VERSION_FIELD] = graph_version
+
+        operations = []
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                limit=1000,
+                offset=offset,
+                with_payload=['file_path', GRAPH_VERSION_FIELD],
+                with_vectors=False
+            )
+
+            for point in points:
+                payload = point.payload or {}
+                if not force and payload.get(GRAPH_VERSION_FIELD) == graph_version:
+                    stats['unchanged'] += 1
+                    continue
+
+                # Модуля нет в графе - нулевые признаки той же версии
+                module_features = match_module_features(payload.get('file_path', ''), features)
+                if module_features is None:
+                    module_features = empty
+                    stats['unmatched'] += 1
+
+                operations.append((point.id, dict(module_features, **{GRAPH_VERSION_FIELD: graph_version})))
+                stats['updated'] += 1
+                if len(operations) >= self.batch_size:
+                    self._apply(operations)
+                    operations = []
+
+            if offset is None:
+                break
+
+        if operations:
+            self._apply(operations)
+
+        stats['duration'] = round(time.time() - start_time, 2)
+        logger.info(
+            f"Graph features synced to {self.collection_name} (version {graph_version}): "
+            f"{stats['updated']} updated, {stats['unchanged']} unchanged, "
+            f"{stats['unmatched']} not in graph ({stats['duration']}s)"
+        )
+        return stats
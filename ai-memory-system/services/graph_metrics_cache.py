@@ -0,0 +1,262 @@
+"""
+Graph Metrics Cache - метрики модулей из графа и их кеш по версии графа
+
+fetch_graph_metrics - метрики пачки модулей (вызовы, вызывающие,
+связанные модули) одним запросом к Neo4j.
+
+Популярные модули (общие модули, менеджеры документов) попадают почти
+в каждый поиск; их метрики и зависимости берутся из памяти, а не из Neo4j.
+
+- ключ: (нормализованный путь модуля, версия графа);
+- LRU вытеснение по количеству записей;
+- версия графа (services/graph_version.py) проверяется не чаще раза
+  в check_interval секунд; после ее смены (индексатор обновил граф)
+  записи старой версии удаляются.
+"""
+
+import sys
+import copy
+import time
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.graph_paths import module_path_keys, normalize_module_path
+from services.graph_version import get_graph_version
+
+logger = logging.getLogger(__name__)
+
+# Метрики модулей для пачки путей: модуль - самый длинный совпавший path_key
+# (индекс module_path_key_idx), подзапросы считают метрики каждого модуля отдельно
+GRAPH_METRICS_QUERY = """
+    UNWIND $rows AS row
+    OPTIONAL MATCH (candidate:Module)
+    WHERE candidate.path_key IN row.keys
+    WITH row, candidate
+    ORDER BY size(candidate.path_key) DESC
+    WITH row, head(collect(candidate)) AS m
+    WHERE m IS NOT NULL
+    CALL {
+        WITH m
+        OPTIONAL MATCH (m)-[:CONTAINS]->(f)
+        WHERE f:Function OR f:Procedure
+        OPTIONAL MATCH (f)<-[incoming:CALLS]-(source)
+        RETURN count(DISTINCT f) AS total_functions,
+               count(DISTINCT incoming) AS incoming_calls,
+               collect(DISTINCT source.name)[..10] AS called_by
+    }
+    CALL {
+        WITH m
+        OPTIONAL MATCH (m)-[:CONTAINS]->(f)-[outgoing:CALLS]->(target)
+        WHERE f:Function OR f:Procedure
+        RETURN count(DISTINCT outgoing) AS outgoing_calls,
+               collect(DISTINCT target.name)[..10] AS calls_to
+    }
+    CALL {
+        WITH m
+        OPTIONAL MATCH (m)-[:CONTAINS]->(f1)-[:CALLS]-(f2)<-[:CONTAINS]-(m2:Module)
+        WHERE (f1:Function OR f1:Procedure) AND m2 <> m
+        RETURN collect(DISTINCT m2.name)[..5] AS related_modules
+    }
+    RETURN row.path AS path,
+           m.name AS module_name,
+           m.module_type AS module_type,
+           total_functions,
+           incoming_calls,
+           outgoing_calls,
+           called_by,
+           calls_to,
+           related_modules
+"""
+
+
+def empty_graph_metrics(file_path: str) -> Dict:
+    """Метрики модуля, не найденного в графе"""
+    return {
+        'module_name': Path(file_path).stem,
+        'module_type': 'Unknown',
+        'functions_count': 0,
+        'incoming_calls': 0,
+        'outgoing_calls': 0,
+        'called_by': [],
+        'calls_to': [],
+        'related_modules': []
+    }
+
+
+def fetch_graph_metrics(driver, file_paths: List[str]) -> Dict[str, Dict]:
+    """
+    Метрики из графа для нескольких файлов одним запросом
+
+    Модули ищутся точным совпадением по индексированному path_key
+    (services/graph_paths.py), все пути - в одном UNWIND запросе.
+
+    Args:
+        driver: Neo4j driver
+        file_paths: Пути к файлам
+
+    Returns:
+        Словарь путь -> метрики (для каждого переданного пути)
+    """
+    paths = list(dict.fromkeys(file_paths))
+    metrics = {path: empty_graph_metrics(path) for path in paths}
+
+    rows = [{'path': path, 'keys': module_path_keys(path)} for path in paths]
+    rows = [row for row in rows if row['keys']]
+    if not rows:
+        return metrics
+
+    with driver.session() as session:
+        for record in session.run(GRAPH_METRICS_QUERY, rows=rows):
+            path = record['path']
+            metrics[path] = {
+                'module_name': record['module_name'] or Path(path).stem,
+                'module_type': record['module_type'] or 'Unknown',
+                'functions_count': record['total_functions'] or 0,
+                'incoming_calls': record['incoming_calls'] or 0,
+                'outgoing_calls': record['outgoing_calls'] or 0,
+                'called_by': [name for name in record['called_by'] if name],
+                'calls_to': [name for name in record['calls_to'] if name],
+                'related_modules': [name for name in record['related_modules'] if name]
+            }
+
+    return metrics
+
+
+class GraphMetricsCache:
+    """
+    LRU кеш значений по пути модуля для текущей версии графа
+
+    Использование:
+        cache = GraphMetricsCache(driver)
+        metrics = cache.get_many(paths, load_batch)   # load_batch(missing) -> {path: value}
+        deps = cache.get(path, load_one)
+    """
+
+    def __init__(self, driver, max_entries: int = 4096, check_interval: float = 10.0):
+        """
+        Args:
+            driver: Neo4j driver (для версии графа)
+            max_entries: Максимум записей в памяти
+            check_interval: Интервал проверки версии графа (секунды)
+        """
+        self.driver = driver
+        self.max_entries = max_entries
+        self.check_interval = check_interval
+
+        self._entries: OrderedDict = OrderedDict()
+        self._version: Optional[str] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'invalidations': 0
+        }
+
+    def _graph_version(self) -> Optional[str]:
+        """Текущая версия графа; при смене - сброс записей"""
+        if time.time() - self._checked_at < self.check_interval:
+            return self._version
+
+        version = get_graph_version(self.driver)
+        with self._lock:
+            self._checked_at = time.time()
+            # Neo4j недоступен - продолжаем с последней известной версией
+            if version is not None and version != self._version:
+                if self._entries:
+                    self.stats['invalidations'] += 1
+                    logger.info(f"Graph metrics cache invalidated: {self._version} -> {version}")
+                self._entries.clear()
+                self._version = version
+            return self._version
+
+    def get_many(self, paths: Iterable[str],
+                 load: Callable[[List[str]], Dict[str, Dict]]) -> Dict[str, Dict]:
+        """
+        Значения для путей (промахи загружаются одним вызовом load)
+
+        Args:
+            paths: Пути модулей
+            load: Загрузка значений для списка путей -> {путь: значение}
+
+        Returns:
+            Словарь путь -> значение (копия записи кеша)
+        """
+        paths = list(dict.fromkeys(paths))
+        version = self._graph_version()
+        result, missing = {}, []
+
+        with self._lock:
+            for path in paths:
+                key = (normalize_module_path(path), version)
+                value = self._entries.get(key)
+                if value is None:
+                    missing.append(path)
+                    continue
+                self._entries.move_to_end(key)
+                result[path] = copy.deepcopy(value)
+            self.stats['hits'] += len(result)
+            self.stats['misses'] += len(missing)
+
+        if not missing:
+            return result
+
+        loaded = load(missing)
+        with self._lock:
+            # Версия сменилась во время загрузки - значения не сохраняем
+            store = version == self._version
+            for path in missing:
+                value = loaded.get(path)
+                if value is None:
+                    continue
+                result[path] = copy.deepcopy(value)
+                if store:
+                    self._entries[(normalize_module_path(path), version)] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+        return result
+
+    def get(self, path: str, load: Callable[[str], Dict]) -> Dict:
+        """
+        Значение для одного пути
+
+        Args:
+            path: Путь модуля
+            load: Загрузка значения для пути
+
+        Returns:
+            Значение (копия записи кеша)
+        """
+        return self.get_many([path], lambda missing: {missing[0]: load(missing[0])})[path]
+
+    def clear(self):
+        """Очистка кеша (следующий запрос перечитает версию графа)"""
+        with self._lock:
+            self._entries.clear()
+            self._checked_at = 0.0
+
+    def get_stats(self) -> Dict:
+        """
+        Статистика кеша
+
+        Returns:
+            Счетчики попаданий/промахов, размер и версия графа
+        """
+        lookups = self.stats['hits'] + self.stats['misses']
+        stats = dict(self.stats)
+        stats.update({
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'graph_version': self._version,
+            'hit_rate': round(self.stats['hits'] / lookups, 3) if lookups else 0.0
+        })
+        return stats
@@ -0,0 +1,50 @@
+"""
+Graph Paths - нормализованные пути модулей BSL
+
+Узел Module хранит path_key - путь файла относительно корня проекта в
+нижнем регистре с прямыми слешами (индекс module_path_key_idx). Поиск
+модуля по пути из другого источника (Qdrant, MCP, API), где путь может
+быть абсолютным или с другим корнем, выполняется точным совпадением
+по суффиксам пути (m.path_key IN $keys, самый длинный совпавший) вместо
+полного просмотра модулей с CONTAINS.
+"""
+
+from pathlib import PurePath
+from typing import List, Union
+
+# Минимум компонент суффикса: короче ("Ext/Module.bsl") - неоднозначно
+MIN_KEY_PARTS = 3
+
+
+def normalize_module_path(path: Union[str, PurePath]) -> str:
+    """
+    Нормализованный путь модуля (значение Module.path_key)
+
+    Args:
+        path: Путь файла (относительный или абсолютный, любые слеши)
+
+    Returns:
+        Путь в нижнем регистре с прямыми слешами, без начальных "./" и "/"
+    """
+    normalized = str(path).replace('\\', '/').lower()
+    while normalized.startswith('./'):
+        normalized = normalized[2:]
+    return normalized.lstrip('/')
+
+
+def module_path_keys(path: Union[str, PurePath], min_parts: int = MIN_KEY_PARTS) -> List[str]:
+    """
+    Кандидаты path_key для пути из внешнего источника
+
+    Args:
+        path: Путь файла
+        min_parts: Минимальное количество компонент суффикса
+
+    Returns:
+        Суффиксы нормализованного пути от самого длинного (весь путь)
+        до min_parts компонент
+    """
+    parts = [part for part in normalize_module_path(path).split('/') if part]
+    if len(parts) <= min_parts:
+        return ['/'.join(parts)] if parts else []
+    return ['/'.join(parts[i:]) for i in range(len(parts) - min_parts + 1)]
@@ -0,0 +1,83 @@
+"""
+Graph Version - версия графа BSL в Neo4j
+
+Загрузчики графа (полная индексация, инкрементальное обновление,
+CSV импорт) после записи обновляют версию в узле GraphMeta. Кеши
+аналитики (CallGraphEngine и др.) сравнивают версию и перестраиваются
+только после изменения графа.
+"""
+
+import time
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+GRAPH_META_ID = "bsl-graph"
+
+GRAPH_VERSION_QUERY = """
+    MATCH (g:GraphMeta {id: $id})
+    RETURN g.version AS version
+"""
+
+BUMP_GRAPH_VERSION_QUERY = """
+    MERGE (g:GraphMeta {id: $id})
+    SET g.version = $version,
+        g.updated_at = datetime()
+"""
+
+# Граф без GraphMeta (загружен до появления версий): отпечаток по счетчикам,
+# которые Neo4j берет из count store без обхода графа
+GRAPH_FINGERPRINT_QUERY = """
+    MATCH ()-[c:CALLS]->()
+    WITH count(c) AS calls
+    MATCH (m:Module)
+    RETURN calls, count(m) AS modules
+"""
+
+
+def new_graph_version() -> int:
+    """Новая версия графа (время записи в миллисекундах)"""
+    return int(time.time() * 1000)
+
+
+def get_graph_version(driver) -> Optional[str]:
+    """
+    Текущая версия графа
+
+    Args:
+        driver: Neo4j driver
+
+    Returns:
+        Версия графа (строка) или None, если Neo4j недоступен
+    """
+    try:
+        with driver.session() as session:
+            record = session.run(GRAPH_VERSION_QUERY, id=GRAPH_META_ID).single()
+            if record and record['version'] is not None:
+                return str(record['version'])
+
+            record = session.run(GRAPH_FINGERPRINT_QUERY).single()
+            if record:
+                return f"count-{record['modules']}-{record['calls']}"
+    except Exception as e:
+        logger.warning(f"Graph version unavailable: {e}")
+
+    return None
+
+
+def bump_graph_version(driver) -> int:
+    """
+    Отметка изменения графа (вызывается после записи)
+
+    Args:
+        driver: Neo4j driver
+
+    Returns:
+        Новая версия
+    """
+    version = new_graph_version()
+    with driver.session() as session:
+        session.run(BUMP_GRAPH_VERSION_QUERY, id=GRAPH_META_ID, version=version).consume()
+    logger.info(f"Graph version: {version}")
+    return version
@@ -5,7 +5,7 @@ Hybrid Search Engine
 """
 
 import logging
-from typing import List, Dict, Optional, Set
+from typing import Iterator, List, Dict, Optional, Set, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 import sys
@@ -15,6 +15,8 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from scripts.search.semantic_search_enhanced import SemanticSearchEngine
+from services.graph_features import hybrid_score
+from services.graph_metrics_cache import GraphMetricsCache, fetch_graph_metrics
 from neo4j import GraphDatabase
 
 logging.basicConfig(level=logging.INFO)
@@ -91,6 +93,9 @@ class HybridSearchEngine:
             auth=(neo4j_user, neo4j_password)
         )
 
+        # Метрики популярных модулей - из памяти (до смены версии графа)
+        self.metrics_cache = GraphMetricsCache(self.neo4j_driver)
+
         logger.info("✅ HybridSearchEngine инициализирован")
         logger.info(f"   Qdrant: {qdrant_url}")
         logger.info(f"   Neo4j: {neo4j_uri}")
@@ -101,6 +106,46 @@ class HybridSearchEngine:
             self.neo4j_driver.close()
             logger.info("🔌 Neo4j подключение закрыто")
 
+    def get_graph_metrics_batch(self, file_paths: List[str]) -> Dict[str, Dict]:
+        """
+        Метрики из графа для нескольких файлов
+
+        Метрики берутся из кеша (путь + версия графа), отсутствующие -
+        одним запросом к Neo4j.
+
+        Args:
+            file_paths: Пути к файлам
+
+        Returns:
+            Словарь путь -> метрики (для каждого переданного пути)
+        """
+        return self.metrics_cache.get_many(file_paths, self._load_graph_metrics)
+
+    def _load_graph_metrics(self, paths: List[str]) -> Dict[str, Dict]:
+        """Метрики из графа одним запросом (промахи кеша)"""
+        return fetch_graph_metrics(self.neo4j_driver, paths)
+
+    @staticmethod
+    def _payload_graph_metrics(sem_result) -> Dict:
+        """
+        Метрики для ранжирования из признаков графа в payload Qdrant
+
+        Признаки записывает scripts/run_qdrant_graph_features.py; если их нет,
+        graph метрики нулевые (ранжирование только по semantic score).
+        """
+        features = sem_result.graph_features or {}
+        return {
+            'module_name': Path(sem_result.file_path).stem,
+            'module_type': sem_result.module_type,
+            'functions_count': sem_result.functions_count,
+            'incoming_calls': features.get('incoming_calls', 0),
+            'outgoing_calls': features.get('outgoing_calls', 0),
+            'related_count': features.get('related_count', 0),
+            'called_by': [],
+            'calls_to': [],
+            'related_modules': []
+        }
+
     def _get_graph_metrics(self, file_path: str) -> Dict:
         """
         Получение метрик из графа для файла
@@ -111,89 +156,7 @@ class HybridSearchEngine:
         Returns:
             Словарь с метриками
         """
-        with self.neo4j_driver.session() as session:
-            # Нормализация пути (удаление начального слэша если есть)
-            normalized_path = file_path.lstrip('/')
-
-            # Поиск модуля по пути
-            result = session.run("""
-                MATCH (m:Module)
-                WHERE m.file_path CONTAINS $file_path_part
-                OPTIONAL MATCH (m)-[:CONTAINS]->(f)
-                WHERE f:Function OR f:Procedure
-                OPTIONAL MATCH (f)<-[incoming:CALLS]-()
-                OPTIONAL MATCH (f)-[outgoing:CALLS]->()
-                RETURN
-                    m.name as module_name,
-                    m.module_type as module_type,
-                    count(DISTINCT f) as total_functions,
-                    count(DISTINCT incoming) as incoming_calls,
-                    count(DISTINCT outgoing) as outgoing_calls
-            """, file_path_part=normalized_path.replace('\\', '/'))
-
-            record = result.single()
-
-            if not record:
-                # Модуль не найден в графе
-                return {
-                    'module_name': Path(file_path).stem,
-                    'module_type': 'Unknown',
-                    'functions_count': 0,
-                    'incoming_calls': 0,
-                    'outgoing_calls': 0,
-                    'called_by': [],
-                    'calls_to': [],
-                    'related_modules': []
-                }
-
-            # Получение функций, вызывающих этот модуль
-            called_by = session.run("""
-                MATCH (m:Module)
-                WHERE m.file_path CONTAINS $file_path_part
-                MATCH (m)-[:CONTAINS]->(target)
-                WHERE target:Function OR target:Procedure
-                MATCH (source)-[c:CALLS]->(target)
-                WHERE source:Function OR source:Procedure
-                RETURN DISTINCT source.name as caller_name
-                LIMIT 10
-            """, file_path_part=normalized_path.replace('\\', '/')).values()
-
-            # Получение функций, которые вызывает этот модуль
-            calls_to = session.run("""
-                MATCH (m:Module)
-                WHERE m.file_path CONTAINS $file_path_part
-                MATCH (m)-[:CONTAINS]->(source)
-                WHERE source:Function OR source:Procedure
-                MATCH (source)-[c:CALLS]->(target)
-                WHERE target:Function OR target:Procedure
-                RETURN DISTINCT target.name as target_name
-                LIMIT 10
-            """, file_path_part=normalized_path.replace('\\', '/')).values()
-
-            # Связанные модули (через вызовы)
-            related_modules = session.run("""
-                MATCH (m1:Module)
-                WHERE m1.file_path CONTAINS $file_path_part
-                MATCH (m1)-[:CONTAINS]->(f1)
-                WHERE f1:Function OR f1:Procedure
-                MATCH (f1)-[:CALLS]-(f2)
-                WHERE f2:Function OR f2:Procedure
-                MATCH (m2:Module)-[:CONTAINS]->(f2)
-                WHERE m2 <> m1
-                RETURN DISTINCT m2.name as related_module
-                LIMIT 5
-            """, file_path_part=normalized_path.replace('\\', '/')).values()
-
-            return {
-                'module_name': record['module_name'] or Path(file_path).stem,
-                'module_type': record['module_type'] or 'Unknown',
-                'functions_count': record['total_functions'] or 0,
-                'incoming_calls': record['incoming_calls'] or 0,
-                'outgoing_calls': record['outgoing_calls'] or 0,
-                'called_by': [r[0] for r in called_by if r[0]],
-                'calls_to': [r[0] for r in calls_to if r[0]],
-                'related_modules': [r[0] for r in related_modules if r[0]]
-            }
+        return self.get_graph_metrics_batch([file_path])[file_path]
 
     def _calculate_hybrid_score(
         self,
@@ -212,28 +175,7 @@ class HybridSearchEngine:
         Returns:
             Гибридный score (0-1)
         """
-        if weights is None:
-            weights = {
-                'semantic': 0.6,      # Базовая релевантность
-                'incoming_calls': 0.2,  # Популярность (вызовы)
-                'outgoing_calls': 0.1,  # Активность (делает вызовы)
-                'connections': 0.1      # Связность (связанные модули)
-            }
-
-        # Нормализация graph метрик (0-1)
-        incoming_norm = min(graph_metrics['incoming_calls'] / 10.0, 1.0)
-        outgoing_norm = min(graph_metrics['outgoing_calls'] / 10.0, 1.0)
-        connections_norm = min(len(graph_metrics['related_modules']) / 5.0, 1.0)
-
-        # Взвешенная сумма
-        hybrid_score = (
-            weights['semantic'] * semantic_score +
-            weights['incoming_calls'] * incoming_norm +
-            weights['outgoing_calls'] * outgoing_norm +
-            weights['connections'] * connections_norm
-        )
-
-        return hybrid_score
+        return hybrid_score(semantic_score, graph_metrics, weights)
 
     def search(
         self,
@@ -256,6 +198,45 @@ class HybridSearchEngine:
         Returns:
             Список результатов поиска
         """
+        final_results = []
+        for _, final_results in self.search_stream(
+            query=query,
+            limit=limit,
+            min_semantic_score=min_semantic_score,
+            include_graph_context=include_graph_context,
+            score_weights=score_weights
+        ):
+            pass
+
+        return final_results
+
+    def search_stream(
+        self,
+        query: str,
+        limit: int = 10,
+        min_semantic_score: float = 0.3,
+        include_graph_context: bool = True,
+        score_weights: Dict = None
+    ) -> Iterator[Tuple[str, List[HybridSearchResult]]]:
+        """
+        Гибридный поиск с промежуточными результатами
+
+        Стадии:
+            vector - сразу после ответа Qdrant: ранжирование по признакам
+                графа из payload, без запросов к Neo4j;
+            hybrid - итоговый результат (метрики и graph контекст из Neo4j).
+        Без graph контекста Neo4j не опрашивается - отдается только hybrid.
+
+        Args:
+            query: Поисковый запрос
+            limit: Количество результатов
+            min_semantic_score: Минимальный semantic score
+            include_graph_context: Включить graph контекст
+            score_weights: Веса для гибридного score
+
+        Yields:
+            (стадия, текущий список результатов)
+        """
         logger.info(f"🔍 Гибридный поиск: '{query}'")
 
         # 1. Semantic search через Qdrant
@@ -267,34 +248,73 @@ class HybridSearchEngine:
 
         logger.info(f"   📊 Semantic results: {len(semantic_results)}")
 
-        # 2. Обогащение результатов graph метриками
-        hybrid_results = []
+        # Первые результаты - по признакам графа из payload (Neo4j еще не опрошен)
+        if include_graph_context and semantic_results:
+            yield 'vector', self._build_results(
+                self._rank(semantic_results, {}, score_weights)[:limit]
+            )
+
+        # 2. Graph метрики для ранжирования: признаки из payload Qdrant (graph_*),
+        # из Neo4j (один запрос) - только для результатов без признаков
+        live_metrics = {}
+        if include_graph_context:
+            missing = [r.file_path for r in semantic_results if r.graph_features is None]
+            if missing:
+                live_metrics = self.get_graph_metrics_batch(missing)
+
+        # 3. Сортировка по гибридному score и ограничение результатов
+        scored = self._rank(semantic_results, live_metrics, score_weights)[:limit]
+
+        # 4. Graph контекст (вызывающие, вызываемые, связанные модули) - только
+        # для итоговых результатов, ранжированных по признакам из payload
+        if include_graph_context:
+            context_paths = [
+                sem_result.file_path for _, sem_result, _ in scored
+                if sem_result.file_path not in live_metrics
+            ]
+            if context_paths:
+                live_metrics.update(self.get_graph_metrics_batch(context_paths))
+
+            scored = [
+                (score, sem_result, live_metrics[sem_result.file_path])
+                for score, sem_result, _ in scored
+            ]
+
+        final_results = self._build_results(scored)
 
+        logger.info(f"   ✅ Hybrid results: {len(final_results)}")
+
+        yield 'hybrid', final_results
+
+    def _rank(self, semantic_results, live_metrics: Dict[str, Dict], score_weights: Dict = None) -> List[Tuple]:
+        """
+        Гибридный score результатов semantic search
+
+        Метрики - из Neo4j (live_metrics), если загружены, иначе из payload.
+
+        Returns:
+            Список (score, semantic результат, метрики) по убыванию score
+        """
+        scored = []
         for sem_result in semantic_results:
-            # Получение graph метрик
-            if include_graph_context:
-                graph_metrics = self._get_graph_metrics(sem_result.file_path)
-            else:
-                graph_metrics = {
-                    'module_name': Path(sem_result.file_path).stem,
-                    'module_type': sem_result.module_type,
-                    'functions_count': sem_result.functions_count,
-                    'incoming_calls': 0,
-                    'outgoing_calls': 0,
-                    'called_by': [],
-                    'calls_to': [],
-                    'related_modules': []
-                }
+            graph_metrics = live_metrics.get(sem_result.file_path) or self._payload_graph_metrics(sem_result)
 
             # Вычисление гибридного score
-            hybrid_score = self._calculate_hybrid_score(
+            score = self._calculate_hybrid_score(
                 semantic_score=sem_result.score,
                 graph_metrics=graph_metrics,
                 weights=score_weights
             )
+            scored.append((score, sem_result, graph_metrics))
 
-            # Создание результата
-            hybrid_result = HybridSearchResult(
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return scored
+
+    @staticmethod
+    def _build_results(scored: List[Tuple]) -> List[HybridSearchResult]:
+        """Результаты из списка (score, semantic результат, метрики)"""
+        return [
+            HybridSearchResult(
                 file_path=sem_result.file_path,
                 module_name=graph_metrics['module_name'],
                 module_type=graph_metrics['module_type'],
@@ -307,22 +327,12 @@ class HybridSearchEngine:
                 called_by=graph_metrics['called_by'],
                 calls_to=graph_metrics['calls_to'],
                 related_modules=graph_metrics['related_modules'],
-                hybrid_score=hybrid_score,
+                hybrid_score=score,
                 preview=sem_result.preview,
                 indexed_at=sem_result.indexed_at
             )
-
-            hybrid_results.append(hybrid_result)
-
-        # 3. Сортировка по гибридному score
-        hybrid_results.sort(key=lambda x: x.hybrid_score, reverse=True)
-
-        # 4. Ограничение результатов
-        final_results = hybrid_results[:limit]
-
-        logger.info(f"   ✅ Hybrid results: {len(final_results)}")
-
-        return final_results
+            for score, sem_result, graph_metrics in scored
+        ]
 
     def find_related_by_graph(
         self,
@@ -400,7 +410,8 @@ class HybridSearchEngine:
                     neo4j_stats.get('modules', 0)
                 ),
                 'graph_coverage': neo4j_stats.get('modules', 0) / max(qdrant_stats.get('total_points', 1), 1)
-            }
+            },
+            'metrics_cache': self.metrics_cache.get_stats()
         }
 
 
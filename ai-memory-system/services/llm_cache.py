@@ -0,0 +1,258 @@
+"""
+LLM Cache - персистентный кеш классификации намерений и re-ranking
+
+Вызов deepseek-coder через Ollama занимает секунды, а повторные запросы
+(та же фраза из разных сессий, следующая страница результатов) дают тот
+же ответ. Результаты хранятся в SQLite, размер ограничен max_entries
+(LRU вытеснение по времени последнего обращения).
+
+Ключи:
+- intent: нормализованный запрос + модель;
+- rerank: нормализованный запрос + модель + упорядоченные кандидаты
+  (путь файла и версия индекса кандидата).
+
+В ключ входит LLM_CACHE_VERSION - изменение промптов сбрасывает кеш.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.singleflight import request_key
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path(__file__).parent.parent / "cache" / "llm" / "llm_cache.db"
+
+# Версия промптов LLMService: при изменении промпта старые ответы не используются
+LLM_CACHE_VERSION = 1
+
+CACHE_KINDS = ('intent', 'rerank')
+
+
+def candidate_version(result: Dict[str, Any]) -> str:
+    """
+    Версия индекса кандидата re-ranking
+
+    content_hash / indexed_at из payload, если переданы; иначе - хеш полей,
+    которые видит LLM (меняются при переиндексации файла).
+
+    Args:
+        result: Кандидат (словарь для LLMService.rerank_results)
+
+    Returns:
+        Строка версии
+    """
+    version = result.get('content_hash') or result.get('indexed_at')
+    if version:
+        return str(version)
+
+    visible = f"{result.get('module_type', '')}|{result.get('functions_count', 0)}|{result.get('summary', '')}"
+    return hashlib.sha256(visible.encode('utf-8')).hexdigest()[:16]
+
+
+def intent_cache_key(query: str, model: str) -> str:
+    """Ключ классификации намерения"""
+    return request_key(query, kind='intent', model=model, version=LLM_CACHE_VERSION)
+
+
+def rerank_cache_key(query: str, model: str, candidates: List[Dict[str, Any]]) -> str:
+    """Ключ re-ranking: запрос и упорядоченный список кандидатов с версиями"""
+    return request_key(
+        query,
+        kind='rerank',
+        model=model,
+        version=LLM_CACHE_VERSION,
+        candidates=[[c.get('file_path', ''), candidate_version(c)] for c in candidates]
+    )
+
+
+class LLMResultCache:
+    """
+    LRU кеш ответов LLM в SQLite
+
+    Использование:
+        cache = LLMResultCache()
+        value = cache.get('intent', key)
+        if value is None:
+            value = call_llm()
+            cache.put('intent', key, value)
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_entries: int = 10000):
+        """
+        Args:
+            db_path: Файл SQLite (по умолчанию cache/llm/llm_cache.db)
+            max_entries: Максимум записей (все типы вместе)
+        """
+        self.db_path = Path(db_path) if db_path else DEFAULT_CACHE_PATH
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+
+        # Вызовы LLM идут из пула потоков - одно соединение под блокировкой
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used)")
+        self._conn.commit()
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+        self.stats = {
+            kind: {'hits': 0, 'misses': 0, 'saves': 0}
+            for kind in CACHE_KINDS
+        }
+        self.stats_total = {'evictions': 0, 'errors': 0}
+
+        logger.info(f"LLMResultCache: {self.db_path} ({self._entries} записей)")
+
+    def get(self, kind: str, key: str) -> Optional[Any]:
+        """
+        Ответ из кеша
+
+        Args:
+            kind: Тип (intent, rerank)
+            key: Ключ (intent_cache_key / rerank_cache_key)
+
+        Returns:
+            Сохраненное значение или None
+        """
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    self.stats[kind]['misses'] += 1
+                    return None
+
+                self._conn.execute(
+                    "UPDATE llm_cache SET last_used = ? WHERE key = ?", (time.time(), key)
+                )
+                self._conn.commit()
+                self.stats[kind]['hits'] += 1
+
+            return json.loads(row[0])
+
+        except Exception as e:
+            logger.warning(f"Ошибка чтения LLM кеша: {e}")
+            self.stats_total['errors'] += 1
+            return None
+
+    def put(self, kind: str, key: str, value: Any):
+        """
+        Сохранение ответа (с вытеснением давно неиспользуемых записей)
+
+        Args:
+            kind: Тип (intent, rerank)
+            key: Ключ
+            value: JSON-сериализуемое значение
+        """
+        try:
+            payload = json.dumps(value, ensure_ascii=False)
+            now = time.time()
+
+            with self._lock:
+                exists = self._conn.execute(
+                    "SELECT 1 FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone() is not None
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, kind, value, created_at, last_used) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, kind, payload, now, now)
+                )
+                if not exists:
+                    self._entries += 1
+
+                overflow = self._entries - self.max_entries
+                if overflow > 0:
+                    self._conn.execute(
+                        "DELETE FROM llm_cache WHERE key IN "
+                        "(SELECT key FROM llm_cache ORDER BY last_used LIMIT ?)",
+                        (overflow,)
+                    )
+                    self._entries -= overflow
+                    self.stats_total['evictions'] += overflow
+
+                self._conn.commit()
+                self.stats[kind]['saves'] += 1
+
+        except Exception as e:
+            logger.warning(f"Ошибка записи LLM кеша: {e}")
+            self.stats_total['errors'] += 1
+
+    def clear(self):
+        """Удаление всех записей"""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+            self._entries = 0
+        logger.info("LLM кеш очищен")
+
+    def close(self):
+        """Закрытие соединения"""
+        with self._lock:
+            self._conn.close()
+
+    def get_stats(self) -> Dict:
+        """
+        Статистика кеша
+
+        Returns:
+            Попадания/промахи по типам, размер, вытеснения
+        """
+        stats = {}
+        for kind, counters in self.stats.items():
+            lookups = counters['hits'] + counters['misses']
+            stats[kind] = {
+                **counters,
+                'hit_rate': round(counters['hits'] / lookups, 3) if lookups else 0.0
+            }
+        stats.update(self.stats_total)
+        stats.update({
+            'entries': self._entries,
+            'max_entries': self.max_entries,
+            'db_path': str(self.db_path)
+        })
+        return stats
+
+
+# Singleton instance
+_llm_cache: Optional[LLMResultCache] = None
+
+
+def get_llm_cache() -> LLMResultCache:
+    """
+    Получение singleton instance LLMResultCache
+
+    Путь к файлу можно задать переменной окружения LLM_CACHE_PATH,
+    размер - LLM_CACHE_MAX_ENTRIES.
+
+    Returns:
+        LLMResultCache instance
+    """
+    global _llm_cache
+
+    if _llm_cache is None:
+        _llm_cache = LLMResultCache(
+            db_path=os.getenv("LLM_CACHE_PATH"),
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+        )
+
+    return _llm_cache
@@ -9,14 +9,25 @@ LLM Service для AI Memory System
 Использует Ollama для работы с локальными LLM моделями:
 - DeepSeek-Coder 6.7B - для re-ranking результатов
 - Qwen2.5-Coder 7B - для генерации кода
+
+Ответы классификации и re-ranking кешируются (services/llm_cache.py):
+повторный запрос с теми же кандидатами не вызывает LLM.
 """
 
+import sys
 import logging
 import requests
 import json
+from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.llm_cache import (
+    LLMResultCache, get_llm_cache, intent_cache_key, rerank_cache_key
+)
 
 logger = logging.getLogger(__name__)
 
@@ -65,7 +76,9 @@ class LLMService:
         ollama_url: str = "http://localhost:11434",
         reranking_model: str = "deepseek-coder:6.7b",
         generation_model: str = "deepseek-coder:6.7b",
-        timeout: int = 180  # Увеличен до 3 минут для больших моделей
+        timeout: int = 180,  # Увеличен до 3 минут для больших моделей
+        cache: Optional[LLMResultCache] = None,
+        use_cache: bool = True
     ):
         """
         Инициализация LLM Service
@@ -75,12 +88,21 @@ class LLMService:
             reranking_model: Модель для re-ranking (по умолчанию DeepSeek-Coder 6.7B)
             generation_model: Модель для генерации кода (по умолчанию Qwen2.5-Coder 7B)
             timeout: Таймаут запросов в секундах
+            cache: Кеш ответов intent/rerank (по умолчанию общий get_llm_cache())
+            use_cache: Кешировать ответы intent/rerank
         """
         self.ollama_url = ollama_url
         self.reranking_model = reranking_model
         self.generation_model = generation_model
         self.timeout = timeout
 
+        self.cache = None
+        if use_cache:
+            try:
+                self.cache = cache or get_llm_cache()
+            except Exception as e:
+                logger.warning(f"LLM кеш недоступен, работа без кеша: {e}")
+
         logger.info(f"LLMService инициализирован:")
         logger.info(f"  Ollama URL: {ollama_url}")
         logger.info(f"  Re-ranking model: {reranking_model}")
@@ -115,16 +137,28 @@ class LLMService:
             logger.error(f"❌ Не удалось подключиться к Ollama: {e}")
             return False
 
-    def classify_intent(self, query: str) -> IntentClassification:
+    def classify_intent(self, query: str, timeout: Optional[float] = None) -> IntentClassification:
         """
         Классификация намерения поискового запроса
 
         Args:
             query: Поисковый запрос пользователя
+            timeout: Таймаут HTTP запроса в секундах (None - self.timeout)
 
         Returns:
             IntentClassification с типом намерения и рекомендованными фильтрами
         """
+        cache_key = intent_cache_key(query, self.reranking_model)
+        if self.cache:
+            cached = self.cache.get('intent', cache_key)
+            if cached is not None:
+                return IntentClassification(
+                    intent=SearchIntent(cached["intent"]),
+                    confidence=cached["confidence"],
+                    reasoning=cached["reasoning"],
+                    suggested_filters=cached["suggested_filters"]
+                )
+
         prompt = f"""Проанализируй следующий поисковый запрос в контексте поиска по 1C BSL коду:
 
 Запрос: "{query}"
@@ -152,19 +186,29 @@ class LLMService:
             response = self._call_llm(
                 model=self.reranking_model,
                 prompt=prompt,
-                temperature=0.1  # Низкая температура для более предсказуемых результатов
+                temperature=0.1,  # Низкая температура для более предсказуемых результатов
+                timeout=timeout
             )
 
             # Парсинг JSON ответа
             result = self._extract_json_from_response(response)
 
-            return IntentClassification(
+            classification = IntentClassification(
                 intent=SearchIntent(result.get("intent", "general_search")),
                 confidence=float(result.get("confidence", 0.5)),
                 reasoning=result.get("reasoning", ""),
                 suggested_filters=result.get("suggested_filters", {})
             )
 
+            # Ответ без намерения (JSON не разобран) не кешируем
+            if self.cache and "intent" in result:
+                self.cache.put('intent', cache_key, {
+                    **asdict(classification),
+                    "intent": classification.intent.value
+                })
+
+            return classification
+
         except Exception as e:
             logger.error(f"Ошибка классификации намерения: {e}")
             # Возвращаем безопасное значение по умолчанию
@@ -179,7 +223,8 @@ class LLMService:
         self,
         query: str,
         results: List[Dict[str, Any]],
-        top_k: int = 10
+        top_k: int = 10,
+        timeout: Optional[float] = None
     ) -> List[RerankedResult]:
         """
         Переранжирование результатов поиска с помощью LLM
@@ -188,6 +233,7 @@ class LLMService:
             query: Исходный поисковый запрос
             results: Список результатов для переранжирования
             top_k: Количество лучших результатов для возврата
+            timeout: Таймаут HTTP запроса в секундах (None - self.timeout)
 
         Returns:
             Список RerankedResult, отсортированный по релевантности
@@ -198,6 +244,13 @@ class LLMService:
         # Ограничиваем количество результатов для LLM (слишком много токенов)
         results_to_rerank = results[:min(20, len(results))]
 
+        # Полный порядок кандидатов кешируется до top_k - следующая страница тоже из кеша
+        cache_key = rerank_cache_key(query, self.reranking_model, results_to_rerank)
+        if self.cache:
+            cached = self.cache.get('rerank', cache_key)
+            if cached is not None:
+                return self._build_reranked(cached, results_to_rerank)[:top_k]
+
         # Формируем prompt с результатами
         results_text = self._format_results_for_llm(results_to_rerank)
 
@@ -231,29 +284,28 @@ class LLMService:
             response = self._call_llm(
                 model=self.reranking_model,
                 prompt=prompt,
-                temperature=0.2
+                temperature=0.2,
+                timeout=timeout
             )
 
             # Парсинг JSON ответа
             rankings = self._extract_json_from_response(response)
 
-            # Создаем RerankedResult объекты
-            reranked = []
+            # Оценки кандидатов (индекс в пределах списка)
+            scores = []
             for rank in rankings:
                 idx = rank.get("index", 0)
                 if 0 <= idx < len(results_to_rerank):
-                    reranked.append(RerankedResult(
-                        original_index=idx,
-                        new_score=float(rank.get("score", 0.5)),
-                        original_score=results_to_rerank[idx].get("score", 0.0),
-                        reasoning=rank.get("reasoning", ""),
-                        result=results_to_rerank[idx]
-                    ))
+                    scores.append({
+                        "index": idx,
+                        "score": float(rank.get("score", 0.5)),
+                        "reasoning": rank.get("reasoning", "")
+                    })
 
-            # Сортируем по новому score
-            reranked.sort(key=lambda x: x.new_score, reverse=True)
+            if self.cache and scores:
+                self.cache.put('rerank', cache_key, scores)
 
-            return reranked[:top_k]
+            return self._build_reranked(scores, results_to_rerank)[:top_k]
 
         except Exception as e:
             logger.error(f"Ошибка переранжирования результатов: {e}")
@@ -269,6 +321,39 @@ class LLMService:
                 for i, r in enumerate(results[:top_k])
             ]
 
+    @staticmethod
+    def _build_reranked(
+        scores: List[Dict[str, Any]],
+        results: List[Dict[str, Any]]
+    ) -> List[RerankedResult]:
+        """RerankedResult по оценкам LLM, отсортированные по новому score"""
+        reranked = [
+            RerankedResult(
+                original_index=entry["index"],
+                new_score=entry["score"],
+                original_score=results[entry["index"]].get("score", 0.0),
+                reasoning=entry["reasoning"],
+                result=results[entry["index"]]
+            )
+            for entry in scores
+        ]
+        reranked.sort(key=lambda x: x.new_score, reverse=True)
+        return reranked
+
+    def get_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        Статистика кеша intent/rerank
+
+        Returns:
+            Статистика LLMResultCache или None (кеш отключен)
+        """
+        return self.cache.get_stats() if self.cache else None
+
+    def clear_cache(self):
+        """Очистка кеша intent/rerank"""
+        if self.cache:
+            self.cache.clear()
+
     def generate_code_explanation(
         self,
         code: str,
@@ -314,7 +399,8 @@ class LLMService:
         model: str,
         prompt: str,
         temperature: float = 0.7,
-        max_tokens: int = 2048
+        max_tokens: int = 2048,
+        timeout: Optional[float] = None
     ) -> str:
         """
         Вызов LLM через Ollama API
@@ -324,6 +410,7 @@ class LLMService:
             prompt: Текст промпта
             temperature: Температура генерации
             max_tokens: Максимальное количество токенов
+            timeout: Таймаут HTTP запроса в секундах (None - self.timeout)
 
         Returns:
             Ответ модели
@@ -343,7 +430,7 @@ class LLMService:
         response = requests.post(
             url,
             json=payload,
-            timeout=self.timeout
+            timeout=self.timeout if timeout is None else timeout
         )
 
         if response.status_code == 200:
@@ -0,0 +1,340 @@
+"""
+Parse Cache Service
+Content-addressed cache of BSLParser results shared by all indexers
+
+Benefits:
+- Unchanged files are never parsed twice (any indexer, any run)
+- Key = SHA256 of file content + PARSER_VERSION (parser upgrade invalidates cache)
+- Compact binary format (zlib-compressed pickle of tuples, no module text inside)
+"""
+
+import os
+import sys
+import zlib
+import pickle
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.bsl_parser import (
+    BSLParser, BSLModule, BSLFunction, BSLVariable, PARSER_VERSION
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "cache" / "parsed"
+
+# Позиция общего текста модуля в состоянии BSLFunction - в кеш не пишется
+_SOURCE_INDEX = BSLFunction.__slots__.index('source')
+
+
+def _pack(module: BSLModule) -> bytes:
+    """
+    Сериализация результата разбора
+
+    Текст модуля не сохраняется: он восстанавливается из самого файла,
+    который все равно читается для вычисления хеша.
+    """
+    functions = []
+    for func in module.functions:
+        state = func.__getstate__()
+        functions.append(state[:_SOURCE_INDEX] + state[_SOURCE_INDEX + 1:])
+
+    variables = [(var.name, var.line_number) for var in module.variables]
+
+    return zlib.compress(
+        pickle.dumps((functions, variables), protocol=pickle.HIGHEST_PROTOCOL),
+        1
+    )
+
+
+def _unpack(payload: bytes) -> Tuple[list, list]:
+    """Десериализация результата разбора (кортежи состояния)"""
+    return pickle.loads(zlib.decompress(payload))
+
+
+def _build_module(
+    state: Tuple[list, list],
+    file_path: str,
+    module_type: str,
+    content: str,
+    content_hash: str
+) -> BSLModule:
+    """Сборка BSLModule из состояния кеша и текста файла"""
+    functions_state, variables_state = state
+
+    functions = []
+    for func_state in functions_state:
+        func = BSLFunction.__new__(BSLFunction)
+        func.__setstate__(
+            func_state[:_SOURCE_INDEX] + (content,) + func_state[_SOURCE_INDEX:]
+        )
+        functions.append(func)
+
+    return BSLModule(
+        file_path=file_path,
+        functions=functions,
+        variables=[BSLVariable(name, line) for name, line in variables_state],
+        module_type=module_type,
+        source=content,
+        content_hash=content_hash
+    )
+
+
+class ParseCache:
+    """
+    Content-addressed BSL parse cache
+
+    Architecture:
+    cache/parsed/
+    └── v<PARSER_VERSION>/
+        └── <hash[:2]>/<sha256>.bin (per-content parse results)
+
+    Features:
+    - Same content under different paths shares one entry
+    - Small in-memory LRU on top of disk (repeated parse of one file is free)
+    - Atomic writes (safe for process pools)
+    - Statistics tracking
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        parser: Optional[BSLParser] = None,
+        memory_entries: int = 256
+    ):
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.version_dir = self.cache_dir / f"v{PARSER_VERSION}"
+        self.version_dir.mkdir(parents=True, exist_ok=True)
+
+        self.parser = parser or BSLParser()
+        self.memory_entries = memory_entries
+        self._memory: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.stats = {
+            'hits': 0,
+            'memory_hits': 0,
+            'misses': 0,
+            'saves': 0,
+            'errors': 0
+        }
+
+        logger.info(f"ParseCache initialized: {self.version_dir}")
+
+    def _entry_path(self, content_hash: str) -> Path:
+        """Path of cache entry for content hash"""
+        return self.version_dir / content_hash[:2] / f"{content_hash}.bin"
+
+    @staticmethod
+    def _decode(raw: bytes) -> str:
+        """
+        Decode file bytes the same way BSLParser.parse_file reads them
+        (utf-8-sig + universal newlines)
+        """
+        content = raw.decode('utf-8-sig')
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+        return content
+
+    def _remember(self, content_hash: str, state: Tuple[list, list]):
+        """Put parse state to in-memory LRU"""
+        with self._lock:
+            self._memory[content_hash] = state
+            self._memory.move_to_end(content_hash)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _lookup(self, content_hash: str) -> Optional[Tuple[list, list]]:
+        """Get parse state from memory or disk"""
+        with self._lock:
+            state = self._memory.get(content_hash)
+            if state is not None:
+                self._memory.move_to_end(content_hash)
+                self.stats['hits'] += 1
+                self.stats['memory_hits'] += 1
+                return state
+
+        entry = self._entry_path(content_hash)
+        try:
+            with open(entry, 'rb') as f:
+                state = _unpack(f.read())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # Поврежденная запись - разбираем заново и перезаписываем
+            logger.warning(f"Corrupted parse cache entry {entry.name}: {e}")
+            self.stats['errors'] += 1
+            return None
+
+        self.stats['hits'] += 1
+        self._remember(content_hash, state)
+        return state
+
+    def _store(self, content_hash: str, module: BSLModule):
+        """Write parse result to disk atomically"""
+        entry = self._entry_path(content_hash)
+        tmp = entry.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+
+        try:
+            payload = _pack(module)
+            entry.parent.mkdir(exist_ok=True)
+            with open(tmp, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp, entry)
+
+            self.stats['saves'] += 1
+            self._remember(content_hash, _unpack(payload))
+
+        except Exception as e:
+            logger.error(f"Error caching parse result {content_hash}: {e}")
+            self.stats['errors'] += 1
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+
+    def parse_file(self, file_path: str) -> Optional[BSLModule]:
+        """
+        Parse BSL file, using cached result if content is unchanged
+
+        Args:
+            file_path: Path to BSL file
+
+        Returns:
+            BSLModule (with content_hash filled) or None on error
+        """
+        file_path = str(file_path)
+
+        try:
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            logger.error(f"Файл не найден: {file_path}")
+            return None
+        except Exception as e:
+            logger.error(f"Ошибка чтения {file_path}: {e}")
+            return None
+
+        content_hash = hashlib.sha256(raw).hexdigest()
+
+        try:
+            content = self._decode(raw)
+        except UnicodeDecodeError:
+            logger.error(f"Ошибка кодировки файла: {file_path}")
+            return None
+
+        module_type = self.parser._detect_module_type(file_path)
+
+        state = self._lookup(content_hash)
+        if state is not None:
+            logger.debug(f"Parse cache HIT: {file_path}")
+            return _build_module(state, file_path, module_type, content, content_hash)
+
+        self.stats['misses'] += 1
+        logger.debug(f"Parse cache MISS: {file_path}")
+
+        try:
+            module = self.parser.parse_content(content, file_path)
+        except Exception as e:
+            logger.error(f"Ошибка парсинга {file_path}: {e}")
+            return None
+
+        module.content_hash = content_hash
+        self._store(content_hash, module)
+        return module
+
+    def clear(self):
+        """Clear all cached parse results (all parser versions)"""
+        try:
+            for entry in self.cache_dir.rglob("*.bin"):
+                entry.unlink()
+
+            with self._lock:
+                self._memory.clear()
+
+            logger.info("Parse cache cleared")
+
+        except Exception as e:
+            logger.error(f"Error clearing parse cache: {e}")
+
+    def get_stats(self) -> Dict:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with statistics
+        """
+        total_requests = self.stats['hits'] + self.stats['misses']
+        hit_rate = (self.stats['hits'] / total_requests * 100) if total_requests > 0 else 0
+
+        return {
+            'hits': self.stats['hits'],
+            'memory_hits': self.stats['memory_hits'],
+            'misses': self.stats['misses'],
+            'saves': self.stats['saves'],
+            'errors': self.stats['errors'],
+            'total_requests': total_requests,
+            'hit_rate_percent': hit_rate,
+            'parser_version': PARSER_VERSION,
+            'cache_dir': str(self.version_dir),
+            'cache_size_mb': self._get_cache_size()
+        }
+
+    def _get_cache_size(self) -> float:
+        """Calculate cache size in MB (current parser version)"""
+        total_size = 0
+
+        try:
+            for entry in self.version_dir.rglob("*.bin"):
+                total_size += entry.stat().st_size
+
+            return total_size / (1024 * 1024)
+
+        except Exception as e:
+            logger.error(f"Error calculating parse cache size: {e}")
+            return 0.0
+
+    def print_stats(self):
+        """Print cache statistics"""
+        stats = self.get_stats()
+
+        print("\n" + "=" * 60)
+        print("PARSE CACHE STATISTICS")
+        print("=" * 60)
+        print(f"Total requests:  {stats['total_requests']}")
+        print(f"Cache hits:      {stats['hits']} (memory: {stats['memory_hits']})")
+        print(f"Cache misses:    {stats['misses']}")
+        print(f"Hit rate:        {stats['hit_rate_percent']:.1f}%")
+        print(f"New saves:       {stats['saves']}")
+        print(f"Parser version:  {stats['parser_version']}")
+        print(f"Cache size:      {stats['cache_size_mb']:.2f} MB")
+        print(f"Cache directory: {stats['cache_dir']}")
+        print("=" * 60 + "\n")
+
+
+# Singleton instance (one per process - pool workers get their own)
+_parse_cache: Optional[ParseCache] = None
+
+
+def get_parse_cache() -> ParseCache:
+    """
+    Get or create ParseCache singleton
+
+    Cache directory can be overridden with BSL_PARSE_CACHE_DIR env variable.
+
+    Returns:
+        ParseCache instance
+    """
+    global _parse_cache
+
+    if _parse_cache is None:
+        _parse_cache = ParseCache(cache_dir=os.getenv("BSL_PARSE_CACHE_DIR"))
+
+    return _parse_cache
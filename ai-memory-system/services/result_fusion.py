@@ -0,0 +1,161 @@
+"""
+Result Fusion - объединение результатов нескольких поисковых источников
+
+Оценки источников несопоставимы (косинусная близость Qdrant, эвристическая
+релевантность графового поиска), поэтому результаты объединяются по рангам:
+
+- rrf: Reciprocal Rank Fusion, score = sum(weight / (k + rank)) по источникам;
+- weighted: взвешенная сумма оценок, нормализованных min-max внутри источника.
+
+Итоговая оценка нормирована в 0..1 (1.0 - первое место во всех источниках
+для rrf). Ранги требуют сортировки каждого источника целиком (каждый
+кандидат получает вклад по своему месту); из объединенных кандидатов
+top_k лучших выбирается кучей, без сортировки всего объединения.
+"""
+
+import heapq
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+FUSION_METHODS = ('rrf', 'weighted')
+
+# Константа RRF: сглаживает разницу между первыми местами источника
+RRF_K = 60
+
+
+@dataclass
+class FusedResult:
+    """Объединенный результат"""
+    key: str
+    item: Any  # Результат первого источника, в котором найден ключ
+    score: float
+    sources: List[str] = field(default_factory=list)
+    source_scores: Dict[str, float] = field(default_factory=dict)  # Исходные оценки
+    ranks: Dict[str, int] = field(default_factory=dict)  # Ранг в источнике (с 1)
+    items: Dict[str, Any] = field(default_factory=dict)  # Результат каждого источника
+
+
+def normalize_scores(scores: List[float]) -> List[float]:
+    """
+    Min-max нормализация оценок источника
+
+    Args:
+        scores: Оценки результатов
+
+    Returns:
+        Оценки в 0..1 (все равные - 1.0)
+    """
+    if not scores:
+        return []
+    low, high = min(scores), max(scores)
+    if high - low < 1e-12:
+        return [1.0] * len(scores)
+    return [(score - low) / (high - low) for score in scores]
+
+
+class ResultFusion:
+    """
+    Объединение результатов источников с ограниченным top-k
+
+    Использование:
+        fusion = ResultFusion(method='rrf', weights={'semantic': 0.6, 'graph': 0.4})
+        fusion.add('semantic', semantic_results, key=lambda r: r.file_path, score=lambda r: r.score)
+        fusion.add('graph', graph_results, key=lambda r: r.file_path, score=lambda r: r.score)
+        top = fusion.top(10)   # List[FusedResult]
+    """
+
+    def __init__(self, method: str = 'rrf', weights: Optional[Dict[str, float]] = None, k: int = RRF_K):
+        """
+        Args:
+            method: rrf или weighted
+            weights: Вес источника (по умолчанию 1.0)
+            k: Константа RRF
+        """
+        if method not in FUSION_METHODS:
+            raise ValueError(f"Unknown fusion method: {method}")
+
+        self.method = method
+        self.weights = weights or {}
+        self.k = k
+        self._results: Dict[str, FusedResult] = {}
+        self._scores: Dict[str, float] = {}
+        self._sources: List[str] = []
+
+    def add(
+        self,
+        source: str,
+        results: Iterable[Any],
+        key: Callable[[Any], str],
+        score: Callable[[Any], float]
+    ):
+        """
+        Добавление результатов источника
+
+        Args:
+            source: Имя источника
+            results: Результаты (в любом порядке)
+            key: Ключ дедупликации (обычно file_path)
+            score: Оценка результата в источнике
+        """
+        # Один результат на ключ - с лучшей оценкой источника
+        best: Dict[str, tuple] = {}
+        for item in results:
+            item_key = key(item)
+            if not item_key:
+                continue
+            item_score = float(score(item) or 0.0)
+            if item_key not in best or item_score > best[item_key][1]:
+                best[item_key] = (item, item_score)
+
+        ranked = sorted(best.items(), key=lambda entry: entry[1][1], reverse=True)
+        if not ranked:
+            return
+
+        weight = self.weights.get(source, 1.0)
+        if self.method == 'rrf':
+            contributions = [weight / (self.k + rank) for rank in range(1, len(ranked) + 1)]
+        else:
+            contributions = [
+                weight * value for value in normalize_scores([entry[1][1] for entry in ranked])
+            ]
+
+        self._sources.append(source)
+        for rank, ((item_key, (item, item_score)), contribution) in enumerate(zip(ranked, contributions), 1):
+            fused = self._results.get(item_key)
+            if fused is None:
+                fused = self._results[item_key] = FusedResult(key=item_key, item=item, score=0.0)
+            self._scores[item_key] = self._scores.get(item_key, 0.0) + contribution
+            fused.sources.append(source)
+            fused.source_scores[source] = item_score
+            fused.ranks[source] = rank
+            fused.items[source] = item
+
+    def _max_score(self) -> float:
+        """Оценка результата, первого во всех источниках (для нормировки)"""
+        total = sum(self.weights.get(source, 1.0) for source in self._sources)
+        if self.method == 'rrf':
+            total /= self.k + 1
+        return total or 1.0
+
+    def top(self, top_k: Optional[int] = None) -> List[FusedResult]:
+        """
+        Лучшие объединенные результаты
+
+        Args:
+            top_k: Количество результатов (None - все)
+
+        Returns:
+            Результаты по убыванию оценки (0..1)
+        """
+        scale = self._max_score()
+        for item_key, fused in self._results.items():
+            fused.score = round(self._scores[item_key] / scale, 6)
+
+        # При равенстве - порядок первого появления (стабильно при добавлении источников)
+        order = {item_key: i for i, item_key in enumerate(self._results)}
+        sort_key = lambda fused: (fused.score, -order[fused.key])
+
+        results = self._results.values()
+        if top_k is None or top_k >= len(self._results):
+            return sorted(results, key=sort_key, reverse=True)
+        return heapq.nlargest(top_k, results, key=sort_key)
@@ -0,0 +1,119 @@
+"""
+Search Budget - бюджет времени поискового запроса
+
+Таймауты клиентов Ollama рассчитаны на индексацию (90-180 с), поэтому
+один медленный вызов может задержать интерактивный поиск на минуты.
+Запрос получает общий дедлайн и бюджет на каждую стадию:
+
+    embed   - эмбеддинг запроса (Ollama)
+    vector  - поиск в Qdrant
+    graph   - запросы к Neo4j
+    intent  - классификация намерения (LLM)
+    rerank  - LLM re-ranking
+
+Стадия ограничена min(бюджет стадии, остаток дедлайна). Стадия без
+остатка времени пропускается, превысившая бюджет - прерывается
+(StageTimeout); вызывающий код возвращает лучший частичный результат,
+а в degraded записывается, какие стадии деградировали.
+"""
+
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SEARCH_STAGES = ('embed', 'vector', 'graph', 'intent', 'rerank')
+
+# Общий бюджет запроса по умолчанию
+DEFAULT_SEARCH_TIMEOUT_MS = 30000
+
+DEFAULT_STAGE_BUDGETS_MS = {
+    'embed': 5000,
+    'vector': 3000,
+    'graph': 5000,
+    'intent': 5000,
+    'rerank': 20000
+}
+
+
+class StageTimeout(TimeoutError):
+    """Стадия пропущена или прервана по бюджету времени"""
+
+    def __init__(self, stage: str, reason: str):
+        super().__init__(f"Search stage '{stage}' {reason}")
+        self.stage = stage
+        self.reason = reason
+
+
+class SearchBudget:
+    """
+    Дедлайн запроса и бюджеты стадий
+
+    Использование:
+        budget = SearchBudget(timeout_ms=10000)
+        embedding = await budget.run('embed', lambda: loop.run_in_executor(None, embed, query))
+        budget.degraded   # {'rerank': 'timeout', ...}
+    """
+
+    def __init__(
+        self,
+        timeout_ms: Optional[int] = DEFAULT_SEARCH_TIMEOUT_MS,
+        stage_budgets_ms: Optional[Dict[str, int]] = None
+    ):
+        """
+        Args:
+            timeout_ms: Общий бюджет запроса (None - без дедлайна)
+            stage_budgets_ms: Бюджеты стадий (по умолчанию DEFAULT_STAGE_BUDGETS_MS)
+        """
+        self.started = time.monotonic()
+        self.deadline = self.started + timeout_ms / 1000 if timeout_ms is not None else None
+        self.stage_budgets_ms = {**DEFAULT_STAGE_BUDGETS_MS, **(stage_budgets_ms or {})}
+        self.degraded: Dict[str, str] = {}
+
+    def remaining_ms(self) -> Optional[int]:
+        """Остаток дедлайна (None - без дедлайна)"""
+        if self.deadline is None:
+            return None
+        return max(int((self.deadline - time.monotonic()) * 1000), 0)
+
+    def stage_timeout(self, stage: str) -> Optional[float]:
+        """Таймаут стадии в секундах: бюджет стадии, но не дальше дедлайна"""
+        budget = self.stage_budgets_ms.get(stage)
+        timeouts = [budget / 1000] if budget is not None else []
+        if self.deadline is not None:
+            timeouts.append(self.deadline - time.monotonic())
+        return min(timeouts) if timeouts else None
+
+    def mark(self, stage: str, reason: str):
+        """Отметка деградации стадии (первая причина сохраняется)"""
+        self.degraded.setdefault(stage, reason)
+
+    async def run(self, stage: str, start: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Выполнение стадии в пределах бюджета
+
+        Args:
+            stage: Имя стадии (SEARCH_STAGES)
+            start: Функция, запускающая стадию (не вызывается, если времени нет)
+
+        Returns:
+            Результат стадии
+
+        Raises:
+            StageTimeout: Стадия пропущена (skipped) или прервана (timeout)
+        """
+        timeout = self.stage_timeout(stage)
+        if timeout is not None and timeout <= 0:
+            self.mark(stage, 'skipped')
+            raise StageTimeout(stage, 'skipped')
+
+        try:
+            return await asyncio.wait_for(start(), timeout)
+        except StageTimeout:
+            raise
+        except asyncio.TimeoutError:
+            self.mark(stage, 'timeout')
+            logger.warning(f"Стадия поиска '{stage}' прервана по бюджету ({timeout * 1000:.0f}ms)")
+            raise StageTimeout(stage, 'timeout')
@@ -0,0 +1,111 @@
+"""
+Singleflight - объединение одинаковых одновременных запросов
+
+Несколько сессий (MCP клиенты, веб-интерфейс) часто отправляют один и тот
+же запрос одновременно. Первый запрос с ключом выполняет вычисление
+(embedding, Qdrant, LLM re-ranking), остальные ждут тот же результат.
+Завершенные вычисления не хранятся - это не кеш, а только дедупликация
+выполняющихся запросов.
+"""
+
+import copy
+import json
+import asyncio
+import hashlib
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+def request_key(query: str, **params) -> str:
+    """
+    Ключ запроса: нормализованный текст и параметры (фильтры, лимиты)
+
+    Args:
+        query: Поисковый запрос
+        **params: Параметры, влияющие на результат
+
+    Returns:
+        SHA-256 ключ
+    """
+    normalized = " ".join(query.lower().split())
+    key_string = f"{normalized}:{json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)}"
+    return hashlib.sha256(key_string.encode('utf-8')).hexdigest()
+
+
+class SingleFlight:
+    """
+    Одно выполнение на ключ для одновременных запросов
+
+    Использование:
+        flight = SingleFlight("search")
+        result = await flight.do(request_key(query, limit=10), lambda: compute(query))
+    """
+
+    def __init__(self, name: str, copy_results: bool = True):
+        """
+        Args:
+            name: Имя (для логов и статистики)
+            copy_results: Отдавать каждому вызывающему копию результата
+                (вызывающие изменяют результаты, например scores)
+        """
+        self.name = name
+        self.copy_results = copy_results
+        self._in_flight: Dict[str, asyncio.Task] = {}
+
+        self.stats = {
+            'calls': 0,
+            'executions': 0,
+            'coalesced': 0,
+            'errors': 0
+        }
+
+    async def do(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Результат вычисления для ключа
+
+        Args:
+            key: Ключ запроса (request_key)
+            compute: Функция, создающая корутину вычисления
+
+        Returns:
+            Результат (общий для одновременных вызовов с этим ключом)
+        """
+        self.stats['calls'] += 1
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.stats['coalesced'] += 1
+            logger.debug(f"Singleflight {self.name}: joined in-flight request {key[:12]}")
+        else:
+            self.stats['executions'] += 1
+            task = asyncio.ensure_future(compute())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+
+        # Отмена одного вызывающего не отменяет общее вычисление
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result) if self.copy_results else result
+
+    def _finish(self, key: str, task: asyncio.Task):
+        """Удаление завершенного вычисления"""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled() and task.exception() is not None:
+            self.stats['errors'] += 1
+
+    def get_stats(self) -> Dict:
+        """
+        Статистика
+
+        Returns:
+            Вызовы, выполнения, присоединенные к выполняющимся, ошибки
+        """
+        stats = dict(self.stats)
+        stats.update({
+            'name': self.name,
+            'in_flight': len(self._in_flight),
+            'coalesce_rate': round(self.stats['coalesced'] / self.stats['calls'], 3) if self.stats['calls'] else 0.0
+        })
+        return stats
@@ -0,0 +1,9 @@
+"""
+Общие настройки тестов: корень ai-memory-system в sys.path
+(модули импортируются как services.*, utils.*, scripts.*)
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
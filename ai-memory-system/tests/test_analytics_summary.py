@@ -0,0 +1,81 @@
+"""
+Тесты AnalyticsSummaryStore: фоновое обновление и пауза после ошибки расчета
+"""
+
+import time
+
+import pytest
+
+from services import analytics_summary as summary_module
+from services.analytics_summary import AnalyticsSummaryStore
+
+
+class FlakyCompute:
+    """Расчет сводки, который падает, пока failing=True"""
+
+    def __init__(self):
+        self.calls = 0
+        self.failing = False
+
+    def __call__(self):
+        self.calls += 1
+        if self.failing:
+            raise TimeoutError("summary query timed out")
+        return {'cycles': self.calls}
+
+
+def wait_refresh(store):
+    deadline = time.time() + 5
+    while store._refreshing is not None and time.time() < deadline:
+        time.sleep(0.01)
+    assert store._refreshing is None
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    state = {'version': "1"}
+    monkeypatch.setattr(summary_module, "get_graph_version", lambda driver: state['version'])
+    return state
+
+
+def test_failed_refresh_waits_for_retry_interval(tmp_path, graph):
+    compute = FlakyCompute()
+    store = AnalyticsSummaryStore(None, compute, cache_dir=str(tmp_path), check_interval=0, retry_interval=0.3)
+
+    assert store.get()['meta']['stale'] is False
+    assert compute.calls == 1
+
+    # Граф изменился, расчет новой версии падает
+    graph['version'] = "2"
+    compute.failing = True
+    assert store.get()['meta']['stale'] is True
+    wait_refresh(store)
+    assert compute.calls == 2
+
+    # Следующие запросы отдают старую сводку без нового расчета
+    for _ in range(5):
+        summary = store.get()
+        wait_refresh(store)
+        assert summary['meta']['graph_version'] == "1"
+    assert compute.calls == 2
+    assert store.get_stats()['failed_version'] == "2"
+
+    # После паузы - повтор
+    time.sleep(0.3)
+    compute.failing = False
+    store.get()
+    wait_refresh(store)
+    assert compute.calls == 3
+    assert store.get()['meta']['graph_version'] == "2"
+    assert store.get_stats()['failed_version'] is None
+
+
+def test_first_computation_failure_is_not_retried_per_request(tmp_path, graph):
+    compute = FlakyCompute()
+    compute.failing = True
+    store = AnalyticsSummaryStore(None, compute, cache_dir=str(tmp_path), check_interval=0, retry_interval=60)
+
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            store.get()
+    assert compute.calls == 1
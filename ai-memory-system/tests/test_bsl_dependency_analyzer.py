@@ -0,0 +1,83 @@
+"""
+Тесты параллельного analyze_project: поток записи в Neo4j
+"""
+
+import threading
+
+import pytest
+
+pytest.importorskip("neo4j")
+
+from scripts.neo4j import bsl_dependency_analyzer as analyzer_module
+from scripts.neo4j.bsl_dependency_analyzer import BSLDependencyAnalyzer
+
+
+class FailingFlushLoader:
+    """Пакетный загрузчик, последний flush которого падает"""
+
+    def __init__(self, driver, batch_size=5000):
+        self.modules = []
+
+    def ensure_schema(self):
+        pass
+
+    def add_module(self, module_data, project_id):
+        self.modules.append(module_data)
+
+    def flush(self):
+        raise RuntimeError("last UNWIND batch failed")
+
+
+class RecordingLoader(FailingFlushLoader):
+    """Пакетный загрузчик без Neo4j"""
+
+    def flush(self):
+        pass
+
+    def get_stats(self):
+        return {'modules': len(self.modules), 'functions': 0, 'procedures': 0, 'variables': 0,
+                'calls': 0, 'transactions': 1, 'write_time_s': 0.0}
+
+
+def make_analyzer(modules):
+    """Анализатор без Neo4j и парсера: анализ отдает готовые модули"""
+    analyzer = BSLDependencyAnalyzer.__new__(BSLDependencyAnalyzer)
+    analyzer.driver = None
+    analyzer.symbol_table = None
+    analyzer.create_or_get_project = lambda name, path: "project-1"
+    analyzer.build_symbol_table = lambda files, root: None
+    analyzer._analyze_files = lambda files, root, workers=None: iter(modules)
+    return analyzer
+
+
+def test_failed_final_flush_raises_instead_of_hanging(tmp_path, monkeypatch):
+    monkeypatch.setattr(analyzer_module, "BSLGraphBulkLoader", FailingFlushLoader)
+    analyzer = make_analyzer([{"module": {"id": f"m{i}"}} for i in range(3)])
+
+    errors = []
+
+    def run():
+        try:
+            analyzer.analyze_project(tmp_path, project_name="P", workers=1)
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout=5)
+
+    assert not thread.is_alive(), "analyze_project hung after a failed flush"
+    assert len(errors) == 1
+    assert str(errors[0]) == "last UNWIND batch failed"
+
+
+def test_placeholders_removed_before_version_bump(tmp_path, monkeypatch):
+    steps = []
+    monkeypatch.setattr(analyzer_module, "BSLGraphBulkLoader", RecordingLoader)
+    monkeypatch.setattr(analyzer_module, "delete_placeholder_methods", lambda driver: steps.append("cleanup"))
+    monkeypatch.setattr(analyzer_module, "bump_graph_version", lambda driver: steps.append("bump"))
+    analyzer = make_analyzer([{"module": {"id": "m0"}}])
+
+    analyzer.analyze_project(tmp_path, project_name="P", max_files=1, workers=1)
+
+    assert steps == ["cleanup", "bump"]
@@ -0,0 +1,56 @@
+"""
+Тесты CSV выгрузки графа для neo4j-admin
+"""
+
+import csv
+
+from scripts.neo4j.bsl_graph_export import ARRAY_DELIMITER, BSLGraphCsvExporter, POST_IMPORT_FILE
+
+MODULE_DATA = {
+    'module': {
+        'id': 'module-1', 'name': 'Module', 'file_path': 'CommonModules/X/Ext/Module.bsl',
+        'path_key': 'commonmodules/x/ext/module.bsl', 'module_type': 'CommonModule',
+        'functions_count': 1, 'procedures_count': 1, 'variables_count': 0, 'lines_count': 9,
+        'file_size': 120, 'content_hash': 'abc', 'indexed_at': '2026-01-01T00:00:00', 'is_export': False
+    },
+    'functions': [{
+        'id': 'function-1', 'name': 'Сумма', 'signature': 'Функция Сумма(А, Б = ";")',
+        'parameters': ['А', 'Б = ";"'], 'is_export': True, 'line_start': 1, 'line_end': 3,
+        'calls': [{'target_id': 'procedure-1', 'target_label': 'Procedure', 'call_count': 2,
+                   'line_numbers': [2, 3]}]
+    }],
+    'procedures': [{
+        'id': 'procedure-1', 'name': 'Обновить', 'signature': 'Процедура Обновить()',
+        'parameters': [], 'is_export': False, 'line_start': 5, 'line_end': 9, 'calls': []
+    }],
+    'variables': []
+}
+
+
+def read_rows(path):
+    with open(path, encoding='utf-8', newline='') as f:
+        return list(csv.reader(f))[1:]
+
+
+def test_arrays_and_post_import_script(tmp_path):
+    exporter = BSLGraphCsvExporter(str(tmp_path), indexed_at='2026-01-01T00:00:00')
+    exporter.add_project('project-1', 'P', '/src')
+    exporter.add_module(MODULE_DATA, 'project-1')
+    exporter.close()
+
+    function, = read_rows(tmp_path / 'nodes_function.csv')
+    procedure, = read_rows(tmp_path / 'nodes_procedure.csv')
+    call, = read_rows(tmp_path / 'rels_calls.csv')
+    assert function[3] == ARRAY_DELIMITER.join(['А', 'Б = ";"'])
+    assert call[3] == ARRAY_DELIMITER.join(['2', '3'])
+
+    # Пустой массив neo4j-admin импортирует как отсутствующее свойство -
+    # post_import.cypher выравнивает граф с пакетной загрузкой
+    assert procedure[3] == ''
+    statements = (tmp_path / POST_IMPORT_FILE).read_text(encoding='utf-8').splitlines()
+    assert "MATCH (n:Procedure) WHERE n.parameters IS NULL SET n.parameters = [];" in statements
+    assert "MATCH (n:Function) WHERE n.parameters IS NULL SET n.parameters = [];" in statements
+    assert any("module_path_key_idx" in statement for statement in statements)
+    assert exporter.post_import_command('graph') == (
+        f"cypher-shell -d graph -f {tmp_path.resolve() / POST_IMPORT_FILE}"
+    )
@@ -0,0 +1,131 @@
+"""
+Тесты однопроходного BSLParser (BSLLexer), смещений тела и кеша разбора
+"""
+
+import pickle
+
+import pytest
+
+from services import parse_cache as parse_cache_module
+from services.parse_cache import ParseCache
+from utils.bsl_parser import BSLParser, PARSER_VERSION
+
+MODULE_TEXT = '''#Область ПрограммныйИнтерфейс
+
+// Возвращает приветствие.
+//
+// Параметры:
+//   Имя - Строка
+&НаСервере
+Функция Привет(Имя, Разделитель = ", (", Флаг = Истина) Экспорт
+	Текст = "КонецФункции"; // КонецФункции в комментарии
+	Возврат Имя + Разделитель + Текст;
+КонецФункции
+
+#КонецОбласти
+
+&НаКлиенте
+Процедура Обработать()
+	Перем Локальная;
+	Сообщить("КонецПроцедуры
+	|КонецПроцедуры");
+КонецПроцедуры
+'''
+
+
+@pytest.fixture(scope="module")
+def module():
+    return BSLParser().parse_content(MODULE_TEXT, "CommonModules/Приветствия/Ext/Module.bsl")
+
+
+def test_methods_found(module):
+    assert [(f.name, f.type) for f in module.functions] == [
+        ("Привет", "Функция"),
+        ("Обработать", "Процедура")
+    ]
+    assert module.module_type == "CommonModule"
+
+
+def test_method_end_inside_strings_and_comments(module):
+    greet, process = module.functions
+
+    assert (greet.start_line, greet.end_line) == (8, 11)
+    assert greet.body == (
+        '\tТекст = "КонецФункции"; // КонецФункции в комментарии\n'
+        '\tВозврат Имя + Разделитель + Текст;'
+    )
+
+    # Многострочная строка с КонецПроцедуры не заканчивает процедуру
+    assert (process.start_line, process.end_line) == (16, 20)
+    assert process.body.endswith('|КонецПроцедуры");')
+
+
+def test_regions_and_directives(module):
+    greet, process = module.functions
+
+    assert greet.region == "ПрограммныйИнтерфейс"
+    assert greet.directives == ["&НаСервере"]
+    assert process.region is None
+    assert process.directives == ["&НаКлиенте"]
+
+
+def test_doc_comment(module):
+    greet, process = module.functions
+
+    assert greet.doc_comment == "Возвращает приветствие.\n\nПараметры:\nИмя - Строка"
+    assert process.doc_comment is None
+
+
+def test_default_string_parameter_with_comma_and_parenthesis(module):
+    greet, process = module.functions
+
+    assert greet.parameters == ["Имя", 'Разделитель = ", ("', "Флаг = Истина"]
+    assert greet.is_export
+    assert process.parameters == []
+    assert not process.is_export
+
+
+def test_variables(module):
+    assert [(v.name, v.line_number) for v in module.variables] == [("Локальная", 17)]
+
+
+def test_body_offsets_reference_module_source(module):
+    for func in module.functions:
+        assert func.source is module.source
+        assert 0 <= func.body_start <= func.body_end <= len(module.source)
+        assert func.body == MODULE_TEXT[func.body_start:func.body_end]
+
+
+def test_pickle_shares_module_source(module):
+    restored = pickle.loads(pickle.dumps(module))
+
+    assert restored.functions == module.functions
+    assert all(func.source is restored.source for func in restored.functions)
+    assert [func.body for func in restored.functions] == [func.body for func in module.functions]
+
+
+def test_parse_cache_round_trip(tmp_path, monkeypatch):
+    bsl_file = tmp_path / "CommonModules" / "Приветствия" / "Ext" / "Module.bsl"
+    bsl_file.parent.mkdir(parents=True)
+    bsl_file.write_text(MODULE_TEXT, encoding="utf-8-sig")
+    cache_dir = tmp_path / "parsed"
+
+    cache = ParseCache(cache_dir=str(cache_dir))
+    parsed = cache.parse_file(str(bsl_file))
+    reopened = ParseCache(cache_dir=str(cache_dir))
+    cached = reopened.parse_file(str(bsl_file))
+
+    assert cache.get_stats()["misses"] == 1
+    assert reopened.get_stats()["hits"] == 1
+    assert (cache_dir / f"v{PARSER_VERSION}").is_dir()
+    assert cached.functions == parsed.functions
+    assert [func.body for func in cached.functions] == [func.body for func in parsed.functions]
+    assert [(v.name, v.line_number) for v in cached.variables] == [("Локальная", 17)]
+    assert cached.content_hash == parsed.content_hash
+
+    # Новая версия парсера не видит записи старой
+    monkeypatch.setattr(parse_cache_module, "PARSER_VERSION", f"{PARSER_VERSION}-next")
+    upgraded = ParseCache(cache_dir=str(cache_dir))
+    upgraded.parse_file(str(bsl_file))
+    assert upgraded.get_stats()["hits"] == 0
+    assert upgraded.get_stats()["misses"] == 1
@@ -0,0 +1,75 @@
+"""
+Тесты BSLSearchService: таймаут HTTP вызовов Ollama по бюджету стадии
+и пулы бэкендов для стадий ContextManager
+"""
+
+import asyncio
+import threading
+
+from services.bsl_search_service import BSLSearchService, _current_budget
+from services.search_budget import SearchBudget
+
+
+class FakeLLM:
+    """LLM, запоминающий переданные таймауты"""
+
+    def __init__(self):
+        self.timeouts = []
+
+    def classify_intent(self, query, timeout=None):
+        self.timeouts.append(timeout)
+        return query
+
+
+def run_stage(service, budget, *args):
+    async def run():
+        token = _current_budget.set(budget)
+        try:
+            return await service.run_blocking("intent", *args)
+        finally:
+            _current_budget.reset(token)
+
+    return asyncio.run(run())
+
+
+def test_remaining_stage_budget_passed_as_http_timeout():
+    llm = FakeLLM()
+    service = BSLSearchService(None, None, None, llm)
+    budget = SearchBudget(timeout_ms=10000, stage_budgets_ms={'intent': 2000})
+
+    assert run_stage(service, budget, llm.classify_intent, "запрос") == "запрос"
+    timeout, = llm.timeouts
+    assert 0 < timeout <= 2
+
+    # Вне поискового запроса - таймаут клиента
+    assert asyncio.run(service.run_blocking("intent", llm.classify_intent, "запрос")) == "запрос"
+    assert llm.timeouts[-1] is None
+
+    # Бюджет другого запроса (ContextManager) - явным аргументом
+    assert asyncio.run(service.run_blocking("intent", llm.classify_intent, "запрос", budget=budget)) == "запрос"
+    assert 0 < llm.timeouts[-1] <= 2
+    service.close()
+
+
+
+def test_context_manager_stages_use_backend_pools():
+    from services.context_manager import ContextManager, ContextRequest
+
+    class ThreadLLM(FakeLLM):
+        def classify_intent(self, query, timeout=None):
+            self.timeouts.append(timeout)
+            self.thread = threading.current_thread().name
+            raise RuntimeError("ответ не разобран")
+
+    llm = ThreadLLM()
+    service = BSLSearchService(None, None, None, llm)
+    manager = ContextManager(llm, service, None)
+    budget = SearchBudget(timeout_ms=10000, stage_budgets_ms={'intent': 2000})
+
+    intent = asyncio.run(manager._analyze_intent(ContextRequest(query="запрос"), budget))
+
+    assert intent["intent"] == "general_search"
+    assert llm.thread.startswith("bsl-search-llm")
+    assert 0 < llm.timeouts[0] <= 2
+    assert service.get_stats()["backends"]["llm"]["calls"] == 1
+    service.close()
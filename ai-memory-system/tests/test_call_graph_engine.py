@@ -0,0 +1,239 @@
+"""
+Тесты CallGraphEngine: компоненты сильной связности, циклы и транзитивное
+влияние (ImpactIndex) на небольшом графе против перебора в ширину
+"""
+
+import time
+from collections import deque
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from services.call_graph_engine import (
+    CallGraphEngine,
+    CallGraphSnapshot,
+    strongly_connected_components
+)
+from services.graph_impact import ImpactIndex
+
+MODULES = {
+    'a': "CommonModules/A/Ext/Module.bsl",
+    'b': "CommonModules/B/Ext/Module.bsl",
+    'c': "CommonModules/C/Ext/Module.bsl",
+    't': "CommonModules/T/Ext/Module.bsl"
+}
+
+# Метод -> модуль (None - метод вне модулей)
+METHODS = {
+    'a0': 'a', 'a1': 'a', 'a2': 'a',
+    'b0': 'b', 'b1': 'b', 'r': 'b',
+    'c0': 'c', 'c1': 'c', 'c2': 'c', 'c3': 'c', 'c4': 'c',
+    't0': 't', 't1': 't',
+    'ext': None
+}
+
+CALLS = [
+    # Цикл из трех методов
+    ('a0', 'a1'), ('a1', 'a2'), ('a2', 'a0'),
+    # Взаимная рекурсия
+    ('b0', 'b1'), ('b1', 'b0'),
+    # Прямая рекурсия
+    ('r', 'r'),
+    # Кольцо из пяти методов с хордой
+    ('c0', 'c1'), ('c1', 'c2'), ('c2', 'c3'), ('c3', 'c4'), ('c4', 'c0'), ('c0', 'c2'),
+    # Ациклические связи между компонентами
+    ('t0', 'a0'), ('a2', 'b0'), ('b1', 'c0'), ('c4', 't1'), ('t1', 'ext'), ('r', 'b0')
+]
+
+NAMES = list(METHODS)
+INDEX = {name: i for i, name in enumerate(NAMES)}
+
+
+def make_snapshot(methods=METHODS, calls=CALLS):
+    return CallGraphSnapshot(
+        "1",
+        [
+            {
+                'id': name,
+                'name': name,
+                'label': 'Procedure',
+                'is_export': True,
+                'module_id': module
+            }
+            for name, module in methods.items()
+        ],
+        [{'id': key, 'name': key.upper(), 'file_path': path} for key, path in MODULES.items()],
+        [{'source': s, 'target': t, 'call_count': 1} for s, t in calls]
+    )
+
+
+def make_engine(snapshot):
+    engine = CallGraphEngine(None, check_interval=1e9)
+    engine._snapshot = snapshot
+    engine._checked_at = time.time()
+    return engine
+
+
+def bfs(sources, direction):
+    """Глубина каждого метода, достижимого из sources (перебор по списку ребер)"""
+    edges = CALLS if direction == 'callees' else [(t, s) for s, t in CALLS]
+    distance = {source: 0 for source in sources}
+    queue = deque(sources)
+    while queue:
+        v = queue.popleft()
+        for s, t in edges:
+            if s == v and t not in distance:
+                distance[t] = distance[v] + 1
+                queue.append(t)
+    return {name: d for name, d in distance.items() if name not in sources}
+
+
+@pytest.fixture(scope="module")
+def snapshot():
+    return make_snapshot()
+
+
+def test_strongly_connected_components_membership(snapshot):
+    component_of, components = snapshot.components()
+
+    groups = sorted(sorted(NAMES[i] for i in component) for component in components)
+    assert groups == sorted([
+        ['a0', 'a1', 'a2'],
+        ['b0', 'b1'],
+        ['c0', 'c1', 'c2', 'c3', 'c4'],
+        ['r'], ['t0'], ['t1'], ['ext']
+    ])
+    for number, component in enumerate(components):
+        assert all(component_of[i] == number for i in component)
+
+
+def test_components_in_reverse_topological_order(snapshot):
+    component_of = snapshot.components()[0]
+
+    for s, t in CALLS:
+        assert component_of[INDEX[s]] >= component_of[INDEX[t]]
+
+
+def test_deep_chain_without_recursion_limit():
+    n = 50000
+    indptr = list(range(n)) + [n - 1]
+    indices = list(range(1, n))
+
+    component_of, components = strongly_connected_components(indptr, indices)
+
+    assert len(components) == n
+    assert component_of[0] == n - 1
+
+
+def test_cycles_and_severity(snapshot):
+    records = make_engine(snapshot).cycles()
+
+    assert [r['component'] for r in records] == [
+        ['c0', 'c1', 'c2', 'c3', 'c4'],
+        ['a0', 'a1', 'a2'],
+        ['b0', 'b1']
+    ]
+    ring, triangle, pair = records
+
+    # Через c0 (больше всего вызовов) кратчайший цикл идет по хорде
+    assert ring['cycle_path'] == ['c0', 'c2', 'c3', 'c4', 'c0']
+    assert ring['cycle_length'] == 4
+    assert ring['modules'] == [MODULES['c']]
+    assert triangle['cycle_length'] == 3
+    assert set(triangle['cycle_path']) == {'a0', 'a1', 'a2'}
+    assert pair['cycle_length'] == 2
+
+    # Прямая рекурсия - только при min_length=1
+    recursive = make_engine(snapshot).cycles(min_length=1)
+    assert recursive[-1]['component'] == ['r']
+    assert recursive[-1]['cycle_path'] == ['r', 'r']
+    assert [r['component_size'] for r in make_engine(snapshot).cycles(max_length=3)] == [3, 2]
+
+
+def test_circular_dependencies_severity(snapshot):
+    pytest.importorskip("neo4j")
+    from services.graph_analytics import GraphAnalyzer
+
+    analyzer = GraphAnalyzer.__new__(GraphAnalyzer)
+    analyzer.engine = make_engine(snapshot)
+
+    cycles = analyzer.find_circular_dependencies()
+
+    assert [(c.component_size, c.severity) for c in cycles] == [
+        (5, "critical"),
+        (3, "warning"),
+        (2, "info")
+    ]
+
+
+@pytest.mark.parametrize("direction", ["callers", "callees"])
+@pytest.mark.parametrize("sources", [["a0"], ["b1"], ["c2", "t1"], ["r"], ["ext"]])
+def test_unlimited_impact_matches_bfs(snapshot, sources, direction):
+    index = ImpactIndex(snapshot)
+
+    methods, distances = index.reachable([INDEX[s] for s in sources], direction=direction)
+
+    assert distances is None
+    assert sorted(NAMES[i] for i in methods) == sorted(bfs(sources, direction))
+
+
+@pytest.mark.parametrize("direction", ["callers", "callees"])
+@pytest.mark.parametrize("depth", [0, 1, 2, 3, 10])
+@pytest.mark.parametrize("sources", [["a0"], ["c0"], ["b0", "t1"]])
+def test_depth_limited_impact_matches_bfs(snapshot, sources, direction, depth):
+    index = ImpactIndex(snapshot)
+
+    methods, distances = index.reachable([INDEX[s] for s in sources], direction=direction, depth=depth)
+
+    expected = {name: d for name, d in bfs(sources, direction).items() if d <= depth}
+    assert dict(zip((NAMES[i] for i in methods), distances.tolist())) == expected
+    assert len(methods) == len(expected)
+
+
+def test_engine_impact_by_module(snapshot):
+    result = make_engine(snapshot).impact(MODULES['b'], direction='callers', depth=2)
+
+    expected = bfs(['b0', 'b1', 'r'], 'callers')
+    expected = {name: d for name, d in expected.items() if d <= 2}
+    assert {m['name']: m['distance'] for m in result['methods']} == expected
+    assert [m['distance'] for m in result['methods']] == sorted(expected.values())
+    assert result['modules'] == [{'file_path': MODULES['a'], 'methods': 2}]
+
+    callees = make_engine(snapshot).impact(MODULES['b'], method='R', direction='callees', limit=None)
+    assert sorted(m['name'] for m in callees['methods']) == sorted(bfs(['r'], 'callees'))
+    assert callees['methods_count'] == len(callees['methods'])
+    assert make_engine(snapshot).impact("CommonModules/Missing/Ext/Module.bsl") is None
+    assert make_engine(snapshot).impact(MODULES['b'], method='missing') is None
+
+
+def test_module_found_by_absolute_windows_path(snapshot):
+    engine = make_engine(snapshot)
+    path = "C:\\Work\\CommonModules\\B\\Ext\\Module.bsl"
+
+    assert snapshot.find_module(path) == 1
+    assert engine.impact(path, direction='callers') == engine.impact(MODULES['b'], direction='callers')
+    assert engine.module_community(path) == [MODULES['a']]
+
+    # Самый длинный совпавший path_key
+    nested = CallGraphSnapshot(None, [], [
+        {'id': 'short', 'name': 'B', 'file_path': "CommonModules/B/Ext/Module.bsl"},
+        {'id': 'long', 'name': 'B', 'file_path': "Work/CommonModules/B/Ext/Module.bsl"}
+    ], [])
+    assert nested.find_module(path) == 1
+    assert nested.find_module("D:\\Other\\CommonModules\\B\\Ext\\Module.bsl") == 0
+
+
+def test_empty_graph():
+    empty = CallGraphSnapshot(None, [], [], [])
+    engine = make_engine(empty)
+
+    assert strongly_connected_components([0], []) == ([], [])
+    assert empty.components()[1] == []
+    assert engine.cycles() == []
+    assert engine.impact(MODULES['a']) is None
+
+    index = ImpactIndex(empty)
+    for depth in (None, 3):
+        methods, _ = index.reachable(np.zeros(0, dtype=np.int32), depth=depth)
+        assert len(methods) == 0
@@ -0,0 +1,97 @@
+"""
+Тесты GraphAnalyticsService без Neo4j (драйвер-заглушка)
+"""
+
+import pytest
+
+pytest.importorskip("neo4j")
+
+from services.graph_analytics import GraphAnalyticsService
+from services.graph_metrics_cache import GraphMetricsCache
+from services.graph_version import GRAPH_VERSION_QUERY
+
+MODULE_KEY = "src/commonmodules/общегоназначения/ext/module.bsl"
+
+
+class FakeResult:
+    def __init__(self, record):
+        self.record = record
+
+    def single(self):
+        return self.record
+
+
+class FakeDriver:
+    """Граф из одного модуля с path_key MODULE_KEY"""
+
+    def __init__(self):
+        self.dependency_queries = []
+
+    def session(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def run(self, query, **params):
+        if query == GRAPH_VERSION_QUERY:
+            return FakeResult({'version': 1})
+
+        self.dependency_queries.append(params)
+        if MODULE_KEY not in params['keys']:
+            return FakeResult(None)
+        return FakeResult({
+            'imports': ["src/CommonModules/Сервер/Ext/Module.bsl", None],
+            'imported_by': ["src/Documents/Заказ/Ext/ObjectModule.bsl"]
+        })
+
+
+@pytest.fixture
+def service():
+    service = GraphAnalyticsService.__new__(GraphAnalyticsService)
+    service.driver = FakeDriver()
+    service.dependencies_cache = GraphMetricsCache(service.driver)
+    return service
+
+
+def test_dependencies_found_by_path_key(service):
+    expected = {
+        'imports': ["src/CommonModules/Сервер/Ext/Module.bsl"],
+        'imported_by': ["src/Documents/Заказ/Ext/ObjectModule.bsl"]
+    }
+
+    # Путь с другим корнем, регистром и слешами - тот же модуль и та же запись кеша
+    assert service.get_dependencies("/opt/project/src/CommonModules/ОбщегоНазначения/Ext/Module.bsl") == expected
+    assert service.get_dependencies("\\opt\\project\\src\\CommonModules\\ОбщегоНазначения\\Ext\\Module.bsl") == expected
+    assert len(service.driver.dependency_queries) == 1
+
+
+def test_unknown_module_has_no_dependencies(service):
+    assert service.get_dependencies("CommonModules/Нет/Ext/Module.bsl") == {'imports': [], 'imported_by': []}
+    assert service.get_dependencies("") == {'imports': [], 'imported_by': []}
+
+
+def test_impact_fallback_finds_module_by_path_key():
+    from services.graph_analytics import GraphAnalyzer
+
+    analyzer = GraphAnalyzer.__new__(GraphAnalyzer)
+    analyzer.engine = None
+
+    def run_query(query, **params):
+        if MODULE_KEY not in params['keys']:
+            return []
+        return [
+            {'name': "Вызов", 'file_path': "src/CommonModules/ОбщегоНазначения/Ext/Module.bsl",
+             'module_path': "src/CommonModules/ОбщегоНазначения/Ext/Module.bsl", 'distance': 1},
+            {'name': "Проведение", 'file_path': "src/Documents/Заказ/Ext/ObjectModule.bsl",
+             'module_path': "src/CommonModules/ОбщегоНазначения/Ext/Module.bsl", 'distance': 2}
+        ]
+
+    analyzer._run_query = run_query
+    impact = analyzer.analyze_impact("C:\\Project\\src\\CommonModules\\ОбщегоНазначения\\Ext\\Module.bsl")
+
+    assert impact.methods_count == 2
+    assert impact.modules == [{'file_path': "src/Documents/Заказ/Ext/ObjectModule.bsl", 'methods': 1}]
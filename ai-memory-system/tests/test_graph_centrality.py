@@ -0,0 +1,82 @@
+"""
+Тесты CentralityIndex: сохраненные метрики отдаются, пока новая версия считается в фоне
+"""
+
+import threading
+import time
+
+import pytest
+
+from services import graph_centrality as centrality_module
+from services.graph_centrality import LOAD_LATEST_SCORES_QUERY, LOAD_SCORES_QUERY, CentralityIndex
+
+SAVED = [
+    {'module': "CommonModules/A/Ext/Module.bsl", 'pagerank': 0.7, 'betweenness': 0.1},
+    {'module': "CommonModules/B/Ext/Module.bsl", 'pagerank': 0.3, 'betweenness': 0.9},
+]
+
+
+class FakeResult:
+    def __init__(self, records):
+        self.records = records
+
+    def data(self):
+        return self.records
+
+
+class FakeDriver:
+    """Neo4j с метриками, сохраненными для версии saved_version"""
+
+    def __init__(self, saved_version):
+        self.saved_version = saved_version
+
+    def session(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, **params):
+        if query == LOAD_SCORES_QUERY:
+            return FakeResult(SAVED if params['version'] == self.saved_version else [])
+        if query == LOAD_LATEST_SCORES_QUERY:
+            return FakeResult([dict(record, version=self.saved_version) for record in SAVED])
+        raise AssertionError(f"unexpected query: {query}")
+
+
+@pytest.fixture
+def graph(monkeypatch):
+    state = {'version': "2"}
+    monkeypatch.setattr(centrality_module, "get_graph_version", lambda driver: state['version'])
+    return state
+
+
+def test_new_version_served_stale_while_computed_in_background(graph):
+    index = CentralityIndex(FakeDriver(saved_version="1"), check_interval=0)
+    release = threading.Event()
+    calls = []
+
+    def compute_and_save():
+        calls.append(threading.current_thread().name)
+        release.wait(5)
+        index._set("2", [dict(record, pagerank=1 - record['pagerank']) for record in SAVED])
+
+    index.compute_and_save = compute_and_save
+
+    # Расчет не блокирует запрос: отдаются метрики версии 1
+    assert index.top('pagerank', 1) == [("CommonModules/A/Ext/Module.bsl", 0.7)]
+    assert index.stale
+    for _ in range(3):
+        index.top('pagerank', 1)
+    assert calls == ["centrality-refresh"]
+
+    release.set()
+    deadline = time.time() + 5
+    while index._refreshing and time.time() < deadline:
+        time.sleep(0.01)
+    assert index.top('pagerank', 1) == [("CommonModules/B/Ext/Module.bsl", 0.7)]
+    assert not index.stale
+    assert len(calls) == 1
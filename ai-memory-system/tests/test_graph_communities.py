@@ -0,0 +1,43 @@
+"""
+Тесты Louvain (services/graph_communities.py)
+"""
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from services.graph_communities import louvain, modularity
+
+
+def undirected(size, edges):
+    adjacency = [{} for _ in range(size)]
+    for a, b in edges:
+        adjacency[a][b] = adjacency[b][a] = 1.0
+    return adjacency
+
+
+def test_two_cliques_joined_by_one_edge():
+    cliques = [(a, b) for group in (range(0, 4), range(4, 8)) for a in group for b in group if a < b]
+    adjacency = undirected(8, cliques + [(3, 4)])
+
+    labels = louvain(adjacency)
+
+    assert labels == [0, 0, 0, 0, 1, 1, 1, 1]
+    # 13 ребер: по 6 внутри клик, степень каждой клики 13
+    assert modularity(adjacency, [0.0] * 8, labels) == pytest.approx(2 * (6 / 13 - 0.25))
+
+
+def test_symmetric_ring_terminates():
+    # Все переносы дают одинаковый прирост - без допуска вершины могут
+    # переходить между сообществами из-за ошибок округления
+    adjacency = undirected(6, [(i, (i + 1) % 6) for i in range(6)])
+
+    labels = louvain(adjacency)
+
+    assert len(labels) == 6
+    assert modularity(adjacency, [0.0] * 6, labels) > 0
+
+
+def test_graph_without_edges():
+    assert louvain([{}, {}, {}]) == [0, 1, 2]
+    assert louvain([]) == []
@@ -0,0 +1,27 @@
+"""
+Тесты GraphMetricsCache (без Neo4j: версия графа недоступна)
+"""
+
+from services.graph_metrics_cache import GraphMetricsCache
+
+
+class UnavailableDriver:
+    def session(self):
+        raise ConnectionError("Neo4j недоступен")
+
+
+def test_returned_values_do_not_share_lists_with_cache():
+    cache = GraphMetricsCache(UnavailableDriver())
+    path = "CommonModules/ОбщегоНазначения/Ext/Module.bsl"
+
+    def load(paths):
+        return {p: {'called_by': ["Проведение"], 'calls_to': []} for p in paths}
+
+    loaded = cache.get_many([path], load)[path]
+    loaded['called_by'].append("Изменено вызывающим")
+
+    cached = cache.get_many([path], load)[path]
+    cached['calls_to'].append("Изменено вызывающим")
+
+    assert cache.get_many([path], load)[path] == {'called_by': ["Проведение"], 'calls_to': []}
+    assert cache.get_stats()['hits'] == 2
@@ -0,0 +1,134 @@
+"""
+BSL Call Finder - поиск вызовов методов в теле метода
+
+Тело просматривается одним регулярным выражением: каждый идентификатор
+(или пара Модуль.Метод), за которым следует открывающая скобка,
+проверяется по хеш-таблицам имен. Стоимость линейна по размеру тела
+и не зависит от количества методов в модуле и в конфигурации.
+
+Разрешение вызовов:
+- Метод(...) и ЭтотОбъект.Метод(...) - метод того же модуля
+- ОбщийМодуль.Метод(...) - экспортный метод общего модуля (BSLSymbolTable)
+- Прочие Выражение.Метод(...) - методы других объектов, в граф не попадают
+"""
+
+import re
+from typing import Dict, List, Optional
+
+# Вызов: идентификатор перед "(", возможно с одним квалификатором "Имя.".
+# Просмотр назад (?<![\w.]) отсекает попытки с середины слова (без него поиск
+# квадратичен по длине идентификатора) и середину цепочки А.Б.В(...);
+# первая проверка [\s(] дешево отбрасывает слова, за которыми нет скобки
+_CALL_RE = re.compile(r'(?<![\w.])(?:\w+\.)?\w+(?=[\s(])(?=\s*\()')
+
+# Квалификаторы, которые указывают на сам модуль
+_SELF_QUALIFIERS = {'этотобъект', 'thisobject', 'этаформа', 'thisform'}
+
+
+class BSLCallFinder:
+    """
+    Поиск вызовов методов одного модуля
+
+    Индекс имен строится один раз на модуль и переиспользуется
+    для всех его методов.
+
+    Использование:
+        finder = BSLCallFinder(module.functions, symbol_table.scope(config_root))
+        calls = finder.find_calls(func.name, func.body)
+    """
+
+    def __init__(self, functions: List, external: Optional[Dict[str, Dict]] = None):
+        """
+        Args:
+            functions: Методы модуля (BSLFunction objects)
+            external: Общие модули конфигурации - BSLSymbolTable.scope()
+        """
+        # Имя в нижнем регистре -> имена методов в порядке следования в модуле
+        self.names = [func.name for func in functions]
+        self.index: Dict[str, List[int]] = {}
+        for position, name in enumerate(self.names):
+            self.index.setdefault(name.lower(), []).append(position)
+
+        self.external = external or {}
+
+    def find_calls(self, function_name: str, function_body: str,
+                   start: int = 0, end: Optional[int] = None) -> List[Dict]:
+        """
+        Поиск вызовов методов в теле функции
+
+        Args:
+            function_name: Имя анализируемой функции (ее вызовы не учитываются)
+            function_body: Тело функции (или весь текст модуля вместе с start/end)
+            start: Смещение начала тела в function_body
+            end: Смещение конца тела в function_body
+
+        Returns:
+            Список вызовов [{target_function, call_count, line_numbers}]:
+            сначала методы модуля в порядке следования в модуле, затем
+            методы общих модулей (с target_module, target_label, target_id)
+            в порядке первого вызова; номера строк считаются от начала тела (с 1)
+        """
+        if end is None:
+            end = len(function_body)
+
+        index = self.index
+        external = self.external
+        count = function_body.count
+        line = 1
+        line_pos = start
+        found: Dict[int, List[int]] = {}
+        found_external: Dict[str, tuple] = {}
+
+        for match in _CALL_RE.finditer(function_body, start, end):
+            qualifier, dot, name = match.group().rpartition('.')
+
+            targets = None
+            exported = None
+            if not dot or qualifier.lower() in _SELF_QUALIFIERS:
+                targets = index.get(name.lower())
+                if targets is None:
+                    continue
+            else:
+                exports = external.get(qualifier.lower())
+                if exports is not None:
+                    exported = exports.get(name.lower())
+                if exported is None:
+                    continue
+
+            # Переводы строк считаются нарастающим итогом - совпадения идут по порядку
+            position = match.start()
+            line += count('\n', line_pos, position)
+            line_pos = position
+
+            if targets is not None:
+                for target in targets:
+                    found.setdefault(target, []).append(line)
+            else:
+                found_external.setdefault(exported.id, (exported, []))[1].append(line)
+
+        calls = []
+        for target in sorted(found):
+            target_name = self.names[target]
+
+            # Пропускаем саму функцию
+            if target_name == function_name:
+                continue
+
+            line_numbers = found[target]
+            calls.append({
+                'target_function': target_name,
+                'call_count': len(line_numbers),
+                'line_numbers': line_numbers
+            })
+
+        for exported, line_numbers in found_external.values():
+            calls.append({
+                'target_function': exported.name,
+                'target_module': exported.module,
+                'target_label': exported.label,
+                'target_id': exported.id,
+                'call_count': len(line_numbers),
+                'line_numbers': line_numbers
+            })
+
+        return calls
@@ -0,0 +1,229 @@
+"""
+BSL Lexer - однопроходный токенизатор BSL кода
+Выделяет из исходного текста только значимые для парсера токены:
+комментарии, строковые литералы, директивы препроцессора (#Область, #Если),
+директивы компиляции (&НаСервере), заголовки и окончания методов,
+объявления переменных (Перем)
+
+Обычный код между токенами пропускается регулярным выражением целиком,
+поэтому стоимость разбора линейна по размеру файла.
+"""
+
+import re
+from enum import Enum
+from typing import Iterator, List, NamedTuple, Optional
+
+
+class TokenKind(Enum):
+    """Типы токенов BSL"""
+    COMMENT = "comment"            # // комментарий
+    STRING = "string"              # "строка" (в т.ч. многострочная)
+    DATE = "date"                  # '20240101'
+    PREPROCESSOR = "preprocessor"  # #Область, #КонецОбласти, #Если ...
+    ANNOTATION = "annotation"      # &НаСервере, &Перед("...")
+    METHOD_START = "method_start"  # Процедура/Функция Имя(...) [Экспорт]
+    METHOD_END = "method_end"      # КонецПроцедуры/КонецФункции
+    VARIABLE = "variable"          # Перем А, Б Экспорт;
+
+
+class BSLToken(NamedTuple):
+    """Токен BSL кода"""
+    kind: TokenKind
+    text: str            # Текст токена (для METHOD_START - ключевое слово)
+    start: int           # Смещение начала токена
+    end: int             # Смещение конца токена
+    line: int            # Номер строки начала токена (с 1)
+    name: Optional[str] = None               # Имя метода
+    parameters: Optional[List[str]] = None   # Параметры метода / имена переменных
+    is_export: bool = False
+
+
+# Главное регулярное выражение: альтернативы упорядочены так, чтобы
+# комментарий и строка "поглощали" ключевые слова внутри себя.
+# Групп захвата нет намеренно - с ними поиск в re заметно медленнее;
+# вид токена определяется по первому символу совпадения.
+# Символы # и & вне строк и комментариев встречаются только в директивах.
+_TOKEN_RE = re.compile(
+    r'//[^\n]*'
+    r'|"[^"]*(?:""[^"]*)*"'
+    r"|'[^'\n]*'"
+    r'|[#&][^\n]*'
+    r'|(?=[ПпФфКкPpFfEeVv])(?<![\w.])'
+    r'(?i:Процедура|Функция|Procedure|Function|Перем|Var'
+    r'|КонецПроцедуры|КонецФункции|EndProcedure|EndFunction)(?!\w)'
+)
+
+# Заголовок метода: ключевое слово, имя и открывающая скобка
+_METHOD_RE = re.compile(r'\w+\s+(\w+)\s*\(')
+
+_KEYWORDS = {
+    'процедура': TokenKind.METHOD_START,
+    'функция': TokenKind.METHOD_START,
+    'procedure': TokenKind.METHOD_START,
+    'function': TokenKind.METHOD_START,
+    'конецпроцедуры': TokenKind.METHOD_END,
+    'конецфункции': TokenKind.METHOD_END,
+    'endprocedure': TokenKind.METHOD_END,
+    'endfunction': TokenKind.METHOD_END,
+    'перем': TokenKind.VARIABLE,
+    'var': TokenKind.VARIABLE,
+}
+
+_SIMPLE_KINDS = {
+    '/': TokenKind.COMMENT,
+    '"': TokenKind.STRING,
+    "'": TokenKind.DATE,
+    '#': TokenKind.PREPROCESSOR,
+    '&': TokenKind.ANNOTATION,
+}
+
+# Список параметров до закрывающей скобки (строки и комментарии внутри допустимы)
+_PARAMS_RE = re.compile(
+    r'((?:[^)"/]|/(?!/)|"[^"]*(?:""[^"]*)*"|//[^\n]*)*)\)'
+    r'(?:[ \t]*(Экспорт|Export)(?!\w))?',
+    re.IGNORECASE
+)
+
+# Отдельный параметр: всё до запятой, не считая запятых внутри строк
+_PARAM_SPLIT_RE = re.compile(r'(?:[^,"]|"[^"]*(?:""[^"]*)*")+')
+
+_LINE_COMMENT_RE = re.compile(r'//[^\n]*')
+
+# Список объявляемых переменных: Имя [Экспорт], Имя [Экспорт] ...
+_VAR_DECL_RE = re.compile(
+    r'\w+(?:\s+(?:Экспорт|Export)(?!\w))?'
+    r'(?:\s*,\s*\w+(?:\s+(?:Экспорт|Export)(?!\w))?)*',
+    re.IGNORECASE
+)
+
+_SPACES_RE = re.compile(r'\s*')
+
+_VAR_NAME_RE = re.compile(r'\s*(\w+)(?:\s+(Экспорт|Export)(?!\w))?', re.IGNORECASE)
+
+
+def _skip_spaces(content: str, pos: int) -> int:
+    """Смещение первого непробельного символа начиная с pos"""
+    return _SPACES_RE.match(content, pos).end()
+
+
+class BSLLexer:
+    """
+    Однопроходный лексер BSL
+
+    Использование:
+        for token in BSLLexer().tokenize(content):
+            ...
+    """
+
+    def tokenize(self, content: str) -> Iterator[BSLToken]:
+        """
+        Разбор текста модуля на значимые токены
+
+        Args:
+            content: Текст BSL модуля
+
+        Yields:
+            BSLToken в порядке следования в тексте
+        """
+        search = _TOKEN_RE.search
+        count = content.count
+        simple_kinds = _SIMPLE_KINDS
+        pos = 0
+        line = 1
+        line_pos = 0  # Смещение, до которого уже посчитаны переводы строк
+
+        while True:
+            m = search(content, pos)
+            if m is None:
+                return
+
+            start, pos = m.span()
+            line += count('\n', line_pos, start)
+            line_pos = start
+            text = m.group()
+
+            kind = simple_kinds.get(text[0])
+            if kind is not None:
+                if kind is TokenKind.PREPROCESSOR or kind is TokenKind.ANNOTATION:
+                    text = text.rstrip()
+                yield BSLToken(kind, text, start, pos, line)
+                continue
+
+            kind = _KEYWORDS[text.lower()]
+
+            if kind is TokenKind.METHOD_START:
+                header_match = _METHOD_RE.match(content, start)
+                if header_match is None:
+                    # Ключевое слово без имени и скобки - не заголовок метода
+                    continue
+
+                params_match = _PARAMS_RE.match(content, header_match.end())
+                if params_match is None:
+                    # Незакрытый список параметров
+                    continue
+
+                pos = params_match.end()
+                yield BSLToken(
+                    kind,
+                    text,
+                    start,
+                    pos,
+                    line,
+                    name=header_match.group(1),
+                    parameters=self._split_parameters(params_match.group(1)),
+                    is_export=params_match.group(2) is not None
+                )
+
+            elif kind is TokenKind.METHOD_END:
+                yield BSLToken(kind, text, start, pos, line)
+
+            else:
+                decl_match = _VAR_DECL_RE.match(content, _skip_spaces(content, pos))
+                if decl_match is None:
+                    continue
+
+                names, is_export = self._split_variables(decl_match.group(0))
+                pos = decl_match.end()
+                yield BSLToken(
+                    kind,
+                    text,
+                    start,
+                    pos,
+                    line,
+                    parameters=names,
+                    is_export=is_export
+                )
+
+    @staticmethod
+    def _split_parameters(params_str: str) -> List[str]:
+        """Разбор списка параметров с учетом строк-значений по умолчанию"""
+        if not params_str.strip():
+            return []
+
+        if '//' in params_str:
+            params_str = _LINE_COMMENT_RE.sub('', params_str)
+
+        parameters = []
+        for param in _PARAM_SPLIT_RE.findall(params_str):
+            param = ' '.join(param.split())
+            if param:
+                parameters.append(param)
+        return parameters
+
+    @staticmethod
+    def _split_variables(decl: str) -> tuple:
+        """
+        Разбор объявления переменных
+
+        Returns:
+            (список имен, признак экспорта хотя бы одной переменной)
+        """
+        names = []
+        is_export = False
+        for part in decl.split(','):
+            match = _VAR_NAME_RE.match(part)
+            if match:
+                names.append(match.group(1))
+                if match.group(2):
+                    is_export = True
+        return names, is_export
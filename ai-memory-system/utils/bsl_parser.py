@@ -4,69 +4,215 @@ BSL Parser - парсер для анализа структуры BSL кода
 """
 
 import re
+import sys
 import logging
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from typing import List, Optional, Tuple
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.bsl_lexer import BSLLexer, TokenKind
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Версия результата разбора. Увеличивать при любом изменении того,
+# что возвращает парсер - по ней инвалидируется кеш разбора (services/parse_cache.py)
+PARSER_VERSION = "2"
+
 
-@dataclass
 class BSLFunction:
-    """Структура для хранения информации о функции/процедуре"""
-    name: str
-    type: str  # "Процедура" или "Функция"
-    parameters: List[str]
-    body: str
-    start_line: int
-    end_line: int
-    is_export: bool = False
-    doc_comment: Optional[str] = None
-
-
-@dataclass
+    """
+    Структура для хранения информации о функции/процедуре
+
+    Тело не копируется из текста модуля: хранятся смещения начала и конца
+    в общем для всех функций модуля тексте (source), срез выполняется
+    лениво при обращении к body. При pickle общий текст сериализуется
+    один раз на модуль (pickle запоминает уже записанные объекты).
+    """
+
+    __slots__ = (
+        'name', 'type', 'parameters', 'start_line', 'end_line', 'is_export',
+        'doc_comment', 'region', 'directives', 'source', 'body_start', 'body_end'
+    )
+
+    def __init__(
+        self,
+        name: str,
+        type: str,  # "Процедура" или "Функция"
+        parameters: List[str],
+        body: Optional[str] = None,
+        start_line: int = 0,
+        end_line: int = 0,
+        is_export: bool = False,
+        doc_comment: Optional[str] = None,
+        region: Optional[str] = None,  # Ближайшая #Область
+        directives: Optional[List[str]] = None,  # &НаСервере и т.п.
+        source: Optional[str] = None,
+        body_start: int = 0,
+        body_end: Optional[int] = None
+    ):
+        self.name = name
+        self.type = type
+        self.parameters = parameters
+        self.start_line = start_line
+        self.end_line = end_line
+        self.is_export = is_export
+        self.doc_comment = doc_comment
+        self.region = region
+        self.directives = directives if directives is not None else []
+
+        if source is None:
+            # Тело передано строкой - оно и становится буфером
+            source = body or ''
+            body_start = 0
+            body_end = len(source)
+
+        self.source = source
+        self.body_start = body_start
+        self.body_end = len(source) if body_end is None else body_end
+
+    @property
+    def body(self) -> str:
+        """Тело функции (срез общего текста модуля)"""
+        return self.source[self.body_start:self.body_end]
+
+    def body_preview(self, max_lines: int = 5) -> str:
+        """
+        Первые строки тела без пробельных символов в начале
+
+        Эквивалентно '\n'.join(body.strip().split('\n')[:max_lines]),
+        но не создает копию всего тела.
+        """
+        start = _BLANK_RE.match(self.source, self.body_start, self.body_end).end()
+        end = start
+        for _ in range(max_lines):
+            newline = self.source.find('\n', end, self.body_end)
+            if newline == -1:
+                return self.source[start:self.body_end].rstrip()
+            end = newline + 1
+        preview = self.source[start:end - 1]
+        if _BLANK_RE.fullmatch(self.source, end, self.body_end):
+            # Дальше только пробельные символы - их отбросил бы strip()
+            return preview.rstrip()
+        return preview
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, BSLFunction):
+            return NotImplemented
+        return (
+            self.name == other.name and self.type == other.type and
+            self.parameters == other.parameters and self.body == other.body and
+            self.start_line == other.start_line and self.end_line == other.end_line and
+            self.is_export == other.is_export and self.doc_comment == other.doc_comment
+        )
+
+    def __getstate__(self) -> tuple:
+        # Кортеж значений без имен атрибутов - компактнее при передаче между процессами
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state: tuple):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def __repr__(self) -> str:
+        return (
+            f"BSLFunction(name={self.name!r}, type={self.type!r}, "
+            f"parameters={self.parameters!r}, start_line={self.start_line}, "
+            f"end_line={self.end_line}, is_export={self.is_export})"
+        )
+
+
 class BSLVariable:
     """Структура для хранения информации о переменной"""
-    name: str
-    line_number: int
 
+    __slots__ = ('name', 'line_number')
 
-@dataclass
-class BSLModule:
-    """Структура для хранения информации о модуле"""
-    file_path: str
-    functions: List[BSLFunction]
-    variables: List[BSLVariable]
-    module_type: str  # ObjectModule, ManagerModule, CommonModule и т.д.
+    def __init__(self, name: str, line_number: int):
+        self.name = name
+        self.line_number = line_number
 
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, BSLVariable):
+            return NotImplemented
+        return self.name == other.name and self.line_number == other.line_number
 
-class BSLParser:
+    def __getstate__(self) -> tuple:
+        # Кортеж значений без имен атрибутов - компактнее при передаче между процессами
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state: tuple):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def __repr__(self) -> str:
+        return f"BSLVariable(name={self.name!r}, line_number={self.line_number})"
+
+
+class BSLModule:
     """
-    Парсер BSL кода для извлечения структуры
+    Структура для хранения информации о модуле
+
+    source - единственная копия текста модуля, на которую ссылаются
+    смещения всех функций. content_hash - SHA-256 содержимого файла,
+    заполняется кешем разбора.
     """
 
-    # Регулярные выражения для парсинга
-    FUNCTION_PATTERN = re.compile(
-        r'(Процедура|Функция|Procedure|Function)\s+(\w+)\s*\((.*?)\)\s*(Экспорт|Export)?',
-        re.IGNORECASE
-    )
+    __slots__ = ('file_path', 'functions', 'variables', 'module_type', 'source', 'content_hash')
+
+    def __init__(
+        self,
+        file_path: str,
+        functions: List[BSLFunction],
+        variables: List[BSLVariable],
+        module_type: str,  # ObjectModule, ManagerModule, CommonModule и т.д.
+        source: str = '',
+        content_hash: Optional[str] = None
+    ):
+        self.file_path = file_path
+        self.functions = functions
+        self.variables = variables
+        self.module_type = module_type
+        self.source = source
+        self.content_hash = content_hash
+
+    def __getstate__(self) -> tuple:
+        # Кортеж значений без имен атрибутов - компактнее при передаче между процессами
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state: tuple):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def __repr__(self) -> str:
+        return (
+            f"BSLModule(file_path={self.file_path!r}, module_type={self.module_type!r}, "
+            f"functions={len(self.functions)}, variables={len(self.variables)})"
+        )
+
+
+# Строка из одних пробельных символов
+_BLANK_RE = re.compile(r'\s*')
+
+# #Область Имя / #КонецОбласти
+_REGION_RE = re.compile(
+    r'#(?:Область|Region)(?:\s+(\w+))?|#(КонецОбласти|EndRegion)',
+    re.IGNORECASE
+)
 
-    END_FUNCTION_PATTERN = re.compile(
-        r'КонецПроцедуры|КонецФункции|EndProcedure|EndFunction',
-        re.IGNORECASE
-    )
 
-    VARIABLE_PATTERN = re.compile(
-        r'Перем\s+(\w+(?:\s*,\s*\w+)*)',
-        re.IGNORECASE
-    )
+class BSLParser:
+    """
+    Парсер BSL кода для извлечения структуры
 
-    COMMENT_PATTERN = re.compile(r'//(.*)$', re.MULTILINE)
+    Разбор выполняется за один проход по токенам BSLLexer:
+    строки и комментарии не ломают поиск границ методов,
+    заголовки с параметрами на нескольких строках распознаются корректно.
+    """
 
     def __init__(self):
         """Инициализация парсера"""
+        self.lexer = BSLLexer()
         logger.info("BSLParser инициализирован")
 
     def parse_file(self, file_path: str) -> Optional[BSLModule]:
@@ -84,28 +230,7 @@ class BSLParser:
             with open(file_path, 'r', encoding='utf-8-sig') as f:
                 content = f.read()
 
-            # Определение типа модуля по пути
-            module_type = self._detect_module_type(file_path)
-
-            # Парсинг функций и процедур
-            functions = self._parse_functions(content)
-
-            # Парсинг переменных
-            variables = self._parse_variables(content)
-
-            module = BSLModule(
-                file_path=file_path,
-                functions=functions,
-                variables=variables,
-                module_type=module_type
-            )
-
-            logger.debug(
-                f"Файл {Path(file_path).name}: "
-                f"{len(functions)} функций, {len(variables)} переменных"
-            )
-
-            return module
+            return self.parse_content(content, file_path)
 
         except FileNotFoundError:
             logger.error(f"Файл не найден: {file_path}")
@@ -117,6 +242,36 @@ class BSLParser:
             logger.error(f"Ошибка парсинга {file_path}: {e}")
             return None
 
+    def parse_content(self, content: str, file_path: str) -> BSLModule:
+        """
+        Парсинг уже прочитанного текста модуля
+
+        Args:
+            content: Текст модуля с нормализованными переводами строк
+            file_path: Путь к файлу (для определения типа модуля)
+
+        Returns:
+            BSLModule с информацией о модуле
+        """
+        # Определение типа модуля по пути
+        module_type = self._detect_module_type(file_path)
+
+        # Функции, процедуры и переменные - за один проход
+        functions, variables = self._parse_content(content)
+
+        logger.debug(
+            f"Файл {Path(file_path).name}: "
+            f"{len(functions)} функций, {len(variables)} переменных"
+        )
+
+        return BSLModule(
+            file_path=file_path,
+            functions=functions,
+            variables=variables,
+            module_type=module_type,
+            source=content
+        )
+
     def _detect_module_type(self, file_path: str) -> str:
         """Определение типа модуля по пути"""
         path_lower = file_path.lower()
@@ -134,113 +289,142 @@ class BSLParser:
         else:
             return 'Unknown'
 
-    def _parse_functions(self, content: str) -> List[BSLFunction]:
-        """Парсинг функций и процедур"""
-        functions = []
-        lines = content.split('\n')
-        i = 0
-
-        while i < len(lines):
-            line = lines[i]
-
-            # Поиск начала функции/процедуры
-            match = self.FUNCTION_PATTERN.search(line)
-            if match:
-                func_type = match.group(1)  # Процедура/Функция
-                func_name = match.group(2)
-                params_str = match.group(3)
-                is_export = match.group(4) is not None
-
-                # Парсинг параметров
-                parameters = [
-                    p.strip() for p in params_str.split(',') if p.strip()
-                ]
-
-                # Поиск конца функции
-                start_line = i + 1
-                func_body_lines = []
-                i += 1
-
-                while i < len(lines):
-                    if self.END_FUNCTION_PATTERN.search(lines[i]):
-                        break
-                    func_body_lines.append(lines[i])
-                    i += 1
-
-                end_line = i + 1
-                func_body = '\n'.join(func_body_lines)
-
-                # Поиск комментария документации (строки перед функцией)
-                doc_comment = self._extract_doc_comment(lines, start_line - 2)
-
-                function = BSLFunction(
-                    name=func_name,
-                    type=func_type,
-                    parameters=parameters,
-                    body=func_body,
-                    start_line=start_line,
-                    end_line=end_line,
-                    is_export=is_export,
-                    doc_comment=doc_comment
-                )
-
-                functions.append(function)
-
-            i += 1
-
-        return functions
-
-    def _parse_variables(self, content: str) -> List[BSLVariable]:
-        """Парсинг переменных модуля"""
-        variables = []
-        lines = content.split('\n')
-
-        for i, line in enumerate(lines, 1):
-            match = self.VARIABLE_PATTERN.search(line)
-            if match:
-                var_names = match.group(1)
-                # Разбор нескольких переменных в одной строке
-                for var_name in var_names.split(','):
-                    var_name = var_name.strip()
-                    if var_name:
-                        variables.append(
-                            BSLVariable(name=var_name, line_number=i)
-                        )
-
-        return variables
-
-    def _extract_doc_comment(self, lines: List[str], line_index: int) -> Optional[str]:
+    def _parse_content(self, content: str) -> Tuple[List[BSLFunction], List[BSLVariable]]:
         """
-        Извлечение комментария документации перед функцией
+        Однопроходный разбор текста модуля
 
         Args:
-            lines: Все строки файла
-            line_index: Индекс строки перед функцией
+            content: Текст модуля
 
         Returns:
-            Комментарий документации или None
+            (функции и процедуры, переменные)
         """
-        if line_index < 0 or line_index >= len(lines):
-            return None
+        functions = []
+        variables = []
 
-        doc_lines = []
-        i = line_index
-
-        # Идем вверх, собирая комментарии
-        while i >= 0:
-            line = lines[i].strip()
-            if line.startswith('//'):
-                comment_text = line[2:].strip()
-                doc_lines.insert(0, comment_text)
-                i -= 1
-            elif not line:  # Пустая строка - продолжаем
-                i -= 1
-            else:
-                break
-
-        if doc_lines:
-            return '\n'.join(doc_lines)
-        return None
+        regions: List[str] = []
+        current = None          # Заголовок текущего метода (BSLToken)
+        current_doc = None
+        current_directives = None
+        current_region = None
+        body_start = 0
+
+        # Комментарий документации: блок строк "//" и директив компиляции
+        # непосредственно перед заголовком метода
+        doc_lines: List[str] = []
+        directives: List[str] = []
+        doc_end = 0
+
+        for token in self.lexer.tokenize(content):
+            kind = token.kind
+
+            if current is not None:
+                # Внутри метода интересует только его окончание
+                if kind is TokenKind.METHOD_END:
+                    # Тело заканчивается перед строкой с окончанием метода
+                    body_end = content.rfind('\n', 0, token.start)
+                    functions.append(BSLFunction(
+                        name=current.name,
+                        type=current.text,
+                        parameters=current.parameters,
+                        source=content,
+                        body_start=body_start,
+                        body_end=max(body_start, body_end),
+                        start_line=current.line,
+                        end_line=token.line,
+                        is_export=current.is_export,
+                        doc_comment=current_doc,
+                        region=current_region,
+                        directives=current_directives
+                    ))
+                    current = None
+                    doc_lines = []
+                    directives = []
+                elif kind is TokenKind.VARIABLE:
+                    self._append_variables(variables, token)
+                continue
+
+            if kind is TokenKind.COMMENT:
+                line_start = content.rfind('\n', 0, token.start) + 1
+                if _BLANK_RE.fullmatch(content, line_start, token.start) is None:
+                    # Комментарий в конце строки кода
+                    doc_lines = []
+                    directives = []
+                elif doc_lines and _BLANK_RE.fullmatch(content, doc_end, line_start) is not None:
+                    doc_lines.append(token.text[2:].strip())
+                else:
+                    doc_lines = [token.text[2:].strip()]
+                    directives = []
+                doc_end = token.end
+
+            elif kind is TokenKind.ANNOTATION:
+                if _BLANK_RE.fullmatch(content, doc_end, token.start) is None:
+                    doc_lines = []
+                    directives = []
+                directives.append(token.text)
+                doc_end = token.end
+
+            elif kind is TokenKind.PREPROCESSOR:
+                self._apply_region(regions, token.text)
+                doc_lines = []
+                directives = []
+
+            elif kind is TokenKind.METHOD_START:
+                attached = _BLANK_RE.fullmatch(content, doc_end, token.start) is not None
+                current = token
+                current_doc = '\n'.join(doc_lines) if attached and doc_lines else None
+                current_directives = directives if attached else []
+                current_region = regions[-1] if regions else None
+
+                # Тело начинается со строки, следующей за заголовком
+                newline = content.find('\n', token.end)
+                body_start = newline + 1 if newline != -1 else len(content)
+
+            elif kind is TokenKind.VARIABLE:
+                self._append_variables(variables, token)
+
+            elif kind is TokenKind.STRING or kind is TokenKind.DATE:
+                # Литерал вне метода разрывает блок документации
+                doc_lines = []
+                directives = []
+
+        if current is not None:
+            # Метод без окончания - тело до конца файла
+            functions.append(BSLFunction(
+                name=current.name,
+                type=current.text,
+                parameters=current.parameters,
+                source=content,
+                body_start=body_start,
+                body_end=len(content),
+                start_line=current.line,
+                end_line=content.count('\n') + 2,
+                is_export=current.is_export,
+                doc_comment=current_doc,
+                region=current_region,
+                directives=current_directives
+            ))
+
+        return functions, variables
+
+    @staticmethod
+    def _append_variables(variables: List[BSLVariable], token) -> None:
+        """Добавление переменных из токена объявления"""
+        for var_name in token.parameters:
+            variables.append(BSLVariable(name=var_name, line_number=token.line))
+
+    @staticmethod
+    def _apply_region(regions: List[str], directive: str) -> None:
+        """Учет директив #Область/#КонецОбласти в стеке областей"""
+        match = _REGION_RE.match(directive)
+        if not match:
+            return
+
+        if match.group(2) is not None:
+            if regions:
+                regions.pop()
+        else:
+            regions.append(match.group(1) or '')
 
     def extract_searchable_text(self, module: BSLModule) -> str:
         """
@@ -276,9 +460,7 @@ class BSLParser:
                 parts.append(f"// {func.doc_comment}")
 
             # Первые 5 строк тела функции (для контекста)
-            body_lines = func.body.strip().split('\n')[:5]
-            if body_lines:
-                parts.append('\n'.join(body_lines))
+            parts.append(func.body_preview(5))
 
         # Переменные модуля
         if module.variables:
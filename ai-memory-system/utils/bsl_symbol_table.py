@@ -0,0 +1,125 @@
+"""
+BSL Symbol Table - таблица экспортных методов общих модулей конфигурации
+
+Вызов ОбщийМодуль.Метод(...) из любого модуля конфигурации разрешается
+в конкретный метод по этой таблице. Таблица строится один раз до анализа
+вызовов и хранится в памяти: корень конфигурации -> общий модуль ->
+экспортные методы.
+
+В выгрузке конфигурации общие модули лежат в
+<корень>/CommonModules/<Имя>/Ext/Module.bsl, поэтому корень конфигурации
+и имя модуля определяются по пути файла.
+"""
+
+from pathlib import PurePath
+from typing import Dict, Iterator, NamedTuple, Optional, Tuple
+
+# Каталоги коллекций объектов метаданных в выгрузке конфигурации
+METADATA_COLLECTIONS = {
+    'CommonModules', 'CommonForms', 'CommonCommands', 'Catalogs', 'Documents',
+    'DocumentJournals', 'Enums', 'Reports', 'DataProcessors', 'Constants',
+    'InformationRegisters', 'AccumulationRegisters', 'AccountingRegisters',
+    'CalculationRegisters', 'ChartsOfCharacteristicTypes', 'ChartsOfAccounts',
+    'ChartsOfCalculationTypes', 'BusinessProcesses', 'Tasks', 'ExchangePlans',
+    'SettingsStorages', 'WebServices', 'HTTPServices', 'FilterCriteria',
+    'Ext',  # Модули приложения и сеанса в корне конфигурации
+}
+
+
+class ExportedMethod(NamedTuple):
+    """Экспортный метод общего модуля"""
+    module: str   # Имя общего модуля
+    name: str     # Имя метода
+    label: str    # Метка узла в графе (Function/Procedure)
+    id: str       # ID узла в графе
+
+
+def split_module_path(relative_path) -> Tuple[str, Optional[str], Optional[str]]:
+    """
+    Разбор пути модуля в выгрузке конфигурации
+
+    Args:
+        relative_path: Путь к .bsl файлу относительно корня проекта
+
+    Returns:
+        (корень конфигурации, коллекция метаданных, имя объекта);
+        для файлов вне выгрузки - (родительский каталог, None, None)
+    """
+    parts = PurePath(relative_path).parts
+
+    for i, part in enumerate(parts[:-1]):
+        if part in METADATA_COLLECTIONS:
+            root = '/'.join(parts[:i])
+            if part == 'Ext':
+                return root, part, None
+            return root, part, parts[i + 1] if i + 1 < len(parts) - 1 else None
+
+    return '/'.join(parts[:-1]), None, None
+
+
+class BSLSymbolTable:
+    """
+    Экспортные методы общих модулей по конфигурациям
+
+    Использование:
+        table = BSLSymbolTable()
+        table.add_export(root, "ОбщегоНазначения", "ЗначениеРеквизитаОбъекта", "Function", func_id)
+        scope = table.scope(root)   # для BSLCallFinder
+    """
+
+    def __init__(self):
+        # Корень конфигурации -> имя модуля (нижний регистр) -> имя метода (нижний регистр) -> метод
+        self.configurations: Dict[str, Dict[str, Dict[str, ExportedMethod]]] = {}
+
+    def add_export(self, config_root: str, module: str, name: str, label: str, node_id: str):
+        """
+        Добавление экспортного метода
+
+        Args:
+            config_root: Корень конфигурации (см. split_module_path)
+            module: Имя общего модуля
+            name: Имя метода
+            label: Метка узла (Function/Procedure)
+            node_id: ID узла в графе
+        """
+        modules = self.configurations.setdefault(config_root, {})
+        methods = modules.setdefault(module.lower(), {})
+        # Первое объявление побеждает - как и при загрузке узлов по одному ID
+        methods.setdefault(name.lower(), ExportedMethod(module, name, label, node_id))
+
+    def scope(self, config_root: str) -> Dict[str, Dict[str, ExportedMethod]]:
+        """
+        Общие модули, видимые из модуля конфигурации
+
+        Args:
+            config_root: Корень конфигурации вызывающего модуля
+
+        Returns:
+            Имя модуля (нижний регистр) -> экспортные методы
+        """
+        return self.configurations.get(config_root, {})
+
+    def resolve(self, config_root: str, module: str, name: str) -> Optional[ExportedMethod]:
+        """Поиск экспортного метода по имени модуля и метода"""
+        return self.scope(config_root).get(module.lower(), {}).get(name.lower())
+
+    def exports(self) -> Iterator[ExportedMethod]:
+        """Все экспортные методы всех конфигураций"""
+        for modules in self.configurations.values():
+            for methods in modules.values():
+                yield from methods.values()
+
+    def get_stats(self) -> Dict:
+        """
+        Размер таблицы
+
+        Returns:
+            Количество конфигураций, общих модулей и экспортных методов
+        """
+        modules = sum(len(m) for m in self.configurations.values())
+        methods = sum(len(e) for m in self.configurations.values() for e in m.values())
+        return {
+            'configurations': len(self.configurations),
+            'modules': modules,
+            'exports': methods
+        }